@@ -0,0 +1,71 @@
+"""
+Import-time benchmark of the robodog package
+
+Runs each scenario in a fresh interpreter and reports the wall time of the
+statement together with the heavy dependencies it loaded. Results are written
+as JSON.
+
+Usage (with robodog installed, e.g. ``pip install -e .``):
+    python benchmarks/bench_import.py --output import.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+SCENARIOS = {
+    'import_package': 'import robodog',
+    'user_mode': 'from robodog import UserMode',
+    'param_ranges': 'from robodog import PARAM_RANGES',
+    'dog_class': 'from robodog import Dog',
+    'dog_instance': 'from robodog import Dog; Dog()',
+    'connection': 'from robodog import ROSConnection; import roslibpy',
+}
+
+HEAVY_MODULES = ('roslibpy', 'twisted', 'autobahn', 'numpy', 'serial')
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+def run_once(statement):
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+        check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(output[0]), output[1].split(',') if len(output) > 1 else []
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='interpreter runs per scenario')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, statement in SCENARIOS.items():
+        times = []
+        loaded = []
+        for _ in range(args.runs):
+            elapsed, loaded = run_once(statement)
+            times.append(elapsed)
+        results[name] = {
+            'statement': statement,
+            'median_ms': 1000 * statistics.median(times),
+            'min_ms': 1000 * min(times),
+            'loaded': loaded,
+        }
+
+    text = json.dumps({'args': vars(args), 'python': sys.version.split()[0], 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
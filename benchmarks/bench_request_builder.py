@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of the Reconfigure request builder
+
+Compares ParameterRequestBuilder with the previous per-call builder (kept
+below as the reference implementation) for typical teleop deltas and for a
+full configuration. Results are written as JSON.
+
+Usage (with robodog installed, e.g. ``pip install -e .``):
+    python benchmarks/bench_request_builder.py --output builder.json
+"""
+import argparse
+import json
+import timeit
+
+from robodog.config import DEFAULT_PARAMS
+from robodog.controller import ParameterRequestBuilder
+
+def legacy_build(params):
+    """Request builder as it was before precompilation"""
+    doubles = []
+    ints = []
+    for k, v in params.items():
+        if isinstance(v, int):
+            ints.append({'name': k, 'value': v})
+        else:
+            doubles.append({'name': k, 'value': float(v)})
+    return {
+        'config': {
+            'doubles': doubles,
+            'ints': ints,
+            'bools': [],
+            'strs': [],
+            'groups': [
+                {'name': 'Default', 'state': True, 'id': 0, 'parent': 0},
+                {'name': 'remote_controller_config', 'state': True, 'id': 1, 'parent': 0}
+            ]
+        }
+    }
+
+CASES = {
+    'single': {'vx': 0.3},
+    'teleop': {'vx': 0.3, 'vy': 0.1, 'wz': 0.2, 'body_height': 0.25},
+    'full': dict(DEFAULT_PARAMS),
+}
+
+def measure(fn, params, number, repeat):
+    best = min(timeit.repeat(lambda: fn(params), number=number, repeat=repeat))
+    return 1e6 * best / number
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000, help='calls per repeat')
+    parser.add_argument('--repeat', type=int, default=5, help='repeats (best is reported)')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    builder = ParameterRequestBuilder()
+    results = {}
+    for name, params in CASES.items():
+        legacy = measure(legacy_build, params, args.number, args.repeat)
+        compiled = measure(builder.build, params, args.number, args.repeat)
+        results[name] = {
+            'params': len(params),
+            'legacy_us': legacy,
+            'compiled_us': compiled,
+            'speedup': legacy / compiled,
+        }
+
+    text = json.dumps({'args': vars(args), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+End-to-end latency and throughput benchmarks against the mock rosbridge server
+
+Measures Dog.set_parameters round-trip latency, achievable command rates
+(blocking and asynchronous) and DogStateSubscriber ingest throughput and
+CPU cost per message. Results are written as JSON so that runs can be
+compared between commits.
+
+Usage (with robodog installed, e.g. ``pip install -e .``):
+    python benchmarks/bench_rosbridge.py --output bench.json
+"""
+import argparse
+import json
+import platform
+import socket
+import subprocess
+import sys
+import time
+from collections import deque
+
+import roslibpy
+
+from robodog import Dog, __version__
+from robodog.mock_server import MockRosbridgeServer
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def vx_value(i: int) -> float:
+    """A vx setpoint that differs from the previous one, so every call is sent"""
+    return 0.001 * (i % 1000 + 1)
+
+def percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        'count': len(samples),
+        'mean_ms': 1000 * sum(samples) / len(samples),
+        'p50_ms': 1000 * pick(0.50),
+        'p90_ms': 1000 * pick(0.90),
+        'p99_ms': 1000 * pick(0.99),
+        'max_ms': 1000 * samples[-1],
+    }
+
+def bench_set_parameters_latency(dog, samples):
+    """Round trip of blocking set_parameters calls that each change vx"""
+    latencies = []
+    failures = 0
+    for i in range(samples):
+        start = time.perf_counter()
+        ok = dog.set_parameters({'vx': vx_value(i)})
+        latencies.append(time.perf_counter() - start)
+        failures += not ok
+    return dict(percentiles(latencies), failures=failures)
+
+def bench_command_rate(dog, duration):
+    """Blocking set_parameters calls completed per second"""
+    count = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        dog.set_parameters({'vx': vx_value(count)})
+        count += 1
+    return {'commands': count, 'rate_hz': count / duration}
+
+def bench_async_command_rate(dog, duration, window):
+    """Asynchronous set_parameters calls acknowledged per second with a bounded window"""
+    pending = deque()
+    sent = count = failures = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        if len(pending) >= window:
+            failures += not pending.popleft().result()
+            count += 1
+        pending.append(dog.set_parameters_async({'vx': vx_value(sent)}, timeout=5.0))
+        sent += 1
+    elapsed = time.perf_counter() - start
+    return {'commands': count, 'rate_hz': count / elapsed, 'window': window, 'failures': failures}
+
+def bench_ingest(dog, duration):
+    """body_status/ctrl_state messages applied per second and client CPU per message"""
+    body_seq, ctrl_seq = dog.body_status.seq, dog.ctrl_state.seq
+    cpu, wall = time.process_time(), time.perf_counter()
+    time.sleep(duration)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    messages = dog.body_status.seq - body_seq + dog.ctrl_state.seq - ctrl_seq
+    return {
+        'messages': messages,
+        'rate_hz': messages / wall,
+        'cpu_us_per_message': 1e6 * cpu / messages if messages else None,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.002, help='mock service latency (s)')
+    parser.add_argument('--jitter', type=float, default=0.001, help='mock latency jitter (s)')
+    parser.add_argument('--body-status-rate', type=float, default=500.0, help='mock body_status rate (Hz)')
+    parser.add_argument('--samples', type=int, default=500, help='latency samples')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per rate benchmark')
+    parser.add_argument('--window', type=int, default=8, help='in-flight asynchronous requests')
+    parser.add_argument('--in-process', action='store_true',
+                        help='run the mock server in this process (skews CPU figures)')
+    parser.add_argument('--output', help='write JSON results to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    server = process = None
+    if args.in_process:
+        server = MockRosbridgeServer(latency=args.latency, jitter=args.jitter,
+                                     body_status_rate=args.body_status_rate).start()
+        port = server.port
+    else:
+        port = free_port()
+        process = subprocess.Popen([
+            sys.executable, '-m', 'robodog.mock_server', '--port', str(port),
+            '--latency', str(args.latency), '--jitter', str(args.jitter),
+            '--body-status-rate', str(args.body_status_rate)
+        ], stdout=subprocess.PIPE)
+        # The server prints one line once listening and exits if it cannot
+        if not process.stdout.readline():
+            raise SystemExit(f"Mock rosbridge server failed to start (exit code {process.wait()})")
+
+    try:
+        with Dog('127.0.0.1', port) as dog:
+            dog.set_parameters({}, full=True)
+            results = {
+                'set_parameters_latency': bench_set_parameters_latency(dog, args.samples),
+                'command_rate': bench_command_rate(dog, args.duration),
+                'async_command_rate': bench_async_command_rate(dog, args.duration, args.window),
+                'ingest': bench_ingest(dog, args.duration),
+            }
+    finally:
+        if server:
+            server.stop()
+        if process:
+            process.terminate()
+            process.wait()
+
+    report = {
+        'meta': {
+            'timestamp': time.time(),
+            'robodog': __version__,
+            'roslibpy': getattr(roslibpy, '__version__', None),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,4 @@
 from robodog import Dog, UserMode
-import time
 
 def print_state(dog, title="Current Status"):
     """Print detailed status information"""
@@ -17,7 +16,8 @@ def demo_modes(dog):
     for mode in modes:
         print(f"\nSwitching to {mode.name} mode...")
         dog.set_user_mode(mode)
-        time.sleep(2)
+        if not dog.wait_until_mode(mode, timeout=5):
+            print(f"Timed out waiting for {mode.name} mode")
         print_state(dog, f"In {mode.name} mode")
 
 if __name__ == '__main__':
@@ -113,15 +113,16 @@ def update_dog(dog):
     
     # 只有在有变化时才发送指令
     if changed:
-        # 更新机器狗
-        if 'vx' in params:
-            dog.vx = params['vx']
-        if 'vy' in params:
-            dog.vy = params['vy']
-        if 'wz' in params:
-            dog.wz = params['wz']
-        if 'body_height' in params:
-            dog.body_height = params['body_height']
+        # 更新机器狗 - 合并为一次请求发送
+        with dog.batch():
+            if 'vx' in params:
+                dog.vx = params['vx']
+            if 'vy' in params:
+                dog.vy = params['vy']
+            if 'wz' in params:
+                dog.wz = params['wz']
+            if 'body_height' in params:
+                dog.body_height = params['body_height']
         
         # 记录网络延迟
         dog_state['network_delay'] = time.time() - start_time
@@ -193,21 +194,10 @@ def display_thread_function():
             last_update_time = current_time
         time.sleep(0.1)  # 降低CPU使用率，但不影响控制响应性
 
-def control_thread_function(dog):
-    """控制线程 - 高频率更新机器狗"""
-    last_time = time.time()
-    while dog_state['running']:
-        current_time = time.time()
-        elapsed = current_time - last_time
-        
-        # 基于固定的更新频率运行
-        if elapsed >= UPDATE_RATE:
-            process_keys()  # 处理当前按下的所有键
-            update_dog(dog)  # 更新机器狗状态
-            last_time = current_time
-        else:
-            # 短暂睡眠以降低CPU使用率
-            time.sleep(0.001)
+def control_tick(dog):
+    """控制回调 - 由定频控制循环调用"""
+    process_keys()  # 处理当前按下的所有键
+    update_dog(dog)  # 更新机器狗状态
 
 def keyboard_control_loop(dog):
     """键盘控制主循环"""
@@ -218,10 +208,8 @@ def keyboard_control_loop(dog):
     display_thread.daemon = True
     display_thread.start()
     
-    # 创建并启动控制线程
-    control_thread = threading.Thread(target=control_thread_function, args=(dog,))
-    control_thread.daemon = True
-    control_thread.start()
+    # 启动定频控制循环
+    control_loop = dog.add_control_loop(control_tick, 1.0 / UPDATE_RATE)
     
     # 设置键盘监听器
     with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
@@ -231,6 +219,7 @@ def keyboard_control_loop(dog):
                 break
         
         listener.stop()
+    dog.remove_control_loop(control_loop)
 
 if __name__ == '__main__':
     # 替换为您的机器狗IP地址
@@ -1,9 +1,62 @@
-from .client import ROSClient
-from .subscriber import DogStateSubscriber
-from .controller import DogController
-from .config import UserMode  # 从 config 导入 UserMode
-
-from .dog import Dog
+import importlib
+from typing import TYPE_CHECKING
+from .config import UserMode, PARAM_RANGES  # 从 config 导入 UserMode 和参数范围
 
 __version__ = '0.1.0'
-__all__ = ['ROSClient', 'DogStateSubscriber', 'DogController', 'DogState', 'Dog', 'UserMode']
\ No newline at end of file
+__all__ = ['ROSClient', 'DogStateSubscriber', 'DogController', 'Dog', 'UserMode', 'ROSConnection', 'ConnectionPool', 'Fleet', 'SubscriptionOptions', 'Transport', 'SerialTransport', 'Stats', 'PARAM_RANGES', 'Recorder', 'LogReader', 'Replayer', 'Trajectory', 'ConnectionSupervisor', 'AsyncDog', 'SharedStateReader', 'Gateway', 'GatewayTransport', 'PosePredictor']
+
+# Public names and the submodule defining them. They are imported on first
+# access, so `import robodog` does not load roslibpy/Twisted, NumPy or pyserial
+# until they are actually used.
+_LAZY = {
+    'ROSClient': 'client',
+    'ROSConnection': 'connection',
+    'ConnectionPool': 'connection',
+    'Transport': 'transport',
+    'SerialTransport': 'serial_transport',
+    'DogStateSubscriber': 'subscriber',
+    'SubscriptionOptions': 'subscriber',
+    'DogController': 'controller',
+    'Dog': 'dog',
+    'Fleet': 'fleet',
+    'Stats': 'stats',
+    'Recorder': 'recorder',
+    'LogReader': 'recorder',
+    'Replayer': 'recorder',
+    'Trajectory': 'trajectory',
+    'ConnectionSupervisor': 'supervisor',
+    'AsyncDog': 'async_dog',
+    'SharedStateReader': 'shared_state',
+    'Gateway': 'gateway',
+    'GatewayTransport': 'gateway',
+    'PosePredictor': 'predictor',
+}
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module('.' + module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+if TYPE_CHECKING:
+    from .client import ROSClient
+    from .connection import ROSConnection, ConnectionPool
+    from .transport import Transport
+    from .serial_transport import SerialTransport
+    from .subscriber import DogStateSubscriber, SubscriptionOptions
+    from .controller import DogController
+    from .dog import Dog
+    from .fleet import Fleet
+    from .stats import Stats
+    from .recorder import Recorder, LogReader, Replayer
+    from .trajectory import Trajectory
+    from .supervisor import ConnectionSupervisor
+    from .async_dog import AsyncDog
+    from .shared_state import SharedStateReader
+    from .gateway import Gateway, GatewayTransport
+    from .predictor import PosePredictor
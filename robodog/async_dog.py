@@ -0,0 +1,166 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Union
+from .config import DEFAULT_PARAMS, UserMode
+from .dog import Dog
+from .states import StateManager
+from .subscriber import SubscriptionOptions
+
+class AsyncDog:
+    """
+    asyncio interface to a Dog
+
+    Parameter requests are awaited without blocking the event loop or
+    tying up a thread per call, and state messages are delivered to the loop
+    from the shared subscription thread, so one loop can drive many robots.
+    Timeouts and cancellation only abandon the wait; a request already sent
+    still completes in the background.
+    """
+
+    def __init__(self, host: str = '10.10.10.10', port: int = 9090, dog: Optional[Dog] = None, **kwargs):
+        """
+        Args:
+            host: rosbridge host
+            port: rosbridge port
+            dog: Wrap an existing Dog instead of creating one
+            **kwargs: Passed to Dog (e.g. pool, transport, history_size, auto_reconnect)
+        """
+        self.dog = dog if dog is not None else Dog(host, port, **kwargs)
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.disconnect()
+
+    async def connect(self, subscription: Union[str, SubscriptionOptions, None] = None) -> 'AsyncDog':
+        """Connect to the robot (the handshake runs in the default executor)"""
+        await asyncio.get_running_loop().run_in_executor(None, self.dog.connect, subscription)
+        return self
+
+    async def disconnect(self) -> None:
+        """Disconnect from the robot"""
+        await asyncio.get_running_loop().run_in_executor(None, self.dog.disconnect)
+
+    @property
+    def ctrl_state(self):
+        return self.dog.ctrl_state
+
+    @property
+    def body_status(self):
+        return self.dog.body_status
+
+    async def set_parameters(self, params: Dict[str, float], full: bool = False,
+                             timeout: Optional[float] = None) -> bool:
+        """
+        Set motion parameters
+
+        Args:
+            params: Parameter dictionary, see DEFAULT_PARAMS for available parameters
+            full: Send the full configuration instead of the changed keys only
+            timeout: Seconds to wait for the acknowledgement
+
+        Returns:
+            bool: Whether the setting was acknowledged (False on timeout)
+        """
+        future = asyncio.wrap_future(self.dog.set_parameters_async(params, full=full, timeout=timeout))
+        if timeout is None:
+            return await future
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return False
+
+    async def set_user_mode(self, mode: Union[UserMode, int]) -> bool:
+        """Set user mode (the first publish advertises the topic, so it runs in the default executor)"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.dog.set_user_mode, mode)
+
+    async def _stream(self, state: StateManager, maxsize: int) -> AsyncIterator:
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize)
+
+        def put(snapshot) -> None:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
+
+        def on_update(snapshot) -> None:
+            try:
+                loop.call_soon_threadsafe(put, snapshot)
+            except RuntimeError:
+                # The loop was closed while the stream was still registered
+                pass
+
+        remove = state.add_listener(on_update)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            remove()
+
+    def ctrl_state_stream(self, maxsize: int = 100) -> AsyncIterator:
+        """
+        Iterate over ctrl_state snapshots as they arrive
+
+        At most ``maxsize`` snapshots are queued; when the consumer falls
+        behind the oldest are dropped (``maxsize=1`` always yields the latest).
+        """
+        return self._stream(self.dog.ctrl_state, maxsize)
+
+    def body_status_stream(self, maxsize: int = 100) -> AsyncIterator:
+        """Iterate over body_status snapshots as they arrive, see ctrl_state_stream"""
+        return self._stream(self.dog.body_status, maxsize)
+
+    async def wait_for(self, predicate: Callable[['AsyncDog'], bool], timeout: Optional[float] = None) -> bool:
+        """
+        Wait until ``predicate(self)`` is true, re-checking on every state message
+
+        Returns:
+            bool: Whether the condition was met (False on timeout)
+        """
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def on_update(_) -> None:
+            try:
+                loop.call_soon_threadsafe(changed.set)
+            except RuntimeError:
+                pass
+
+        async def until() -> None:
+            while True:
+                changed.clear()
+                if predicate(self):
+                    return
+                await changed.wait()
+
+        removers = [self.dog.ctrl_state.add_listener(on_update),
+                    self.dog.body_status.add_listener(on_update)]
+        try:
+            await asyncio.wait_for(until(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            for remove in removers:
+                remove()
+
+    async def wait_until_mode(self, mode: Union[UserMode, int], timeout: Optional[float] = 10.0) -> bool:
+        """Wait until the reported user mode is ``mode``"""
+        mode = int(mode)
+        return await self.wait_for(lambda dog: dog.ctrl_state.user_mode == mode, timeout)
+
+    async def wait_until_standing(self, timeout: Optional[float] = 10.0) -> bool:
+        """Wait until the robot reports standing"""
+        return await self.wait_for(lambda dog: dog.ctrl_state.standing, timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        # Non-blocking Dog features (stats, observe, history, parameter values, ...)
+        return getattr(self.dog, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Assigning a Dog parameter property here would silently send nothing
+        if name in DEFAULT_PARAMS:
+            raise AttributeError(f"Use 'await adog.set_parameters({{{name!r}: ...}})' to set {name}")
+        if isinstance(getattr(Dog, name, None), property):
+            raise AttributeError(f"AsyncDog.{name} cannot be assigned")
+        super().__setattr__(name, value)
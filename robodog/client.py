@@ -1,13 +1,37 @@
-import roslibpy
-from typing import Any, Callable
-from .connection import ROSConnection
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+from .connection import ConnectionPool, default_pool
+from .stats import Stats
+from .transport import Transport
 
 class ROSClient:
     """ROS client wrapper class"""
     
-    def __init__(self, host: str = '10.10.10.10', port: int = 9090):
-        self._conn = ROSConnection()
-        self._conn.setup(host, port)
+    def __init__(self, host: str = '10.10.10.10', port: int = 9090, max_in_flight: int = 16,
+                 pool: Optional[ConnectionPool] = None, transport: Optional[Transport] = None,
+                 stats: Optional[Stats] = None):
+        """
+        Args:
+            host: rosbridge host
+            port: rosbridge port
+            max_in_flight: Maximum number of asynchronous service calls awaiting the robot's
+                answer, including calls whose caller already timed out
+            pool: Pool providing the rosbridge connection (default: process-wide pool)
+            transport: Use this transport instead of a pooled rosbridge connection
+            stats: Statistics to record operation latencies into (default: a new Stats)
+        """
+        self._pool = None if transport is not None else (pool or default_pool)
+        self._conn = transport if transport is not None else self._pool.get(host, port)
+        self._acquired = False
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        # Calls holding a slot: abandon callback -> monotonic deadline
+        self._outstanding: Dict[Callable[[], None], float] = {}
+        self._outstanding_lock = threading.Lock()
+        # Seconds after which a call the transport never answered stops counting as in flight
+        self.pending_timeout = 60.0
+        self.stats = stats if stats is not None else Stats()
 
     def __enter__(self):
         self.connect()
@@ -18,16 +42,33 @@ class ROSClient:
 
     def connect(self):
         """Connect to ROS server"""
-        self._conn.connect()
+        if self._acquired:
+            return
+        if self._pool is None:
+            self._conn.connect()
+        else:
+            self._conn = self._pool.acquire(self._conn.host, self._conn.port)
+        self._acquired = True
 
     def disconnect(self):
-        """Disconnect from ROS server"""
-        self._conn.disconnect()
+        """Disconnect from ROS server (a pooled connection closes when no other client uses it)"""
+        if not self._acquired:
+            return
+        self._acquired = False
+        if self._pool is None:
+            self._conn.disconnect()
+        else:
+            self._pool.release(self._conn)
 
     def reconnect(self):
         """Reconnect to ROS server"""
         self._conn.reconnect()
 
+    @property
+    def connection(self) -> Transport:
+        """Get the connection this client is bound to"""
+        return self._conn
+
     @property
     def client(self):
         """Get underlying ROS client instance"""
@@ -35,13 +76,101 @@ class ROSClient:
 
     def publish(self, topic: str, msg_type: str, message: dict) -> None:
         """Publish message to topic"""
-        publisher = roslibpy.Topic(self.client, topic, msg_type)
+        with self.stats.timer('publish:' + topic):
+            self._conn.publish(topic, msg_type, message)
+
+    def call_service(self, service: str, service_type: str, request: dict,
+                     timeout: Optional[float] = None) -> dict:
+        """Call service, blocking until the response arrives or the timeout expires"""
+        with self.stats.timer('service:' + service):
+            return self._conn.call_service(service, service_type, request, timeout=timeout)
+
+    def call_service_async(self, service: str, service_type: str, request: dict,
+                           timeout: Optional[float] = None) -> Future:
+        """
+        Call service without blocking
+        
+        Args:
+            service: Service name
+            service_type: Service type
+            request: Service request
+            timeout: Seconds to wait for the response before failing with TimeoutError
+            
+        Returns:
+            Future: Resolves to the service response. Fails immediately with
+            RuntimeError when too many calls are already in flight.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        name = 'service:' + service
+        if not self._acquire_slot():
+            self.stats.incr(name + '.rejected')
+            future.set_exception(RuntimeError("Too many service calls in flight"))
+            return future
+
+        # A timed out call is still outstanding at the robot, so its slot is only
+        # freed by the real response or error (or reclaimed after pending_timeout)
+        def release() -> None:
+            with self._outstanding_lock:
+                if self._outstanding.pop(abandon, None) is None:
+                    return
+            self._in_flight.release()
+
+        def abandon() -> None:
+            self.stats.incr(name + '.abandoned')
+            resolve(future.set_exception, TimeoutError(f"No response from {service}"))
+        with self._outstanding_lock:
+            self._outstanding[abandon] = time.monotonic() + self.pending_timeout
+        start = time.perf_counter()
+
+        def record(call: Future) -> None:
+            self.stats.record(name, time.perf_counter() - start)
+            if call.exception() is not None:
+                self.stats.error(name, call.exception())
+        future.add_done_callback(record)
+
+        # The first of response, error or timeout resolves the future
+        resolved = threading.Lock()
+
+        def resolve(setter: Callable, value: Any) -> None:
+            if resolved.acquire(blocking=False):
+                setter(value)
+
+        def succeed(result: Any) -> None:
+            release()
+            resolve(future.set_result, result)
+
+        def fail(error: Any) -> None:
+            release()
+            if not isinstance(error, BaseException):
+                error = self._conn.service_error(error)
+            resolve(future.set_exception, error)
+
         try:
-            publisher.publish(message)
-        finally:
-            publisher.unadvertise()
-
-    def call_service(self, service: str, service_type: str, request: dict) -> dict:
-        """Call service"""
-        service_client = roslibpy.Service(self.client, service, service_type)
-        return service_client.call(request)
\ No newline at end of file
+            self._conn.call_service_async(
+                service,
+                service_type,
+                request,
+                callback=succeed,
+                errback=fail
+            )
+            if timeout is not None:
+                self._conn.call_later(timeout, lambda: resolve(
+                    future.set_exception, TimeoutError(f"No response from {service} within {timeout}s")))
+        except Exception as e:
+            fail(e)
+        return future
+
+    def _acquire_slot(self) -> bool:
+        """Take an in-flight slot, first reclaiming those of calls unanswered for pending_timeout"""
+        if self._in_flight.acquire(blocking=False):
+            return True
+        now = time.monotonic()
+        with self._outstanding_lock:
+            expired = [abandon for abandon, deadline in self._outstanding.items() if deadline <= now]
+            for abandon in expired:
+                del self._outstanding[abandon]
+        for abandon in expired:
+            self._in_flight.release()
+            abandon()
+        return self._in_flight.acquire(blocking=False)
@@ -10,6 +10,12 @@ class UserMode(IntEnum):
     MUTE = 6
     LONG_ENDURANCE = 7
 
+# AlphaDog ROS interface names
+SET_PARAMETERS_SERVICE = '/alphadog_node/set_parameters'
+SET_USER_MODE_TOPIC = '/alphadog_node/set_user_mode'
+CTRL_STATE_TOPIC = '/alphadog_node/dog_ctrl_state'
+BODY_STATUS_TOPIC = '/alphadog_node/body_status'
+
 DEFAULT_PARAMS = {
     # Double parameters
     'vx': 0.0,
@@ -45,3 +51,36 @@ DEFAULT_PARAMS = {
     'action_2': 257,
     'action_3': 273
 }
+
+# 参数范围常量定义 - 整理分组并添加详细注释
+PARAM_RANGES = {
+    # 基础运动参数组
+    'vx': (-4.0, 4.0),             # 前后移动速度(m/s)，向前为正
+    'vy': (-1.0, 1.0),             # 左右移动速度(m/s)，向左为正
+    'wz': (-2.0, 2.0),             # 旋转速度(rad/s)，逆时针(向左转)为正，与 yaw 方向一致
+    
+    # 姿态参数组
+    'roll': (-1, 1),           # 横滚角(rad)
+    'pitch': (-1, 1),          # 俯仰角(rad)
+    'yaw': (-1, 1),            # 偏航角(rad)
+    'body_height': (0.09, 0.35),    # 机体高度(m)
+    'body_tilt_x': (-0.2, 0.2),    # 身体前后偏移(m)
+    'body_tilt_y': (-0.2, 0.2),    # 身体左右偏移(m)
+    
+    # 步态参数组
+    'foot_height': (0.01, 0.26),    # 抬脚高度(m)
+    'swing_duration': (0.1, 5.0),   # 摆动周期(s)
+    'friction': (0.01, 1.0),        # 足底摩擦系数
+    'scale_x': (0.2, 1.8),         # 支撑面X方向缩放比例
+    'scale_y': (0.2, 1.8),         # 支撑面Y方向缩放比例
+    
+    # 特殊动作参数组
+    'swaying_duration': (0.5, 5.0), # 左右摇摆周期(s)
+    'jump_distance': (0.0, 1.0),    # 跳跃距离(m)
+    'jump_angle': (-3.14, 3.14),    # 跳跃旋转角度(rad)
+    
+    # 控制参数组
+    'velocity_decay': (0.0, 1.0),   # 速度衰减比例
+    'decelerate_time': (0.0, 86400.0),      # 减速延迟时间(s)
+    'decelerate_duration': (0.0, 86400.0),   # 减速持续时间(s)
+}
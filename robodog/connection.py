@@ -1,16 +1,55 @@
-import roslibpy
-from typing import Optional
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from .transport import Transport
 
-class ROSConnection:
-    _instance = None
-    _client = None
+if TYPE_CHECKING:
+    import roslibpy
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ROSConnection, cls).__new__(cls)
-            cls._instance.host = '10.10.10.10'  # Default value
-            cls._instance.port = 9090           # Default value
-        return cls._instance
+class _TopicSubscription:
+    """Handle returned by ROSConnection.subscribe, kept valid across reconnects"""
+
+    def __init__(self, conn: 'ROSConnection', topic: str, msg_type: str, callback: Callable,
+                 options: Dict[str, Any]):
+        self._conn = conn
+        self.topic = topic
+        self.msg_type = msg_type
+        self.callback = callback
+        self.options = options
+        self.throttle = (options.get('throttle_rate') or 0) / 1000.0
+        self.last_delivered = 0.0
+
+    def unsubscribe(self) -> None:
+        self._conn._unsubscribe(self)
+
+def _merged_options(subscriptions: Tuple[_TopicSubscription, ...]) -> Dict[str, Any]:
+    """Options of the one upstream subscription serving every handle of a topic"""
+    compressions = {s.options.get('compression') for s in subscriptions}
+    return dict(
+        # The fastest handle sets the rate; slower ones are throttled locally
+        throttle_rate=min(s.options.get('throttle_rate') or 0 for s in subscriptions),
+        queue_length=max(s.options.get('queue_length') or 0 for s in subscriptions),
+        compression=compressions.pop() if len(compressions) == 1 else None,
+    )
+
+class ROSConnection(Transport):
+    """Connection to a single rosbridge server"""
+
+    def __init__(self, host: str = '10.10.10.10', port: int = 9090):
+        self.host = host
+        self.port = port
+        self._client = None
+        # Advertised publishers of the current client, and the (topic, msg_type) registry
+        # kept across reconnects
+        self._publishers = {}
+        self._publisher_keys = set()
+        self._subscriptions: List[_TopicSubscription] = []
+        # Topic -> its handles, and the one upstream listener per topic on the current client.
+        # roslibpy routes messages by topic name only (and Topic.unsubscribe drops every
+        # callback of the topic), so handles sharing this connection share one listener
+        self._handles: Dict[str, Tuple[_TopicSubscription, ...]] = {}
+        self._listeners: Dict[str, Tuple['roslibpy.Topic', Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
 
     def setup(self, host: str = '10.10.10.10', port: int = 9090):
         """Initialize connection configuration"""
@@ -21,21 +60,177 @@ class ROSConnection:
             self.reconnect()
 
     def connect(self):
-        if not self._client:
-            self._client = roslibpy.Ros(host=self.host, port=self.port)
-            self._client.run()
+        with self._lock:
+            if self._client:
+                return
+            # roslibpy (and Twisted) are loaded on the first connection
+            import roslibpy
+            client = roslibpy.Ros(host=self.host, port=self.port)
+            try:
+                client.run()
+            except Exception:
+                self._stop_retrying(client)
+                raise
+            self._client = client
+            publishers = list(self._publisher_keys)
+            topics = list(self._handles)
+        # Restore what was registered before a reconnect
+        for topic, msg_type in publishers:
+            self.publisher(topic, msg_type)
+        for topic in topics:
+            self._listen(topic)
 
     def disconnect(self):
-        """Disconnect from ROS server"""
-        if self._client and self._client.is_connected:
-            self._client.terminate()
-            self._client = None
+        """Disconnect from ROS server, dropping all publishers and subscriptions"""
+        with self._lock:
+            self._publisher_keys.clear()
+            self._subscriptions = []
+            self._handles = {}
+        self._close()
+
+    def _close(self):
+        """Close the current client; publishers and subscriptions are restored by the next ``connect``"""
+        self._unadvertise_all()
+        with self._lock:
+            client, self._client = self._client, None
+            self._listeners = {}
+        # Close only this connection; the shared event loop keeps serving other robots
+        if client and client.is_connected:
+            client.close()
+        elif client:
+            self._stop_retrying(client)
 
     def reconnect(self):
-        """Reconnect to ROS server"""
-        self.disconnect()
+        """Reconnect to ROS server, re-advertising publishers and restoring subscriptions
+
+        If connecting fails, both stay registered and are restored by the next attempt.
+        """
+        self._close()
         self.connect()
 
+    @staticmethod
+    def _stop_retrying(client) -> None:
+        """Stop roslibpy's own reconnect attempts for a client that is being dropped"""
+        factory = getattr(client, 'factory', None)
+        if factory is not None and hasattr(factory, 'stopTrying'):
+            client.call_later(0, factory.stopTrying)
+
+    def publish(self, topic: str, msg_type: str, message: Dict[str, Any]) -> None:
+        """Publish message to topic (publishers are cached per connection)"""
+        self.publisher(topic, msg_type).publish(message)
+
+    def subscribe(self, topic: str, msg_type: str, callback: Callable[[Dict[str, Any]], None],
+                  throttle_rate: int = 0, queue_length: int = 0,
+                  compression: Optional[str] = None) -> '_TopicSubscription':
+        """Subscribe to topic (the subscription is restored by ``reconnect``)"""
+        subscription = _TopicSubscription(self, topic, msg_type, callback,
+                                          dict(compression=compression, throttle_rate=throttle_rate,
+                                               queue_length=queue_length))
+        # Raises ConnectionError before registering when not connected
+        self.client
+        with self._lock:
+            self._subscriptions.append(subscription)
+            self._handles[topic] = self._handles.get(topic, ()) + (subscription,)
+            self._listen(topic)
+        return subscription
+
+    def _listen(self, topic: str) -> None:
+        """Bring the upstream listener of a topic in line with its handles on the current client"""
+        with self._lock:
+            handles = self._handles.get(topic, ())
+            current = self._listeners.get(topic)
+            options = _merged_options(handles) if handles else None
+            if current is not None and current[1] == options:
+                return
+            if current is not None:
+                del self._listeners[topic]
+                if self.is_connected:
+                    current[0].unsubscribe()
+            if not handles or not self.is_connected:
+                # Restored by the next connect
+                return
+            import roslibpy
+            listener = roslibpy.Topic(self.client, topic, handles[0].msg_type, **options)
+            listener.subscribe(lambda message: self._dispatch(topic, message))
+            self._listeners[topic] = (listener, options)
+
+    def _dispatch(self, topic: str, message: Dict[str, Any]) -> None:
+        """Hand a message to every handle of its topic, applying their own throttles"""
+        handles = self._handles.get(topic, ())
+        current = self._listeners.get(topic)
+        upstream = current[1]['throttle_rate'] / 1000.0 if current else 0.0
+        now = time.monotonic()
+        for subscription in handles:
+            if subscription.throttle > upstream:
+                if now - subscription.last_delivered < subscription.throttle:
+                    continue
+                subscription.last_delivered = now
+            try:
+                subscription.callback(message)
+            except Exception as e:
+                # One failing handle must not starve the others
+                print(f"Warning: {topic} callback failed: {e!r}")
+
+    def _unsubscribe(self, subscription: '_TopicSubscription') -> None:
+        """Remove a handle, unsubscribing upstream once the topic has no handles left"""
+        with self._lock:
+            if subscription not in self._subscriptions:
+                return
+            self._subscriptions.remove(subscription)
+            handles = tuple(s for s in self._handles.get(subscription.topic, ()) if s is not subscription)
+            if handles:
+                self._handles[subscription.topic] = handles
+            else:
+                self._handles.pop(subscription.topic, None)
+            self._listen(subscription.topic)
+
+    def call_service(self, service: str, service_type: str, request: Dict[str, Any],
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Call service, blocking until the response arrives or the timeout expires"""
+        import roslibpy
+        return roslibpy.Service(self.client, service, service_type).call(request, timeout=timeout)
+
+    def call_service_async(self, service: str, service_type: str, request: Dict[str, Any],
+                           callback: Callable[[Dict[str, Any]], None], errback: Callable[[Any], None]) -> None:
+        """Call service using roslibpy's callback form"""
+        import roslibpy
+        roslibpy.Service(self.client, service, service_type).call(request, callback=callback, errback=errback)
+
+    def service_error(self, error: Any) -> Exception:
+        """Wrap a rosbridge service failure the way roslibpy's blocking calls do"""
+        from roslibpy.core import ServiceException
+        return ServiceException(error)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Run callback after delay seconds on the roslibpy event loop"""
+        self.client.call_later(delay, callback)
+
+    def publisher(self, topic: str, msg_type: str) -> 'roslibpy.Topic':
+        """Get the advertised publisher for (topic, msg_type), creating it once per connection"""
+        key = (topic, msg_type)
+        with self._lock:
+            publisher = self._publishers.get(key)
+            if publisher is None:
+                import roslibpy
+                publisher = roslibpy.Topic(self.client, topic, msg_type)
+                publisher.advertise()
+                self._publishers[key] = publisher
+                self._publisher_keys.add(key)
+            return publisher
+
+    def _unadvertise_all(self):
+        """Tear down all cached publishers"""
+        with self._lock:
+            publishers = list(self._publishers.values())
+            self._publishers.clear()
+        if not self.is_connected:
+            return
+        for publisher in publishers:
+            try:
+                publisher.unadvertise()
+            except Exception:
+                pass
+
     @property
     def client(self):
         """Get ROS client instance"""
@@ -47,3 +242,65 @@ class ROSConnection:
     def is_connected(self) -> bool:
         """Check if connected"""
         return self._client is not None and self._client.is_connected
+
+class ConnectionPool:
+    """
+    Pool of ROS connections keyed by (host, port)
+
+    Clients for the same robot share one connection. The connection is
+    opened by the first ``acquire`` and closed when the last user releases it.
+    """
+
+    def __init__(self):
+        self._connections: Dict[Tuple[str, int], ROSConnection] = {}
+        self._refs: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str = '10.10.10.10', port: int = 9090) -> ROSConnection:
+        """Get the connection object for a robot without connecting it"""
+        key = (host, port)
+        with self._lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = self._connections[key] = ROSConnection(host, port)
+                self._refs[key] = 0
+            return conn
+
+    def acquire(self, host: str = '10.10.10.10', port: int = 9090) -> ROSConnection:
+        """Get the connection for a robot, connecting it if needed"""
+        conn = self.get(host, port)
+        conn.connect()
+        with self._lock:
+            self._refs[(host, port)] += 1
+        return conn
+
+    def release(self, conn: ROSConnection) -> None:
+        """Release a connection obtained from ``acquire``; the last release disconnects it"""
+        key = (conn.host, conn.port)
+        with self._lock:
+            if self._connections.get(key) is not conn:
+                return
+            self._refs[key] = max(0, self._refs[key] - 1)
+            if self._refs[key]:
+                return
+            del self._connections[key]
+            del self._refs[key]
+        conn.disconnect()
+
+    def close_all(self) -> None:
+        """Disconnect every pooled connection"""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._refs.clear()
+        for conn in connections:
+            conn.disconnect()
+
+    @property
+    def connections(self) -> Dict[Tuple[str, int], ROSConnection]:
+        """Get a snapshot of the pooled connections"""
+        with self._lock:
+            return dict(self._connections)
+
+# Process-wide default pool
+default_pool = ConnectionPool()
@@ -1,11 +1,89 @@
-from typing import Dict, Union, List
-from .config import DEFAULT_PARAMS, UserMode
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Future
+from typing import Dict, Union, List, Optional, Tuple
+from .config import DEFAULT_PARAMS, SET_PARAMETERS_SERVICE, SET_USER_MODE_TOPIC, UserMode
+from .stats import Stats
+
+def as_int(name: str, value) -> int:
+    """Convert an int parameter value, rejecting values with a fractional part"""
+    if value != int(value):
+        raise ValueError(f"{name} must be an integer, got {value!r}")
+    return int(value)
+
+class ParameterRequestBuilder:
+    """
+    Reconfigure request builder with precompiled parameter metadata
+
+    The int/double kind of every known parameter is taken from DEFAULT_PARAMS
+    once, so building a request only fills the given values into the template.
+    Integral floats are accepted for int parameters; other values raise ValueError.
+    The constant parts of the request are shared between requests and must
+    not be modified.
+    """
+    _EMPTY = ()
+    _GROUPS = (
+        {'name': 'Default', 'state': True, 'id': 0, 'parent': 0},
+        {'name': 'remote_controller_config', 'state': True, 'id': 1, 'parent': 0}
+    )
+
+    def __init__(self, defaults: Dict[str, float] = DEFAULT_PARAMS):
+        self._is_int = {name: isinstance(value, int) for name, value in defaults.items()}
+
+    def build(self, params: Dict[str, float]) -> Dict:
+        """Build a request for the given parameter values"""
+        is_int = self._is_int
+        doubles = []
+        ints = []
+        add_double = doubles.append
+        add_int = ints.append
+        for name, value in params.items():
+            if is_int[name]:
+                add_int({'name': name, 'value': value if type(value) is int else as_int(name, value)})
+            else:
+                add_double({'name': name, 'value': value if type(value) is float else float(value)})
+        return {
+            'config': {
+                'doubles': doubles,
+                'ints': ints,
+                'bools': self._EMPTY,
+                'strs': self._EMPTY,
+                'groups': self._GROUPS
+            }
+        }
 
 class DogController:
     """Dog Controller Class"""
     
-    def __init__(self, client):
+    def __init__(self, client, timeout: Optional[float] = 5.0):
+        """
+        Args:
+            client: ROSClient carrying the requests
+            timeout: Default seconds to wait for a parameter acknowledgement (None: forever)
+        """
         self.client = client
+        self.timeout = timeout
+        # Share the client's statistics so failures show up next to the latencies
+        self.stats = getattr(client, 'stats', None) or Stats()
+        # Optional Recorder logging every command sent
+        self.recorder = None
+        self._builder = ParameterRequestBuilder()
+        # Shadow copy of the last configuration acknowledged by the robot
+        self._config = DEFAULT_PARAMS.copy()
+        # Request that last set each acknowledged value, so late responses do not overwrite newer ones
+        self._config_ids: Dict[str, int] = {}
+        # Value of each parameter once every request sent so far is applied
+        self._sent = DEFAULT_PARAMS.copy()
+        # Parameter -> newest in-flight request carrying it
+        self._in_flight: Dict[str, int] = {}
+        self._request_id = 0
+        self._synced = False
+        # Send every requested value when the endpoint keeps the configuration (see Transport.tracks_config)
+        self._send_all = getattr(getattr(client, 'connection', None), 'tracks_config', False)
+        self._lock = threading.Lock()
+        # Held from selecting the parameters until the request is handed to the transport,
+        # so requests reach the robot in the order their values were recorded in _sent
+        self._send_lock = threading.Lock()
 
     def set_user_mode(self, mode: Union[UserMode, int]) -> bool:
         """
@@ -23,70 +101,167 @@ class DogController:
         if not (1 <= mode <= 7):
             raise ValueError("Invalid user mode")
 
+        if self.recorder is not None:
+            self.recorder.set_user_mode(mode)
         try:
             self.client.publish(
-                '/alphadog_node/set_user_mode',
+                SET_USER_MODE_TOPIC,
                 'ros_alphadog/SetUserMode',
                 {'user_mode': mode}
             )
             return True
         except Exception as e:
+            self.stats.error('controller:set_user_mode', e)
             return False
 
-    def set_parameters(self, params: Dict[str, float]) -> bool:
+    def set_parameters(self, params: Dict[str, float], full: bool = False) -> bool:
         """
         Set motion parameters
         
+        Only parameters that differ from the last value sent (acknowledged or
+        still in flight) are sent. The first request after connecting (or
+        after ``resync``/``invalidate``) carries the full configuration.
+        
         Args:
             params: Parameter dictionary, see DEFAULT_PARAMS for available parameters
+            full: Send the full configuration instead of the changed keys only
             
         Returns:
-            bool: Whether the setting was successful
+            bool: Whether the setting was successful (False after ``timeout``)
+        """
+        return self._send_parameters(params, full, self.timeout).result()
+
+    def set_parameters_async(self, params: Dict[str, float], full: bool = False,
+                             timeout: Optional[float] = None) -> Future:
         """
-        # Validate parameters
+        Set motion parameters without blocking
+        
+        Args:
+            params: Parameter dictionary, see DEFAULT_PARAMS for available parameters
+            full: Send the full configuration instead of the changed keys only
+            timeout: Seconds to wait for the acknowledgement (default: ``self.timeout``)
+            
+        Returns:
+            Future: Resolves to whether the setting was successful
+        """
+        return self._send_parameters(params, full, self.timeout if timeout is None else timeout)
+
+    def _send_parameters(self, params: Dict[str, float], full: bool, timeout: Optional[float]) -> Future:
+        """Send the parameters that change the robot's configuration, resolving to success"""
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self._send_lock:
+            to_send, full, request_id, request = self._prepare_parameters(params, full)
+            if not to_send:
+                future.set_result(True)
+                return future
+
+            def on_done(call: Future) -> None:
+                error = call.exception()
+                if error is not None:
+                    self.stats.error('controller:set_parameters', error)
+                future.set_result(self._complete_parameters(
+                    request_id, to_send, full, None if error is not None else call.result()))
+
+            if self.recorder is not None:
+                self.recorder.set_parameters(to_send)
+            call = self.client.call_service_async(
+                SET_PARAMETERS_SERVICE,
+                'dynamic_reconfigure/Reconfigure',
+                request,
+                timeout=timeout
+            )
+        call.add_done_callback(on_done)
+        return future
+
+    def _prepare_parameters(self, params: Dict[str, float],
+                            full: bool) -> Tuple[Dict[str, float], bool, int, Optional[Dict]]:
+        """Validate parameters, select the ones to send, build the request and mark them in flight"""
         for key in params:
             if key not in DEFAULT_PARAMS:
                 raise ValueError(f"Unknown parameter: {key}")
         
-        # Merge with default parameters
-        full_params = DEFAULT_PARAMS.copy()
-        full_params.update(params)
-        
-        request = self._build_parameter_request(full_params)
-        try:
-            result = self.client.call_service(
-                '/alphadog_node/set_parameters',
-                'dynamic_reconfigure/Reconfigure',
-                request
-            )
-            return 'status' in result and result['status']
-        except Exception as e:
+        with self._lock:
+            if self._send_all:
+                to_send = dict(params)
+                full = False
+            elif full or not self._synced:
+                # Merge with the configuration the robot will have once pending requests are applied
+                to_send = self._sent.copy()
+                to_send.update(params)
+                full = True
+            else:
+                to_send = {k: v for k, v in params.items() if self._sent[k] != v}
+                full = False
+            if not to_send:
+                return to_send, full, 0, None
+            # Raises on invalid values before anything is marked in flight
+            request = self._build_parameter_request(to_send)
+            self._request_id += 1
+            self._sent.update(to_send)
+            self._in_flight.update(dict.fromkeys(to_send, self._request_id))
+            return to_send, full, self._request_id, request
+
+    def _complete_parameters(self, request_id: int, sent: Dict[str, float], full: bool, result) -> bool:
+        """Check the response and update the shadow configuration"""
+        acknowledged = self._is_acknowledged(result)
+        if not acknowledged and result is not None:
+            self.stats.incr('controller:set_parameters.rejected')
+        applied = self._applied(sent, result) if acknowledged else {}
+        with self._lock:
+            for name, value in applied.items():
+                if self._config_ids.get(name, 0) <= request_id:
+                    self._config[name] = value
+                    self._config_ids[name] = request_id
+                    # Echoed values of parameters no request is changing are what later deltas compare against
+                    if name not in self._in_flight:
+                        self._sent[name] = value
+            if acknowledged and full:
+                self._synced = True
+            # Parameters not overtaken by a newer request fall back to what the robot acknowledged
+            for name in sent:
+                if self._in_flight.get(name) == request_id:
+                    del self._in_flight[name]
+                    self._sent[name] = self._config[name]
+        return acknowledged
+
+    def resync(self) -> bool:
+        """Send the full shadow configuration to the robot"""
+        return self.set_parameters({}, full=True)
+
+    def invalidate(self) -> None:
+        """Force the next parameter request to carry the full configuration (e.g. after reconnecting)"""
+        with self._lock:
+            self._synced = False
+
+    @property
+    def config(self) -> Dict[str, float]:
+        """Get a copy of the last acknowledged configuration"""
+        with self._lock:
+            return self._config.copy()
+
+    @staticmethod
+    def _is_acknowledged(result) -> bool:
+        """Check whether a Reconfigure response acknowledges the request"""
+        if not isinstance(result, Mapping):
             return False
+        if 'status' in result:
+            return bool(result['status'])
+        return 'config' in result
+
+    def _applied(self, sent: Dict[str, float], result: Dict) -> Dict[str, float]:
+        """Configuration confirmed by a successful request"""
+        applied = dict(sent)
+        # Prefer the configuration echoed back by the robot when available
+        config = result.get('config') or {}
+        for entry in config.get('doubles', []) + config.get('ints', []):
+            if entry.get('name') in self._config:
+                applied[entry['name']] = entry['value']
+        return applied
 
     def _build_parameter_request(self, params: Dict[str, float]) -> Dict:
         """Build parameter request"""
-        doubles = []
-        ints = []
-        
-        # Distinguish between integer and float parameters
-        for k, v in params.items():
-            if isinstance(v, int):
-                ints.append({'name': k, 'value': v})
-            else:
-                doubles.append({'name': k, 'value': float(v)})
-                
-        return {
-            'config': {
-                'doubles': doubles,
-                'ints': ints,
-                'bools': [],
-                'strs': [],
-                'groups': [
-                    {'name': 'Default', 'state': True, 'id': 0, 'parent': 0},
-                    {'name': 'remote_controller_config', 'state': True, 'id': 1, 'parent': 0}
-                ]
-            }
-        }
+        return self._builder.build(params)
 
     # def stand(self) -> bool:
     #     """Make the robot dog stand"""
@@ -1,43 +1,25 @@
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, TypedDict, Union
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Any, Optional, TypedDict, Union
+import threading
 import time
+from concurrent.futures import Future
 from .states import CtrlState, BodyStatus
 from .client import ROSClient
+from .connection import ConnectionPool
+from .transport import Transport
 from .controller import DogController, UserMode
-from .subscriber import DogStateSubscriber
-
-# 参数范围常量定义 - 整理分组并添加详细注释
-PARAM_RANGES = {
-    # 基础运动参数组
-    'vx': (-4.0, 4.0),             # 前后移动速度(m/s)，向前为正
-    'vy': (-1.0, 1.0),             # 左右移动速度(m/s)，向左为正
-    'wz': (-2.0, 2.0),             # 旋转速度(rad/s)，顺时针为正
-    
-    # 姿态参数组
-    'roll': (-1, 1),           # 横滚角(rad)
-    'pitch': (-1, 1),          # 俯仰角(rad)
-    'yaw': (-1, 1),            # 偏航角(rad)
-    'body_height': (0.09, 0.35),    # 机体高度(m)
-    'body_tilt_x': (-0.2, 0.2),    # 身体前后偏移(m)
-    'body_tilt_y': (-0.2, 0.2),    # 身体左右偏移(m)
-    
-    # 步态参数组
-    'foot_height': (0.01, 0.26),    # 抬脚高度(m)
-    'swing_duration': (0.1, 5.0),   # 摆动周期(s)
-    'friction': (0.01, 1.0),        # 足底摩擦系数
-    'scale_x': (0.2, 1.8),         # 支撑面X方向缩放比例
-    'scale_y': (0.2, 1.8),         # 支撑面Y方向缩放比例
-    
-    # 特殊动作参数组
-    'swaying_duration': (0.5, 5.0), # 左右摇摆周期(s)
-    'jump_distance': (0.0, 1.0),    # 跳跃距离(m)
-    'jump_angle': (-3.14, 3.14),    # 跳跃旋转角度(rad)
-    
-    # 控制参数组
-    'velocity_decay': (0.0, 1.0),   # 速度衰减比例
-    'decelerate_time': (0.0, 86400.0),      # 减速延迟时间(s)
-    'decelerate_duration': (0.0, 86400.0),   # 减速持续时间(s)
-}
+from .subscriber import DogStateSubscriber, SubscriptionOptions
+from .scheduler import CommandScheduler
+from .rate import RateLoop
+from .supervisor import ConnectionSupervisor
+from .recorder import Recorder, LogReader, Replayer
+from .predictor import PosePredictor, Pose
+from .config import PARAM_RANGES
+
+if TYPE_CHECKING:
+    from .history import StateHistory
+    from .trajectory import Trajectory, TrajectoryExecutor, TrajectoryResult
+    from .shared_state import SharedStateWriter
 
 def param_property(param_name: str, doc: str = None, get_attr: str = None, type_convert=None):
     """创建参数属性的装饰器工厂
@@ -61,44 +43,331 @@ def param_property(param_name: str, doc: str = None, get_attr: str = None, type_
         
     return property(getter, setter, doc=doc)
 
+class ParamBatch:
+    """参数批量事务：收集属性写入，退出时统一验证并合并为一次请求发送
+
+    嵌套使用时，内层事务并入外层，由最外层统一发送。
+    发送结果保存在 result 中（未发送时为 None）。
+    """
+
+    def __init__(self, dog: 'Dog'):
+        self._dog = dog
+        self._parent = None
+        self.params: Dict[str, float] = {}
+        self.result: Optional[bool] = None
+
+    def __enter__(self):
+        self._parent = self._dog._active_batch()
+        self._dog._local.batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._dog._local.batch = self._parent
+        if exc_type is not None:
+            # 事务体出错时丢弃收集的参数
+            return False
+        if self._parent is not None:
+            self._parent.params.update(self.params)
+            return False
+        if self.params:
+            self.result = self._dog.set_parameters(self.params)
+        return False
+
 class Dog:
     """机器狗统一管理类"""
 
-    def __init__(self, host='10.10.10.10', port=9090):
-        self._client = ROSClient(host, port)
+    def __init__(self, host='10.10.10.10', port=9090, max_command_rate: Optional[float] = None,
+                 pool: Optional[ConnectionPool] = None, history_size: int = 1000,
+                 subscription: Union[str, SubscriptionOptions, None] = None,
+                 transport: Optional[Transport] = None, auto_reconnect: bool = False,
+                 command_timeout: Optional[float] = 5.0):
+        """
+        Args:
+            host: 机器狗地址
+            port: rosbridge 端口
+            max_command_rate: 设置后参数写入经由命令队列发送(每个参数只保留最新值)，
+                该值为每秒最多发送的请求数
+            pool: 连接池(默认使用进程级连接池，同一地址的多个 Dog 共享一个连接)
+            history_size: 机体状态历史记录容量(条)，为 0 时不记录
+            subscription: 状态订阅配置，可为配置名('control' 全速率, 'dashboard' 低速率)
+                或 SubscriptionOptions
+            transport: 自定义传输层(如 SerialTransport)，设置后忽略 host/port/pool
+            auto_reconnect: 断线(连接关闭或状态消息超时)后自动重连，断线期间的命令缓存到恢复后发送，
+                见 ConnectionSupervisor
+            command_timeout: 等待参数设置应答的默认超时(秒)，超时视为失败；None 为一直等待
+        """
+        self._client = ROSClient(host, port, pool=pool, transport=transport)
+        self._max_command_rate = max_command_rate
+        self._command_timeout = command_timeout
+        self._subscription = subscription
         self._controller = None
+        self._scheduler = None
         self._subscriber = None
         self._ctrl_state = CtrlState()
         self._body_status = BodyStatus()
+        # 历史记录在连接或收到第一条机体状态时创建，NumPy 到那时才加载
+        self._history_size = history_size
+        self._history = None
+        self._local = threading.local()
+        self._loops = []
+        # 状态更新时唤醒 wait_for 等待者
+        self._state_changed = threading.Condition()
+        self._waiters = 0
+        self._recorder = None
+        self._shared = None
+        self._predictor = None
+        self._auto_reconnect = auto_reconnect
+        self._supervisor = None
 
     # 基础连接和状态管理方法
-    def connect(self): 
-        """连接到机器狗"""
+    def connect(self, subscription: Union[str, SubscriptionOptions, None] = None):
+        """连接到机器狗
+
+        Args:
+            subscription: 本次连接使用的状态订阅配置(默认使用构造时的配置)
+        """
+        subscription = subscription or self._subscription
         self._client.connect()
-        self._controller = DogController(self._client)
-        self._subscriber = DogStateSubscriber(self)
-        self._subscriber.subscribe_ctrl_state()
-        self._subscriber.subscribe_body_status()
+        self._create_history()
+        self._controller = DogController(self._client, self._command_timeout)
+        self._controller.recorder = self._recorder
+        if self._max_command_rate:
+            self._scheduler = CommandScheduler(self._controller, self._max_command_rate).start()
+        self._subscriber = DogStateSubscriber(self, self._client.connection, self._client.stats)
+        self._subscriber.subscribe_ctrl_state(options=subscription)
+        self._subscriber.subscribe_body_status(options=subscription)
+        if self._auto_reconnect:
+            self._supervisor = ConnectionSupervisor(self).start()
         return self
 
     def disconnect(self):
         """断开连接"""
+        if self._supervisor:
+            self._supervisor.stop(timeout=1.0)
+            self._supervisor = None
+        for loop in self._loops:
+            loop.stop(timeout=1.0)
+        self._loops = []
+        if self._scheduler:
+            self._scheduler.stop(timeout=1.0)
+            self._scheduler = None
         if self._subscriber:
             self._subscriber.unsubscribe_all()
         self._client.disconnect()
+        self.stop_recording()
+        self.stop_sharing()
+
+    def reconnect(self):
+        """重新连接，下一次参数设置会发送完整配置"""
+        self._client.reconnect()
+        if self._controller:
+            self._controller.invalidate()
+        return self
 
     def update_ctrl_state(self, state: Dict[str, Any]) -> None:
         """更新控制状态"""
+        if self._recorder is not None:
+            self._recorder.ctrl_state(state)
         self._ctrl_state.update(state)
+        self._notify_state_changed()
 
-    def update_body_status(self, status: Dict[str, Any]) -> None:
-        """更新机体状态"""
+    def update_body_status(self, status: Dict[str, Any], header: Optional[Dict[str, Any]] = None) -> None:
+        """更新机体状态(header 为消息头，用于估计消息延迟)"""
+        if self._recorder is not None:
+            self._recorder.body_status(status)
         self._body_status.update(status)
+        if self._history is None:
+            self._create_history()
+        if self._history is not None:
+            self._history.append_snapshot(self._body_status.snapshot())
+        if self._predictor is not None:
+            self._predictor.update(self._body_status.snapshot(), header)
+        self._notify_state_changed()
+
+    def _create_history(self) -> None:
+        if self._history is None and self._history_size > 0:
+            from .history import StateHistory
+            self._history = StateHistory(BodyStatus._fields, self._history_size)
+
+    def _notify_state_changed(self) -> None:
+        # 没有等待者时不加锁；等待者在检查条件前登记，因此不会错过这次更新
+        if self._waiters:
+            with self._state_changed:
+                self._state_changed.notify_all()
+
+    def observe(self, field: str, callback: Callable[[str, Any, Any], None],
+                deadband: float = 0.0) -> Callable[[], None]:
+        """字段变化时调用 callback(field, old, new)，只分发给关注该字段的观察者
+
+        Args:
+            field: CtrlState 或 BodyStatus 的字段名(如 'estop'、'user_mode'、'vx')
+            callback: 在订阅线程中调用
+            deadband: 数值字段的死区，相对上次通知的值变化超过该值才通知
+
+        Returns:
+            Callable: 调用后取消观察
+        """
+        state = self._ctrl_state if field in CtrlState._index else self._body_status
+        return state.observe(field, callback, deadband)
+
+    # 事件驱动的状态等待
+    def wait_for(self, predicate: Callable[['Dog'], bool], timeout: Optional[float] = None) -> bool:
+        """阻塞直到 predicate(dog) 为真，每收到一条状态消息重新检查一次
+
+        Args:
+            predicate: 条件函数，参数为当前 Dog
+            timeout: 最长等待时间(s)，None 为一直等待
+
+        Returns:
+            bool: 条件是否满足(超时返回 False)
+        """
+        with self._state_changed:
+            self._waiters += 1
+            try:
+                return self._state_changed.wait_for(lambda: predicate(self), timeout)
+            finally:
+                self._waiters -= 1
+
+    def wait_until_mode(self, mode: Union[UserMode, int], timeout: Optional[float] = 10.0) -> bool:
+        """等待机器狗上报的用户模式变为 mode"""
+        mode = int(mode)
+        return self.wait_for(lambda dog: dog.ctrl_state.user_mode == mode, timeout)
+
+    def wait_until_standing(self, timeout: Optional[float] = 10.0) -> bool:
+        """等待机器狗站立"""
+        return self.wait_for(lambda dog: dog.ctrl_state.standing, timeout)
+
+    # 记录与回放
+    def start_recording(self, path: str, chunk_size: int = 64 * 1024) -> Recorder:
+        """开始将收到的状态和发出的命令记录到二进制日志(断开连接时自动停止)
+
+        Args:
+            path: 日志文件路径(会被覆盖)
+            chunk_size: 每次写入文件的缓冲字节数
+
+        Returns:
+            Recorder: 日志写入器，可用 Replayer 回放
+        """
+        self.stop_recording()
+        self._recorder = Recorder(path, chunk_size)
+        if self._controller:
+            self._controller.recorder = self._recorder
+        return self._recorder
+
+    def stop_recording(self) -> None:
+        """停止记录并关闭日志"""
+        recorder, self._recorder = self._recorder, None
+        if self._controller:
+            self._controller.recorder = None
+        if recorder is not None:
+            recorder.close()
+
+    def replay(self, path: str, speed: Optional[float] = 1.0, on_command=None) -> int:
+        """将日志中的状态回放到本对象(无需连接机器狗)，阻塞直到回放结束
+
+        Args:
+            path: 日志文件路径
+            speed: 回放倍速，None 或 0 为尽快回放
+            on_command: 记录的命令回调 on_command(name, value)
+
+        Returns:
+            int: 回放的记录数
+        """
+        with LogReader(path) as log:
+            return Replayer(log, self, speed, on_command=on_command).run()
+
+    # 延迟补偿的位姿预测
+    def enable_prediction(self, latency: float = 0.0, clock_synced: bool = False, max_horizon: float = 0.5,
+                          use_acceleration: bool = True) -> PosePredictor:
+        """启用位姿预测：按速度、加速度和角速度把最近的 BodyStatus 外推到查询时刻
+
+        Args:
+            latency: 消息头时间戳体现不出的固定延迟(秒)
+            clock_synced: 机器狗与本机时钟已同步，直接用消息头时间戳计算延迟
+            max_horizon: 最长外推时间(秒)，状态消息中断时位姿不会无限外推
+            use_acceleration: 水平方向外推时使用 ax/ay
+
+        Returns:
+            PosePredictor: 预测器(delay 属性为最近一条消息的估计延迟)
+        """
+        predictor = PosePredictor(latency, clock_synced, max_horizon, use_acceleration)
+        snapshot = self._body_status.snapshot()
+        # 尚未收到机体状态时不以默认值初始化，predicted_pose 会报错而不是返回全零位姿
+        if snapshot.seq > 0:
+            predictor.update(snapshot)
+        self._predictor = predictor
+        return predictor
+
+    def predicted_pose(self, t: Optional[float] = None) -> Pose:
+        """预测 t 时刻(time.monotonic()，默认为当前)的位姿，未启用预测时按默认参数启用；
+        尚未收到机体状态时抛出 RuntimeError
+
+        Returns:
+            Pose: (x, y, z, roll, pitch, yaw, t)
+        """
+        if self._predictor is None:
+            self.enable_prediction()
+        return self._predictor.predict(t)
+
+    # 多进程共享状态
+    def share_state(self, name: Optional[str] = None) -> 'SharedStateWriter':
+        """将收到的状态写入共享内存，本机其他进程可用 SharedStateReader 无锁读取(断开连接时自动停止)
+
+        Args:
+            name: 共享内存名称(默认由地址和端口生成)
+
+        Returns:
+            SharedStateWriter: 共享内存写入器
+        """
+        from .shared_state import SharedStateWriter, default_name
+        self.stop_sharing()
+        self._shared = SharedStateWriter(name or default_name(self.host, self.port)).attach(self)
+        return self._shared
+
+    def stop_sharing(self) -> None:
+        """停止共享并删除共享内存"""
+        shared, self._shared = self._shared, None
+        if shared is not None:
+            shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """获取运行统计快照(可直接序列化为 JSON)
+
+        包含各操作(publish:<话题>、service:<服务>、callback:<话题>)的延迟直方图摘要、
+        消息/错误计数、消息到达间隔，以及控制循环的定时统计
+        """
+        snapshot = self._client.stats.snapshot()
+        snapshot['loops'] = [asdict(loop.stats) for loop in self._loops]
+        return snapshot
+
+    def reset_stats(self) -> None:
+        """清空运行统计"""
+        self._client.stats.reset()
 
     def is_state_valid(self) -> bool:
         """检查状态是否有效（未超时）"""
         return self._ctrl_state.is_valid or self._body_status.is_valid
 
+    @property
+    def host(self) -> str:
+        """机器狗地址"""
+        return self._client.connection.host
+
+    @property
+    def port(self) -> int:
+        """rosbridge 端口"""
+        return self._client.connection.port
+
+    @property
+    def supervisor(self) -> Optional[ConnectionSupervisor]:
+        """自动重连监控器(未启用时为 None)"""
+        return self._supervisor
+
+    @property
+    def scheduler(self) -> Optional[CommandScheduler]:
+        """获取命令队列(未启用时为 None)"""
+        return self._scheduler
+
     @property
     def ctrl_state(self):
         """获取控制状态"""
@@ -109,6 +378,11 @@ class Dog:
         """获取机体状态"""
         return self._body_status
 
+    @property
+    def history(self) -> Optional['StateHistory']:
+        """获取机体状态历史记录(未启用、或尚未连接且未收到机体状态时为 None)"""
+        return self._history
+
     # 参数验证和设置
     def _validate_param(self, name: str, value: Union[int, float]) -> None:
         """验证单个参数是否合法"""
@@ -120,14 +394,71 @@ class Dog:
             if not min_val <= value <= max_val:
                 raise ValueError(f"{name} must be between {min_val} and {max_val}")
 
-    def set_parameters(self, params: Dict[str, float]) -> bool:
-        """设置运动参数"""
+    def set_parameters(self, params: Dict[str, float], full: bool = False) -> bool:
+        """设置运动参数(默认只发送变化的参数, full=True 时发送完整配置)
+
+        在 batch() 事务中调用时只记录参数，退出事务时统一发送。
+        """
+        batch = self._active_batch()
+        if batch is not None and not full:
+            batch.params.update(params)
+            return True
         # 验证所有参数
         for name, value in params.items():
             if name in PARAM_RANGES:
                 self._validate_param(name, value)
+        # 断线期间缓存命令，恢复连接后发送
+        if self._supervisor is not None and not self._supervisor.online and self._supervisor.hold(params):
+            return False
+        # 启用命令队列时只排队，由后台线程发送最新值
+        if self._scheduler is not None and not full:
+            self._scheduler.submit(params)
+            return True
         # 调用控制器
-        return self._controller.set_parameters(params)
+        if self._controller.set_parameters(params, full=full):
+            return True
+        # 请求期间检测到断线(如应答超时)时同样缓存，恢复连接后发送
+        if self._supervisor is not None and not self._supervisor.online:
+            self._supervisor.hold(params)
+        return False
+
+    # 批量事务
+    def _active_batch(self) -> Optional[ParamBatch]:
+        """获取当前线程正在进行的事务"""
+        return getattr(self._local, 'batch', None)
+
+    def batch(self) -> ParamBatch:
+        """创建参数批量事务
+
+        用法:
+            with dog.batch() as tx:
+                dog.vx = 0.2
+                dog.wz = 0.1
+            tx.result  # 合并请求的结果
+        """
+        return ParamBatch(self)
+
+    transaction = batch
+
+    def set_parameters_async(self, params: Dict[str, float], full: bool = False,
+                             timeout: Optional[float] = None) -> Future:
+        """非阻塞设置运动参数(不参与 batch 事务)
+
+        Returns:
+            Future: 完成时结果为是否设置成功
+        """
+        for name, value in params.items():
+            if name in PARAM_RANGES:
+                self._validate_param(name, value)
+        if self._supervisor is not None and not self._supervisor.online and self._supervisor.hold(params):
+            future = Future()
+            future.set_result(False)
+            return future
+        return self._controller.set_parameters_async(params, full=full, timeout=timeout)
+
+    def resync(self) -> bool:
+        """向机器狗重新发送完整配置"""
+        return self._controller.resync()
 
     # 基础运动属性
     vx = param_property('vx', '前后移动速度(m/s)')
@@ -199,9 +530,69 @@ class Dog:
         if decelerate_duration is not None: params['decelerate_duration'] = decelerate_duration
         if params: self.set_parameters(params)
 
+    # 定频控制循环
+    def add_control_loop(self, callback, hz: float, spin: float = 0.0005,
+                         on_error: Optional[Callable[[Exception], None]] = None,
+                         stop_on_error: bool = True) -> RateLoop:
+        """注册定频控制回调，callback(dog) 在后台线程中以 hz 频率调用，断开连接时自动停止
+
+        回调抛出异常时打印警告并调用 on_error；stop_on_error 为 True 时循环终止，
+        并发送零速度，避免机器狗保持最后的速度继续运动。
+
+        Args:
+            callback: 控制回调，参数为当前 Dog
+            hz: 调用频率(Hz)
+            spin: 截止时间前忙等的时长(s)，为 0 时只休眠
+            on_error: 回调出错时以异常为参数调用
+            stop_on_error: 回调出错时终止循环(否则跳过本次继续运行)
+
+        Returns:
+            RateLoop: 可通过 stats 查看超时和抖动统计，error 为最近一次异常
+        """
+        def failed(error: Exception) -> None:
+            try:
+                if on_error is not None:
+                    on_error(error)
+            finally:
+                if stop_on_error:
+                    self.set_parameters({'vx': 0.0, 'vy': 0.0, 'wz': 0.0})
+
+        loop = RateLoop(lambda: callback(self), hz, spin, name='robodog-control-loop',
+                        on_error=failed, stop_on_error=stop_on_error).start()
+        self._loops.append(loop)
+        return loop
+
+    def remove_control_loop(self, loop: RateLoop) -> None:
+        """停止并移除控制循环"""
+        loop.stop()
+        if loop in self._loops:
+            self._loops.remove(loop)
+
+    # 轨迹执行
+    def start_trajectory(self, trajectory: 'Trajectory', stop_at_end: bool = True) -> 'TrajectoryExecutor':
+        """在后台线程按轨迹采样频率发送预先计算的速度设定值
+
+        Args:
+            trajectory: 轨迹(Trajectory.ramp/s_curve/arc/waypoints 等)，超出 PARAM_RANGES 时抛出 ValueError
+            stop_at_end: 结束或取消后发送零速度
+
+        Returns:
+            TrajectoryExecutor: 可 wait() 获取跟踪误差结果，或 cancel() 提前停止
+        """
+        from .trajectory import TrajectoryExecutor
+        return TrajectoryExecutor(self, trajectory, stop_at_end).start()
+
+    def run_trajectory(self, trajectory: 'Trajectory', stop_at_end: bool = True) -> 'TrajectoryResult':
+        """执行轨迹并阻塞至结束，返回指令与 BodyStatus 反馈的跟踪误差"""
+        from .trajectory import TrajectoryExecutor
+        return TrajectoryExecutor(self, trajectory, stop_at_end).run()
+
     # 用户模式控制
     def set_user_mode(self, mode: UserMode):
         """设置用户模式"""
+        if self._supervisor is not None and not self._supervisor.online and \
+                self._supervisor.hold(user_mode=int(mode)):
+            return False
         return self._controller.set_user_mode(mode)
 
     # 上下文管理
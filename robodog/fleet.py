@@ -0,0 +1,125 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Union
+from .config import UserMode
+from .dog import Dog
+
+@dataclass
+class FleetResult:
+    """Result of one robot's part in a fleet command"""
+    ok: bool
+    latency: float
+    value: Any = None
+    error: Optional[Exception] = None
+
+class Fleet:
+    """
+    Group of dogs commanded in parallel
+
+    Commands are fanned out to all (or some) dogs on a thread pool, so the
+    robots start within one round trip of each other instead of one after
+    another. Every command returns a ``FleetResult`` per robot.
+    """
+
+    def __init__(self, dogs: Union[Mapping[str, Dog], Iterable[Dog]], max_workers: Optional[int] = None):
+        if isinstance(dogs, Mapping):
+            self._dogs = dict(dogs)
+        else:
+            self._dogs = {}
+            for dog in dogs:
+                # Robots are told apart by (host, port); the port is left out of the name when it is the default
+                name = dog.host if dog.port == 9090 else f'{dog.host}:{dog.port}'
+                if name in self._dogs:
+                    raise ValueError(f"Duplicate dog: {name}")
+                self._dogs[name] = dog
+        # One worker per robot so that every command is in flight at once
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max(1, len(self._dogs)),
+            thread_name_prefix='robodog-fleet'
+        )
+
+    @classmethod
+    def from_hosts(cls, hosts: Iterable[str], port: int = 9090, **kwargs) -> 'Fleet':
+        """Create a fleet with one Dog per host"""
+        return cls({host: Dog(host, port, **kwargs) for host in hosts})
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.disconnect()
+
+    def __len__(self) -> int:
+        return len(self._dogs)
+
+    def __getitem__(self, name: str) -> Dog:
+        return self._dogs[name]
+
+    @property
+    def names(self) -> List[str]:
+        """Get the names of all dogs"""
+        return list(self._dogs)
+
+    def connect(self, names: Optional[Iterable[str]] = None) -> Dict[str, FleetResult]:
+        """Connect dogs in parallel"""
+        return self.run(lambda dog: dog.connect(), names)
+
+    def disconnect(self, names: Optional[Iterable[str]] = None) -> Dict[str, FleetResult]:
+        """Disconnect dogs in parallel"""
+        return self.run(lambda dog: dog.disconnect(), names)
+
+    def close(self) -> None:
+        """Disconnect all dogs and shut down the worker threads"""
+        self.disconnect()
+        self._executor.shutdown(wait=True)
+
+    def set_parameters(self, params: Dict[str, float], names: Optional[Iterable[str]] = None) -> Dict[str, FleetResult]:
+        """Set motion parameters on several dogs at once"""
+        return self.run(lambda dog: dog.set_parameters(params), names)
+
+    def set_user_mode(self, mode: Union[UserMode, int], names: Optional[Iterable[str]] = None) -> Dict[str, FleetResult]:
+        """Set user mode on several dogs at once"""
+        return self.run(lambda dog: dog.set_user_mode(mode), names)
+
+    def run(self, fn: Callable[[Dog], Any], names: Optional[Iterable[str]] = None,
+            timeout: Optional[float] = None) -> Dict[str, FleetResult]:
+        """
+        Call ``fn(dog)`` for the selected dogs in parallel
+
+        Args:
+            fn: Function to apply to each dog
+            names: Dogs to address (default: all)
+            timeout: Seconds to wait for all dogs together
+
+        Returns:
+            Dict[str, FleetResult]: Result and latency per dog. A falsy return
+            value, an exception or missing the timeout marks the robot as failed.
+        """
+        selected = self.names if names is None else list(names)
+        for name in selected:
+            if name not in self._dogs:
+                raise KeyError(f"Unknown dog: {name}")
+
+        def timed(dog: Dog) -> FleetResult:
+            start = time.perf_counter()
+            try:
+                value = fn(dog)
+            except Exception as e:
+                return FleetResult(False, time.perf_counter() - start, error=e)
+            return FleetResult(value is not False, time.perf_counter() - start, value)
+
+        start = time.perf_counter()
+        futures = {name: self._executor.submit(timed, self._dogs[name]) for name in selected}
+        # One deadline for the whole fleet; robots that miss it are reported as failed
+        wait(futures.values(), timeout)
+        elapsed = time.perf_counter() - start
+        results = {}
+        for name, future in futures.items():
+            if future.done():
+                results[name] = future.result()
+            else:
+                future.cancel()
+                results[name] = FleetResult(False, elapsed, error=TimeoutError(f"{name} did not finish within {timeout}s"))
+        return results
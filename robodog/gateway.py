@@ -0,0 +1,441 @@
+"""
+Local gateway sharing one robot connection between many client processes
+
+The gateway holds a single Dog connection to the robot and serves the binary
+framed protocol of the serial transport on a Unix socket. Client processes
+use ``Dog(transport=GatewayTransport(path))`` and work unchanged, while the
+robot's rosbridge only sees the gateway:
+
+* state topics are subscribed once upstream and every message is encoded
+  once and fanned out to the clients subscribed to it, each with its own
+  throttle;
+* parameter writes from all clients are merged (latest value wins) into one
+  Reconfigure request at a time, and every contributing client is answered
+  with that request's result. Clients send every requested value instead of
+  deltas or full configurations of their own, so only the gateway's view of
+  the robot's configuration counts;
+* each client's parameter and user-mode requests are rate limited by a
+  token bucket; rejected parameter requests are answered as failed.
+
+Run ``python -m robodog.gateway 10.10.10.10`` to serve a robot on the socket
+given by ``default_socket_path``.
+"""
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from .dog import Dog
+from .serial_transport import (SerialTransport, FrameDecoder, encode_frame, decode_parameters,
+                               encode_ctrl_state, encode_body_status,
+                               FRAME_SET_PARAMETERS, FRAME_SET_USER_MODE, FRAME_SUBSCRIBE,
+                               FRAME_UNSUBSCRIBE, FRAME_ACK, FRAME_CTRL_STATE, FRAME_BODY_STATUS,
+                               _SUBSCRIBE)
+from .stats import Stats
+
+def default_socket_path(host: str = '10.10.10.10', port: int = 9090) -> str:
+    """Socket path the gateway of a robot listens on when none is given"""
+    return os.path.join(tempfile.gettempdir(), f'robodog-{host}-{port}.sock')
+
+class _SocketPort:
+    """Unix socket offering the part of the pyserial port interface SerialTransport uses"""
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self.is_open = True
+
+    def write(self, data: bytes) -> None:
+        self._sock.sendall(data)
+
+    def read(self, size: int = 65536) -> bytes:
+        try:
+            data = self._sock.recv(size)
+        except OSError:
+            data = b''
+        if not data:
+            self.is_open = False
+        return data
+
+    def close(self) -> None:
+        self.is_open = False
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+class GatewayTransport(SerialTransport):
+    """
+    Transport to a local Gateway instead of the robot
+
+    ``Dog(transport=GatewayTransport())`` talks to the gateway of the default
+    robot using the serial encoding.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Gateway socket (default: default_socket_path())
+        """
+        super().__init__(path or default_socket_path(), 0)
+
+    # Other clients change the configuration behind this one's back
+    tracks_config = True
+
+    def _open(self) -> _SocketPort:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.host)
+        except OSError as e:
+            sock.close()
+            raise ConnectionError(f"No robodog gateway at {self.host}: {e}") from e
+        return _SocketPort(sock)
+
+    def _read_loop(self, port: _SocketPort) -> None:
+        decoder = FrameDecoder()
+        try:
+            while True:
+                data = port.read()
+                if not data:
+                    # Closed by disconnect() or by the gateway
+                    break
+                for frame_type, seq, payload in decoder.feed(data):
+                    self._dispatch(frame_type, seq, payload)
+        finally:
+            self._connection_lost(port, "Gateway connection lost")
+
+class _GatewayClient:
+    """One connected client process"""
+
+    def __init__(self, gateway: 'Gateway', sock: socket.socket):
+        self.gateway = gateway
+        self.sock = sock
+        # State frame type -> minimum seconds between frames sent to this client
+        self.throttles: Dict[int, float] = {}
+        self._last_sent: Dict[int, float] = {}
+        self._tokens = gateway.max_rate
+        self._refilled = time.monotonic()
+        self._out = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def start(self) -> None:
+        threading.Thread(target=self._read_loop, name='robodog-gateway-reader', daemon=True).start()
+        threading.Thread(target=self._write_loop, name='robodog-gateway-writer', daemon=True).start()
+
+    def allow(self) -> bool:
+        """Take a token for one request"""
+        rate = self.gateway.max_rate
+        if not rate:
+            return True
+        now = time.monotonic()
+        self._tokens = min(rate, self._tokens + (now - self._refilled) * rate)
+        self._refilled = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def send(self, frame: bytes) -> None:
+        """Queue a frame, dropping the oldest when the client falls behind"""
+        with self._cond:
+            if self._closed:
+                return
+            if len(self._out) >= self.gateway.queue_size:
+                self._out.popleft()
+                self.gateway.stats.incr('gateway:dropped')
+            self._out.append(frame)
+            self._cond.notify()
+
+    def send_state(self, frame_type: int, frame: bytes, now: float) -> None:
+        throttle = self.throttles.get(frame_type)
+        if throttle is None or now - self._last_sent.get(frame_type, 0.0) < throttle:
+            return
+        self._last_sent[frame_type] = now
+        self.send(frame)
+
+    def ack(self, seq: int, ok: bool) -> None:
+        self.send(encode_frame(FRAME_ACK, seq, bytes([ok])))
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.gateway._remove_client(self)
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._cond:
+                while not self._out and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                frames = b''.join(self._out)
+                self._out.clear()
+            try:
+                self.sock.sendall(frames)
+            except OSError:
+                self.close()
+                return
+
+    def _read_loop(self) -> None:
+        decoder = FrameDecoder()
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except OSError:
+                data = b''
+            if not data:
+                self.close()
+                return
+            for frame_type, seq, payload in decoder.feed(data):
+                try:
+                    self.gateway._handle(self, frame_type, seq, payload)
+                except Exception as e:
+                    self.gateway.stats.error('gateway:request', e)
+                    if frame_type == FRAME_SET_PARAMETERS:
+                        self.ack(seq, False)
+
+class Gateway:
+    """Serves one robot connection to local client processes over a Unix socket"""
+
+    def __init__(self, host: str = '10.10.10.10', port: int = 9090, path: Optional[str] = None,
+                 max_rate: Optional[float] = 50.0, queue_size: int = 64, dog: Optional[Dog] = None,
+                 **kwargs):
+        """
+        Args:
+            host: rosbridge host
+            port: rosbridge port
+            path: Socket to listen on (default: default_socket_path(host, port))
+            max_rate: Parameter and user-mode requests per second allowed per client (None: unlimited)
+            queue_size: Frames queued per client before the oldest are dropped
+            dog: Serve an existing Dog instead of creating one
+            **kwargs: Passed to Dog (e.g. auto_reconnect, subscription)
+        """
+        kwargs.setdefault('history_size', 0)
+        self.dog = dog if dog is not None else Dog(host, port, **kwargs)
+        self.path = path or default_socket_path(host, port)
+        self.max_rate = max_rate
+        self.queue_size = queue_size
+        self.stats = Stats()
+        self._clients: List[_GatewayClient] = []
+        self._clients_lock = threading.Lock()
+        self._pending: Dict[str, float] = {}
+        self._waiting: List[Tuple[_GatewayClient, int]] = []
+        self._cond = threading.Condition()
+        self._running = False
+        self._server = None
+        self._threads = []
+        self._removers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def clients(self) -> int:
+        """Number of connected clients"""
+        return len(self._clients)
+
+    def start(self) -> 'Gateway':
+        """Connect to the robot (unless already connected) and start serving"""
+        if self.dog._controller is None:
+            self.dog.connect()
+        self._server = self._bind()
+        self._running = True
+        self._removers = [
+            self.dog.ctrl_state.add_listener(self._on_ctrl_state),
+            self.dog.body_status.add_listener(self._on_body_status),
+        ]
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name='robodog-gateway-accept', daemon=True),
+            threading.Thread(target=self._send_loop, name='robodog-gateway-sender', daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, disconnect: bool = True) -> None:
+        """Stop serving, answering queued parameter requests first"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for remove in self._removers:
+            remove()
+        self._removers = []
+        if self._server is not None:
+            # Closing alone does not wake a blocked accept() on Linux
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join(2.0)
+        self._threads = []
+        for client in list(self._clients):
+            client.close()
+        if disconnect:
+            self.dog.disconnect()
+
+    def serve_forever(self) -> None:
+        """Serve until interrupted"""
+        if not self._running:
+            self.start()
+        try:
+            while self._running:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _bind(self) -> socket.socket:
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                # Left behind by a gateway that did not shut down cleanly
+                os.unlink(self.path)
+            else:
+                raise RuntimeError(f"A gateway is already serving {self.path}")
+            finally:
+                probe.close()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+        return server
+
+    def _accept_loop(self) -> None:
+        server = self._server
+        while self._running:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                # Raised once stop() closes the listening socket
+                return
+            client = _GatewayClient(self, sock)
+            with self._clients_lock:
+                self._clients = self._clients + [client]
+            self.stats.incr('gateway:clients')
+            client.start()
+
+    def _remove_client(self, client: _GatewayClient) -> None:
+        with self._clients_lock:
+            self._clients = [c for c in self._clients if c is not client]
+
+    def _handle(self, client: _GatewayClient, frame_type: int, seq: int, payload: bytes) -> None:
+        if frame_type == FRAME_SET_PARAMETERS:
+            params = decode_parameters(payload)
+            if not client.allow():
+                self.stats.incr('gateway:rate_limited')
+                client.ack(seq, False)
+                return
+            # Reject invalid values here so they cannot fail the merged request of other clients
+            for name, value in params.items():
+                self.dog._validate_param(name, value)
+            with self._cond:
+                self._pending.update(params)
+                self._waiting.append((client, seq))
+                self._cond.notify_all()
+        elif frame_type == FRAME_SET_USER_MODE:
+            if not client.allow():
+                self.stats.incr('gateway:rate_limited')
+                return
+            self.dog.set_user_mode(payload[0])
+        elif frame_type == FRAME_SUBSCRIBE:
+            state_type, throttle = _SUBSCRIBE.unpack(payload)
+            client.throttles[state_type] = throttle / 1000.0
+            # Start the client off with the latest state instead of waiting for the next message
+            state = self.dog.ctrl_state if state_type == FRAME_CTRL_STATE else self.dog.body_status
+            snapshot = state.snapshot()
+            if snapshot.seq:
+                client.send(self._encode(state_type, snapshot))
+        elif frame_type == FRAME_UNSUBSCRIBE:
+            client.throttles.pop(payload[0], None)
+
+    def _send_loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._running and not self._waiting:
+                    self._cond.wait()
+                if not self._waiting:
+                    return
+                params, waiting = self._pending, self._waiting
+                self._pending, self._waiting = {}, []
+            with self.stats.timer('gateway:set_parameters'):
+                try:
+                    ok = self.dog.set_parameters(params)
+                except Exception as e:
+                    self.stats.error('gateway:set_parameters', e)
+                    ok = False
+            self.stats.incr('gateway:requests', len(waiting))
+            self.stats.incr('gateway:upstream_requests')
+            for client, seq in waiting:
+                client.ack(seq, ok)
+
+    @staticmethod
+    def _encode(frame_type: int, snapshot) -> bytes:
+        values = snapshot._asdict()
+        payload = encode_ctrl_state(values) if frame_type == FRAME_CTRL_STATE else encode_body_status(values)
+        return encode_frame(frame_type, snapshot.seq, payload)
+
+    def _fan_out(self, frame_type: int, snapshot) -> None:
+        clients = [client for client in self._clients if frame_type in client.throttles]
+        if not clients:
+            return
+        frame = self._encode(frame_type, snapshot)
+        now = time.monotonic()
+        for client in clients:
+            client.send_state(frame_type, frame, now)
+
+    def _on_ctrl_state(self, snapshot) -> None:
+        self._fan_out(FRAME_CTRL_STATE, snapshot)
+
+    def _on_body_status(self, snapshot) -> None:
+        self._fan_out(FRAME_BODY_STATUS, snapshot)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Share robot connections with local client processes')
+    parser.add_argument('robots', nargs='*', default=['10.10.10.10'], metavar='HOST[:PORT]',
+                        help='Robots to serve, each on its default_socket_path()')
+    parser.add_argument('--max-rate', type=float, default=50.0,
+                        help='Requests per second allowed per client (0: unlimited)')
+    parser.add_argument('--auto-reconnect', action='store_true', help='Reconnect to robots after dropouts')
+    args = parser.parse_args(argv)
+    gateways = []
+    try:
+        for robot in args.robots:
+            host, _, port = robot.partition(':')
+            gateway = Gateway(host, int(port or 9090), max_rate=args.max_rate or None,
+                              auto_reconnect=args.auto_reconnect).start()
+            gateways.append(gateway)
+            print(f"Serving {host}:{port or 9090} on {gateway.path}")
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for gateway in gateways:
+            gateway.stop()
+
+if __name__ == '__main__':
+    main()
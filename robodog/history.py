@@ -0,0 +1,98 @@
+import time
+import numpy as np
+from typing import Optional, Sequence
+
+class StateHistory:
+    """
+    Fixed-capacity telemetry ring buffer backed by a NumPy structured array
+
+    Each record holds one column per state field plus the monotonic receive
+    time ``t``. Every record is written twice, at ``i`` and ``i + capacity``,
+    so the most recent ``capacity`` records are always one contiguous slice
+    and windows are returned as zero-copy views. Views alias the buffer and
+    are overwritten as new messages arrive; call ``.copy()`` to keep one.
+    """
+
+    def __init__(self, fields: Sequence[str], capacity: int = 1000):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.fields = tuple(fields)
+        self.capacity = capacity
+        self.dtype = np.dtype([(name, 'f8') for name in self.fields] + [('t', 'f8')])
+        self._buf = np.zeros(2 * capacity, dtype=self.dtype)
+        self._count = 0
+
+    def append(self, record: Sequence[float]) -> None:
+        """Append one record ordered as ``fields`` followed by the receive time"""
+        i = self._count % self.capacity
+        record = tuple(record)
+        self._buf[i] = record
+        self._buf[i + self.capacity] = record
+        self._count += 1
+
+    def append_snapshot(self, snapshot) -> None:
+        """Append a state snapshot (fields, ``stamp``, ``seq``)"""
+        self.append(snapshot[:-1])
+
+    def clear(self) -> None:
+        """Drop all records"""
+        self._count = 0
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Number of records appended since creation, including overwritten ones"""
+        return self._count
+
+    def view(self) -> np.ndarray:
+        """Get all retained records, oldest first, as a zero-copy view"""
+        count = self._count
+        n = min(count, self.capacity)
+        end = count % self.capacity + (self.capacity if count >= self.capacity else 0)
+        return self._buf[end - n:end]
+
+    def last(self, seconds: Optional[float] = None, n: Optional[int] = None,
+             now: Optional[float] = None) -> np.ndarray:
+        """
+        Get the most recent records as a zero-copy view
+
+        Args:
+            seconds: Keep records received within this many seconds before ``now``
+            n: Keep at most this many records
+            now: Reference monotonic time (default: current time)
+        """
+        window = self.view()
+        if n is not None:
+            window = window[len(window) - min(n, len(window)):]
+        if seconds is not None:
+            cutoff = (time.monotonic() if now is None else now) - seconds
+            window = window[np.searchsorted(window['t'], cutoff, side='left'):]
+        return window
+
+    def column(self, field: str, seconds: Optional[float] = None, n: Optional[int] = None) -> np.ndarray:
+        """Get one field of the most recent records"""
+        return self.last(seconds, n)[field]
+
+    def mean(self, field: str, seconds: Optional[float] = None, n: Optional[int] = None) -> float:
+        """Mean of a field over the window (nan if empty)"""
+        values = self.column(field, seconds, n)
+        return float(values.mean()) if len(values) else float('nan')
+
+    def max(self, field: str, seconds: Optional[float] = None, n: Optional[int] = None) -> float:
+        """Maximum of a field over the window (nan if empty)"""
+        values = self.column(field, seconds, n)
+        return float(values.max()) if len(values) else float('nan')
+
+    def min(self, field: str, seconds: Optional[float] = None, n: Optional[int] = None) -> float:
+        """Minimum of a field over the window (nan if empty)"""
+        values = self.column(field, seconds, n)
+        return float(values.min()) if len(values) else float('nan')
+
+    def derivative(self, field: str, seconds: Optional[float] = None, n: Optional[int] = None) -> np.ndarray:
+        """Time derivative of a field over the window, using the receive times"""
+        window = self.last(seconds, n)
+        if len(window) < 2:
+            return np.zeros(len(window))
+        return np.gradient(window[field], window['t'])
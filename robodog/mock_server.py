@@ -0,0 +1,344 @@
+"""
+In-process stand-in for the AlphaDog rosbridge server
+
+Implements just enough of the rosbridge v2 protocol over a minimal
+websocket server (standard library only) to exercise this package without
+a robot: the ``/alphadog_node/set_parameters`` service, the
+``/alphadog_node/set_user_mode`` topic and the ctrl_state/body_status
+state topics, with configurable response latency, jitter and publish rates.
+
+Run standalone with ``python -m robodog.mock_server --port 9090``.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import math
+import random
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from .config import (DEFAULT_PARAMS, SET_PARAMETERS_SERVICE, SET_USER_MODE_TOPIC,
+                     CTRL_STATE_TOPIC, BODY_STATUS_TOPIC)
+
+_WS_GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+class _Subscription:
+    """One client subscription to a state topic"""
+    __slots__ = ('client', 'throttle', 'last_sent')
+
+    def __init__(self, client: '_Client', throttle_rate: int):
+        self.client = client
+        self.throttle = throttle_rate / 1000.0
+        self.last_sent = 0.0
+
+class _Client:
+    """Websocket connection of one rosbridge client"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    async def handshake(self) -> bool:
+        request = await self.reader.readuntil(b'\r\n\r\n')
+        key = None
+        for line in request.split(b'\r\n'):
+            name, _, value = line.partition(b':')
+            if name.strip().lower() == b'sec-websocket-key':
+                key = value.strip()
+        if key is None:
+            return False
+        accept = base64.b64encode(hashlib.sha1(key + _WS_GUID).digest())
+        self.writer.write(
+            b'HTTP/1.1 101 Switching Protocols\r\n'
+            b'Upgrade: websocket\r\n'
+            b'Connection: Upgrade\r\n'
+            b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n'
+        )
+        await self.writer.drain()
+        return True
+
+    async def read_message(self) -> Optional[bytes]:
+        """Read one (possibly fragmented) text message, answering control frames"""
+        chunks = []
+        while True:
+            head = await self.reader.readexactly(2)
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+            mask = await self.reader.readexactly(4) if head[1] & 0x80 else None
+            payload = await self.reader.readexactly(length)
+            if mask:
+                key = (mask * (length // 4 + 1))[:length]
+                payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(length, 'big')
+            if opcode == 0x8:
+                self.send_frame(0x8, payload[:2])
+                return None
+            if opcode == 0x9:
+                self.send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            chunks.append(payload)
+            if fin:
+                return b''.join(chunks)
+
+    def send_frame(self, opcode: int, payload: bytes) -> None:
+        if self.closed:
+            return
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        self.writer.write(header + payload)
+
+    def send(self, message: Dict[str, Any]) -> None:
+        self.send_frame(0x1, json.dumps(message).encode('utf-8'))
+
+class MockRosbridgeServer:
+    """
+    Local rosbridge websocket server simulating one AlphaDog
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on (0 picks a free port, see ``port`` after ``start``)
+        latency: Mean service response delay (s)
+        jitter: Maximum uniform deviation added to ``latency`` (s)
+        ctrl_state_rate: ctrl_state publish rate (Hz)
+        body_status_rate: body_status publish rate (Hz)
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 ctrl_state_rate: float = 10.0, body_status_rate: float = 100.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.ctrl_state_rate = ctrl_state_rate
+        self.body_status_rate = body_status_rate
+        self.params = DEFAULT_PARAMS.copy()
+        self.ctrl_state = {
+            'error': False, 'warning': False, 'estop': False, 'user_mode': self.params['user_mode'],
+            'controller_type': self.params['controller_type'], 'action': 0, 'motion_mode': 0,
+            'velocity_controller': 0, 'gait': self.params['gait'], 'standing': True
+        }
+        self.body_status = {name: 0.0 for name in (
+            'x', 'y', 'z', 'roll', 'pitch', 'yaw', 'vx', 'vy', 'vz', 'wx', 'wy', 'wz', 'ax', 'ay', 'az')}
+        self.body_status['z'] = self.params['body_height']
+        # Counters of received requests, readable from any thread
+        self.counters = {'service_calls': 0, 'publishes': 0, 'ctrl_state_sent': 0, 'body_status_sent': 0}
+        self._subscriptions: Dict[str, List[_Subscription]] = {CTRL_STATE_TOPIC: [], BODY_STATUS_TOPIC: []}
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+        # Exception that kept the server from starting, re-raised by start()
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self, timeout: float = 10.0) -> 'MockRosbridgeServer':
+        """Start serving on a background thread
+
+        Raises:
+            OSError: The server could not listen (e.g. the port is in use)
+            TimeoutError: The server did not come up within ``timeout`` seconds
+        """
+        self._ready.clear()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='robodog-mock-rosbridge', daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Mock rosbridge server did not start within {timeout}s")
+        if self._error is not None:
+            self._thread.join()
+            self._thread = None
+            raise self._error
+        return self
+
+    def stop(self) -> None:
+        """Stop serving"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+            self._start_publisher(CTRL_STATE_TOPIC, self.ctrl_state_rate, self._ctrl_state_message, 'ctrl_state_sent')
+            self._start_publisher(BODY_STATUS_TOPIC, self.body_status_rate, self._body_status_message, 'body_status_sent')
+        except BaseException as e:
+            self._error = e
+            self._loop.close()
+            self._loop = None
+            return
+        finally:
+            # Wake start() whether or not the server came up
+            self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            for client in list(self._clients):
+                client.writer.close()
+            # Closed transports end the connection handlers; give them a moment to finish
+            tasks = [t for t in asyncio.all_tasks(self._loop) if not t.done()]
+            if tasks:
+                self._loop.run_until_complete(asyncio.wait(tasks, timeout=1.0))
+            self._loop.close()
+            self._loop = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        client = _Client(reader, writer)
+        self._clients.add(client)
+        try:
+            if not await client.handshake():
+                return
+            while True:
+                payload = await client.read_message()
+                if payload is None:
+                    break
+                self._dispatch(client, json.loads(payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            client.closed = True
+            self._clients.discard(client)
+            for subscriptions in self._subscriptions.values():
+                subscriptions[:] = [s for s in subscriptions if s.client is not client]
+            writer.close()
+
+    def _dispatch(self, client: _Client, message: Dict[str, Any]) -> None:
+        op = message.get('op')
+        if op == 'call_service':
+            self.counters['service_calls'] += 1
+            delay = max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+            self._loop.call_later(delay, self._respond, client, message)
+        elif op == 'publish':
+            self.counters['publishes'] += 1
+            if message.get('topic') == SET_USER_MODE_TOPIC:
+                mode = message.get('msg', {}).get('user_mode')
+                if mode is not None:
+                    self.params['user_mode'] = self.ctrl_state['user_mode'] = mode
+        elif op == 'subscribe':
+            subscriptions = self._subscriptions.get(message.get('topic'))
+            if subscriptions is not None:
+                subscriptions.append(_Subscription(client, message.get('throttle_rate') or 0))
+        elif op == 'unsubscribe':
+            subscriptions = self._subscriptions.get(message.get('topic'))
+            if subscriptions is not None:
+                subscriptions[:] = [s for s in subscriptions if s.client is not client]
+
+    def _respond(self, client: _Client, message: Dict[str, Any]) -> None:
+        response = {'op': 'service_response', 'id': message.get('id'), 'service': message.get('service')}
+        if message.get('service') == SET_PARAMETERS_SERVICE:
+            self._apply_config(message.get('args', {}).get('config', {}))
+            response.update(values={'config': self._config()}, result=True)
+        else:
+            response.update(values=f"Service {message.get('service')} does not exist", result=False)
+        client.send(response)
+
+    def _apply_config(self, config: Dict[str, Any]) -> None:
+        for entry in config.get('doubles', []) + config.get('ints', []):
+            if entry.get('name') in self.params:
+                self.params[entry['name']] = entry['value']
+        for name in ('user_mode', 'gait', 'controller_type'):
+            self.ctrl_state[name] = self.params[name]
+
+    def _config(self) -> Dict[str, Any]:
+        return {
+            'doubles': [{'name': k, 'value': v} for k, v in self.params.items() if isinstance(v, float)],
+            'ints': [{'name': k, 'value': v} for k, v in self.params.items() if not isinstance(v, float)],
+            'bools': [], 'strs': [], 'groups': []
+        }
+
+    def _start_publisher(self, topic: str, rate: float, build, counter: str) -> None:
+        if rate <= 0:
+            return
+        period = 1.0 / rate
+        state = {'seq': 0, 'deadline': self._loop.time()}
+
+        def tick():
+            now = time.monotonic()
+            subscriptions = self._subscriptions[topic]
+            if subscriptions:
+                state['seq'] += 1
+                payload = None
+                for subscription in subscriptions:
+                    if now - subscription.last_sent < subscription.throttle:
+                        continue
+                    if payload is None:
+                        message = {'op': 'publish', 'topic': topic, 'msg': build(state['seq'], period)}
+                        payload = json.dumps(message).encode('utf-8')
+                    subscription.last_sent = now
+                    subscription.client.send_frame(0x1, payload)
+                    self.counters[counter] += 1
+            # Absolute deadlines keep the publish rate from drifting
+            state['deadline'] += period
+            self._loop.call_at(max(state['deadline'], self._loop.time()), tick)
+
+        self._loop.call_soon(tick)
+
+    @staticmethod
+    def _header(seq: int) -> Dict[str, Any]:
+        now = time.time()
+        return {'seq': seq, 'stamp': {'secs': int(now), 'nsecs': int((now % 1) * 1e9)}, 'frame_id': ''}
+
+    def _ctrl_state_message(self, seq: int, dt: float) -> Dict[str, Any]:
+        return {'header': self._header(seq), 'state': dict(self.ctrl_state)}
+
+    def _body_status_message(self, seq: int, dt: float) -> Dict[str, Any]:
+        # Integrate the commanded velocities so that the pose moves plausibly
+        status, params = self.body_status, self.params
+        status['vx'], status['vy'], status['wz'] = params['vx'], params['vy'], params['wz']
+        status['z'] = params['body_height']
+        # vx/vy are body-frame velocities; x/y are in the odometry frame
+        cos_yaw, sin_yaw = math.cos(status['yaw']), math.sin(status['yaw'])
+        status['x'] += (status['vx'] * cos_yaw - status['vy'] * sin_yaw) * dt
+        status['y'] += (status['vx'] * sin_yaw + status['vy'] * cos_yaw) * dt
+        status['yaw'] += status['wz'] * dt
+        return {'header': self._header(seq), 'status': dict(status)}
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='Mock AlphaDog rosbridge server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9090)
+    parser.add_argument('--latency', type=float, default=0.0, help='service response delay (s)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='maximum latency deviation (s)')
+    parser.add_argument('--ctrl-state-rate', type=float, default=10.0, help='ctrl_state rate (Hz)')
+    parser.add_argument('--body-status-rate', type=float, default=100.0, help='body_status rate (Hz)')
+    args = parser.parse_args(argv)
+    try:
+        server = MockRosbridgeServer(args.host, args.port, args.latency, args.jitter,
+                                     args.ctrl_state_rate, args.body_status_rate).start()
+    except OSError as e:
+        parser.exit(1, f"Mock rosbridge could not listen on {args.host}:{args.port}: {e}\n")
+    print(f"Mock rosbridge listening on ws://{server.host}:{server.port}", flush=True)
+    try:
+        while server._thread.is_alive():
+            server._thread.join(0.5)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
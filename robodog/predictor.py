@@ -0,0 +1,118 @@
+import math
+import time
+from collections import deque, namedtuple
+from typing import Any, Dict, Optional
+
+Pose = namedtuple('Pose', ('x', 'y', 'z', 'roll', 'pitch', 'yaw', 't'))
+
+def header_time(header: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Wall-clock time of a ROS header stamp (None if missing or unset)"""
+    stamp = (header or {}).get('stamp')
+    if not isinstance(stamp, dict):
+        return None
+    secs = stamp.get('secs', stamp.get('sec', 0))
+    nsecs = stamp.get('nsecs', stamp.get('nanosec', 0))
+    if not secs and not nsecs:
+        return None
+    return secs + nsecs * 1e-9
+
+class PosePredictor:
+    """
+    Extrapolates the BodyStatus pose to a query time
+
+    Each message is dated to when the robot measured it: its receive time
+    minus the estimated delay. Without synchronized clocks the delay is
+    ``latency`` plus the queueing delay, measured from header stamps as
+    the excess of (receive wall time - stamp) over its minimum in the last
+    ``window`` messages. With ``clock_synced`` the delay is taken from the
+    header stamp directly. The pose is then integrated forward from the
+    body-frame velocities (plus accelerations) and the angular rates.
+    """
+
+    def __init__(self, latency: float = 0.0, clock_synced: bool = False, max_horizon: float = 0.5,
+                 use_acceleration: bool = True, window: int = 200, steps: int = 4):
+        """
+        Args:
+            latency: Fixed measurement-to-receive delay not visible in the header stamps (s)
+            clock_synced: Robot and host clocks agree, so stamps give the full delay
+            max_horizon: Longest extrapolation (s); beyond it the pose is held, so a stalled
+                stream does not send the prediction running off
+            use_acceleration: Include ax/ay in the horizontal extrapolation
+            window: Messages over which the minimum stamp offset is tracked
+            steps: Integration steps per prediction
+        """
+        if steps <= 0:
+            raise ValueError("steps must be positive")
+        self.latency = latency
+        self.clock_synced = clock_synced
+        self.max_horizon = max_horizon
+        self.use_acceleration = use_acceleration
+        self.window = window
+        self.steps = steps
+        # Sliding minimum of the stamp offsets as (message index, offset), increasing
+        self._offsets = deque()
+        self._count = 0
+        # (snapshot, measurement time, delay) of the latest message
+        self._latest = None
+
+    def update(self, snapshot, header: Optional[Dict[str, Any]] = None) -> None:
+        """Add a BodyStatus snapshot (its ``stamp`` is the monotonic receive time)"""
+        delay = self.latency
+        stamp = header_time(header)
+        if stamp is not None:
+            offset = time.time() - stamp
+            if self.clock_synced:
+                delay += max(0.0, offset)
+            else:
+                delay += offset - self._min_offset(offset)
+        delay = min(delay, self.max_horizon)
+        self._latest = (snapshot, snapshot.stamp - delay, delay)
+
+    def _min_offset(self, offset: float) -> float:
+        offsets = self._offsets
+        self._count += 1
+        while offsets and offsets[-1][1] >= offset:
+            offsets.pop()
+        offsets.append((self._count, offset))
+        while offsets[0][0] <= self._count - self.window:
+            offsets.popleft()
+        return offsets[0][1]
+
+    @property
+    def delay(self) -> float:
+        """Estimated age of the latest message when it arrived (s)"""
+        latest = self._latest
+        return latest[2] if latest else 0.0
+
+    def reset(self) -> None:
+        self._offsets.clear()
+        self._count = 0
+        self._latest = None
+
+    def predict(self, t: Optional[float] = None) -> Pose:
+        """
+        Pose at monotonic time ``t`` (default: now)
+
+        Returns:
+            Pose: x, y, z, roll, pitch, yaw extrapolated to ``t``
+        """
+        latest = self._latest
+        if latest is None:
+            raise RuntimeError("No BodyStatus received yet")
+        s, measured, _ = latest
+        if t is None:
+            t = time.monotonic()
+        dt = min(max(t - measured, 0.0), self.max_horizon)
+        ax, ay = (s.ax, s.ay) if self.use_acceleration else (0.0, 0.0)
+        # Midpoint integration of the body-frame velocity rotated by the heading
+        h = dt / self.steps
+        x, y = s.x, s.y
+        for i in range(self.steps):
+            tm = (i + 0.5) * h
+            heading = s.yaw + s.wz * tm
+            vx, vy = s.vx + ax * tm, s.vy + ay * tm
+            cos_h, sin_h = math.cos(heading), math.sin(heading)
+            x += (vx * cos_h - vy * sin_h) * h
+            y += (vx * sin_h + vy * cos_h) * h
+        return Pose(x, y, s.z + s.vz * dt, s.roll + s.wx * dt, s.pitch + s.wy * dt,
+                    math.remainder(s.yaw + s.wz * dt, 2 * math.pi), t)
@@ -0,0 +1,128 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+@dataclass
+class RateStats:
+    """Timing statistics of a fixed-rate loop"""
+    ticks: int = 0
+    overruns: int = 0           # Ticks that started more than one period late
+    skipped: int = 0            # Deadlines dropped to recover from overruns
+    mean_jitter: float = 0.0    # Mean lateness of tick start vs deadline (s)
+    max_jitter: float = 0.0     # Worst lateness of tick start vs deadline (s)
+
+class Rate:
+    """
+    Drift-free fixed-rate ticker on the monotonic clock
+
+    Deadlines are absolute (``start + n * period``), so time spent in the loop
+    body does not accumulate as drift. ``sleep`` blocks in the OS until
+    ``spin`` seconds before the deadline and busy-waits the rest, trading a
+    little CPU for tight deadlines; ``spin=0`` never busy-waits. When a tick
+    is more than a period late, missed deadlines are skipped instead of
+    being run back to back.
+    """
+
+    def __init__(self, hz: float, spin: float = 0.0005):
+        if hz <= 0:
+            raise ValueError("hz must be positive")
+        self.period = 1.0 / hz
+        self.spin = spin
+        self.stats = RateStats()
+        self._deadline = None
+
+    def reset(self) -> None:
+        """Restart the schedule from now"""
+        self._deadline = None
+
+    def sleep(self) -> float:
+        """
+        Wait for the next deadline
+
+        Returns:
+            float: Lateness of this tick in seconds
+        """
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.period
+        remaining = self._deadline - now
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while time.monotonic() < self._deadline:
+            pass
+        now = time.monotonic()
+        late = now - self._deadline
+        if late > self.period:
+            missed = int(late // self.period)
+            self._deadline += missed * self.period
+            self.stats.overruns += 1
+            self.stats.skipped += missed
+        stats = self.stats
+        stats.ticks += 1
+        stats.mean_jitter += (late - stats.mean_jitter) / stats.ticks
+        stats.max_jitter = max(stats.max_jitter, late)
+        return late
+
+class RateLoop:
+    """
+    Runs a callback at a fixed rate on a background thread
+
+    An exception from the callback is logged, kept in ``error`` and passed
+    to ``on_error``; the loop then stops unless ``stop_on_error`` is False.
+    """
+
+    def __init__(self, callback: Callable[[], None], hz: float, spin: float = 0.0005,
+                 name: Optional[str] = None, on_error: Optional[Callable[[Exception], None]] = None,
+                 stop_on_error: bool = True):
+        self.callback = callback
+        self.rate = Rate(hz, spin)
+        self.on_error = on_error
+        self.stop_on_error = stop_on_error
+        self.error: Optional[Exception] = None
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name or 'robodog-rate-loop', daemon=True)
+
+    @property
+    def stats(self) -> RateStats:
+        """Timing statistics of the loop"""
+        return self.rate.stats
+
+    @property
+    def running(self) -> bool:
+        """Check if the loop is running"""
+        return self._thread.is_alive()
+
+    def start(self) -> 'RateLoop':
+        """Start ticking"""
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop ticking and wait for the current tick to finish"""
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.callback()
+            except Exception as e:
+                self._failed(e)
+                if self.stop_on_error:
+                    return
+            self.rate.sleep()
+
+    def _failed(self, error: Exception) -> None:
+        self.error = error
+        self.errors += 1
+        action = "stopping" if self.stop_on_error else "continuing"
+        print(f"Warning: {self._thread.name} callback failed, {action}: {error!r}")
+        if self.on_error is not None:
+            try:
+                self.on_error(error)
+            except Exception as e:
+                print(f"Warning: {self._thread.name} error handler failed: {e!r}")
@@ -0,0 +1,272 @@
+"""
+Record and replay of state streams and controller commands
+
+A log is an append-only binary file (little-endian)::
+
+    file header   magic b'RDLOG002' | wall-clock start time f64
+    chunk         b'CHNK' | payload bytes u32 | records u32 | first t f64 | last t f64
+                  followed by the records of the chunk
+    record        t f64 | type u8 | length u16 | payload
+
+``t`` is the monotonic time in seconds since the recording started. Record
+types and payloads are those of the serial protocol (see serial_transport):
+SET_PARAMETERS, SET_USER_MODE, CTRL_STATE and BODY_STATUS. Records are
+buffered in memory and written one chunk at a time; the chunk headers let a
+reader seek by time without decoding records, and a chunk cut short by a
+crash is ignored.
+"""
+import bisect
+import mmap
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from .serial_transport import (FRAME_SET_PARAMETERS, FRAME_SET_USER_MODE, FRAME_CTRL_STATE,
+                               FRAME_BODY_STATUS, encode_parameters, decode_parameters,
+                               encode_ctrl_state, decode_ctrl_state,
+                               encode_body_status, decode_body_status)
+
+FILE_MAGIC = b'RDLOG002'
+CHUNK_MAGIC = b'CHNK'
+
+RECORD_SET_PARAMETERS = FRAME_SET_PARAMETERS
+RECORD_SET_USER_MODE = FRAME_SET_USER_MODE
+RECORD_CTRL_STATE = FRAME_CTRL_STATE
+RECORD_BODY_STATUS = FRAME_BODY_STATUS
+
+RECORD_NAMES = {
+    RECORD_SET_PARAMETERS: 'set_parameters',
+    RECORD_SET_USER_MODE: 'set_user_mode',
+    RECORD_CTRL_STATE: 'ctrl_state',
+    RECORD_BODY_STATUS: 'body_status',
+}
+
+_FILE_HEADER = struct.Struct('<8sd')
+_CHUNK_HEADER = struct.Struct('<4sIIdd')
+_RECORD = struct.Struct('<dBH')
+
+_DECODERS = {
+    RECORD_SET_PARAMETERS: decode_parameters,
+    RECORD_SET_USER_MODE: lambda payload: payload[0],
+    RECORD_CTRL_STATE: decode_ctrl_state,
+    RECORD_BODY_STATUS: decode_body_status,
+}
+
+class Recorder:
+    """Append-only writer of a state/command log"""
+
+    def __init__(self, path: str, chunk_size: int = 64 * 1024):
+        """
+        Args:
+            path: Log file (overwritten)
+            chunk_size: Buffered bytes written to the file at once
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self._file = open(path, 'wb')
+        self._file.write(_FILE_HEADER.pack(FILE_MAGIC, time.time()))
+        self._start = time.monotonic()
+        self._buf = bytearray()
+        self._records = 0
+        self._first = self._last = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def record(self, record_type: int, payload: bytes, t: Optional[float] = None) -> None:
+        """Append one record (``t`` defaults to now)"""
+        with self._lock:
+            if self._file is None:
+                return
+            if t is None:
+                # Taken under the lock so records from different threads stay in time order
+                t = time.monotonic() - self._start
+            if not self._records:
+                self._first = t
+            self._last = t
+            self._records += 1
+            self._buf += _RECORD.pack(t, record_type, len(payload))
+            self._buf += payload
+            if len(self._buf) >= self.chunk_size:
+                self._write_chunk()
+
+    def ctrl_state(self, state: Dict[str, Any]) -> None:
+        self.record(RECORD_CTRL_STATE, encode_ctrl_state(state))
+
+    def body_status(self, status: Dict[str, Any]) -> None:
+        self.record(RECORD_BODY_STATUS, encode_body_status(status))
+
+    def set_parameters(self, params: Dict[str, Any]) -> None:
+        self.record(RECORD_SET_PARAMETERS, encode_parameters(params))
+
+    def set_user_mode(self, mode: int) -> None:
+        self.record(RECORD_SET_USER_MODE, bytes([int(mode)]))
+
+    def _write_chunk(self) -> None:
+        if self._records:
+            self._file.write(_CHUNK_HEADER.pack(CHUNK_MAGIC, len(self._buf), self._records,
+                                                self._first, self._last))
+            self._file.write(self._buf)
+            self._buf = bytearray()
+            self._records = 0
+
+    def flush(self) -> None:
+        """Write buffered records to the file"""
+        with self._lock:
+            if self._file is not None:
+                self._write_chunk()
+                self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the log"""
+        with self._lock:
+            if self._file is not None:
+                self._write_chunk()
+                self._file.close()
+                self._file = None
+
+class LogReader:
+    """Memory-mapped reader of a log written by Recorder"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _FILE_HEADER.size:
+            raise ValueError(f"Not a robodog log: {path}")
+        magic, self.start_time = _FILE_HEADER.unpack_from(self._map)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"Not a robodog log: {path}")
+        # (payload offset, payload bytes, records, first t, last t) of every complete chunk
+        self._chunks: List[Tuple[int, int, int, float, float]] = []
+        offset = _FILE_HEADER.size
+        while offset + _CHUNK_HEADER.size <= len(self._map):
+            magic, size, records, first, last = _CHUNK_HEADER.unpack_from(self._map, offset)
+            offset += _CHUNK_HEADER.size
+            if magic != CHUNK_MAGIC or offset + size > len(self._map):
+                break
+            self._chunks.append((offset, size, records, first, last))
+            offset += size
+        self._ends = [chunk[4] for chunk in self._chunks]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(chunk[2] for chunk in self._chunks)
+
+    @property
+    def duration(self) -> float:
+        """Time of the last record (s)"""
+        return self._ends[-1] if self._ends else 0.0
+
+    def records(self, start: float = 0.0, end: Optional[float] = None,
+                types: Optional[Tuple[int, ...]] = None) -> Iterator[Tuple[float, int, bytes]]:
+        """Iterate (t, type, payload) in time order, seeking to ``start`` by chunk"""
+        data = self._map
+        for i in range(bisect.bisect_left(self._ends, start), len(self._chunks)):
+            offset, size, _, first, _ = self._chunks[i]
+            if end is not None and first > end:
+                return
+            stop = offset + size
+            while offset < stop:
+                t, record_type, length = _RECORD.unpack_from(data, offset)
+                offset += _RECORD.size
+                if end is not None and t > end:
+                    return
+                if t >= start and (types is None or record_type in types):
+                    yield t, record_type, data[offset:offset + length]
+                offset += length
+
+    def messages(self, start: float = 0.0, end: Optional[float] = None,
+                 types: Optional[Tuple[int, ...]] = None) -> Iterator[Tuple[float, str, Any]]:
+        """Iterate decoded (t, record name, value) in time order"""
+        for t, record_type, payload in self.records(start, end, types):
+            yield t, RECORD_NAMES[record_type], _DECODERS[record_type](payload)
+
+    def close(self) -> None:
+        self._map.close()
+
+class Replayer:
+    """
+    Feeds a recorded log back into a Dog
+
+    State records go to ``Dog.update_ctrl_state``/``update_body_status``, so
+    observers, waiters, history and control loops see them as if they came
+    from the robot. Recorded commands are passed to ``on_command(name, value)``
+    for comparison with what the code under test sends.
+    """
+
+    def __init__(self, log: Union[str, LogReader], dog, speed: Optional[float] = 1.0,
+                 start: float = 0.0, end: Optional[float] = None,
+                 on_command: Optional[Callable[[str, Any], None]] = None):
+        """
+        Args:
+            log: Log path or reader
+            dog: Dog receiving the states (does not need to be connected)
+            speed: Playback speed factor; None or 0 replays as fast as possible
+            start: Log time to start at (s)
+            end: Log time to stop at (s)
+            on_command: Called with recorded commands ('set_parameters', params) / ('set_user_mode', mode)
+        """
+        # A log opened from a path is closed once the replay finishes
+        self._owns_log = isinstance(log, str)
+        self.log = LogReader(log) if self._owns_log else log
+        self.dog = dog
+        self.speed = speed
+        self.start_at = start
+        self.end_at = end
+        self.on_command = on_command
+        self.replayed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self) -> int:
+        """Replay in the calling thread, returning the number of records fed"""
+        begin = time.monotonic()
+        try:
+            for t, name, value in self.log.messages(self.start_at, self.end_at):
+                if self._stop.is_set():
+                    break
+                if self.speed:
+                    delay = begin + (t - self.start_at) / self.speed - time.monotonic()
+                    if delay > 0 and self._stop.wait(delay):
+                        break
+                if name == 'ctrl_state':
+                    self.dog.update_ctrl_state(value)
+                elif name == 'body_status':
+                    self.dog.update_body_status(value)
+                elif self.on_command:
+                    self.on_command(name, value)
+                self.replayed += 1
+        finally:
+            if self._owns_log:
+                self.log.close()
+        return self.replayed
+
+    def start(self) -> 'Replayer':
+        """Replay on a background thread"""
+        self._thread = threading.Thread(target=self.run, name='robodog-replay', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop replaying"""
+        self._stop.set()
+        self.join()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """Wait for a background replay to finish"""
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
@@ -0,0 +1,142 @@
+import threading
+import time
+from typing import Dict, Optional
+from .config import DEFAULT_PARAMS
+from .controller import as_int
+from .stats import Stats
+
+class CommandScheduler:
+    """
+    Latest-value-wins command queue in front of DogController
+
+    Holds one pending slot per parameter. A newer value overwrites an unsent
+    older one, and a single background sender drains all pending slots into
+    one request at most ``max_rate`` times per second. Latency is therefore
+    bounded by one round trip instead of the length of a request backlog.
+
+    Values of a failed request are retried up to ``max_retries`` times unless
+    a newer value replaces them; then they are dropped and the failure is
+    kept in ``last_error`` and the controller's statistics. Exceptions raised
+    by the controller itself are not retried.
+    """
+
+    def __init__(self, controller, max_rate: float = 50.0, max_retries: int = 3):
+        if max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+        self.controller = controller
+        self.max_rate = max_rate
+        self.max_retries = max_retries
+        self.stats = getattr(controller, 'stats', None) or Stats()
+        self.last_result: Optional[bool] = None
+        self.last_error: Optional[Exception] = None
+        self._pending: Dict[str, float] = {}
+        # Failed attempts of each pending value, reset when a newer value is submitted
+        self._attempts: Dict[str, int] = {}
+        self._cond = threading.Condition()
+        self._sending = False
+        self._running = False
+        self._thread = None
+
+    def start(self) -> 'CommandScheduler':
+        """Start the background sender"""
+        with self._cond:
+            if self._running:
+                return self
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name='robodog-command-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop the background sender, optionally waiting for pending commands to be sent first"""
+        if flush:
+            self.flush(timeout)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, params: Dict[str, float]) -> None:
+        """Queue parameters, replacing any unsent values for the same keys"""
+        for key, value in params.items():
+            if key not in DEFAULT_PARAMS:
+                raise ValueError(f"Unknown parameter: {key}")
+            if isinstance(DEFAULT_PARAMS[key], int) and type(value) is not int:
+                # Rejected here, since a failing value would be retried forever
+                as_int(key, value)
+        with self._cond:
+            self._pending.update(params)
+            for key in params:
+                self._attempts.pop(key, None)
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all pending commands have been sent"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._running or (not self._pending and not self._sending), timeout)
+
+    @property
+    def pending(self) -> Dict[str, float]:
+        """Get a copy of the unsent parameters"""
+        with self._cond:
+            return dict(self._pending)
+
+    def _run(self) -> None:
+        period = 1.0 / self.max_rate
+        next_send = time.monotonic()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or not self._running)
+                if not self._running:
+                    return
+            # Let newer values accumulate until the next send slot
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                params, self._pending = self._pending, {}
+                self._sending = True
+            next_send = time.monotonic() + period
+            error = None
+            try:
+                result = self.controller.set_parameters(params)
+            except Exception as e:
+                result, error = False, e
+            with self._cond:
+                self.last_result = result
+                if result:
+                    for key in params:
+                        self._attempts.pop(key, None)
+                elif error is not None:
+                    self._drop(params, error)
+                else:
+                    self._retry(params)
+                self._sending = False
+                self._cond.notify_all()
+
+    def _retry(self, params: Dict[str, float]) -> None:
+        """Queue failed values again unless they were superseded or ran out of retries"""
+        dropped = {}
+        for key, value in params.items():
+            if key in self._pending:
+                continue
+            attempts = self._attempts.get(key, 0) + 1
+            if attempts > self.max_retries:
+                dropped[key] = value
+            else:
+                self._attempts[key] = attempts
+                self._pending[key] = value
+                self.stats.incr('scheduler:retries')
+        if dropped:
+            self._drop(dropped, RuntimeError(
+                f"Parameters not acknowledged after {self.max_retries + 1} attempts: {dropped}"))
+
+    def _drop(self, params: Dict[str, float], error: Exception) -> None:
+        for key in params:
+            self._attempts.pop(key, None)
+        self.last_error = error
+        self.stats.error('scheduler:set_parameters', error)
+        self.stats.incr('scheduler:dropped', len(params))
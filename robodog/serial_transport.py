@@ -0,0 +1,369 @@
+"""
+Serial transport speaking a compact binary framed protocol
+
+Every frame is::
+
+    magic 0xA5 0x5A | type u8 | seq u16 | length u16 | payload | crc u16
+
+with little-endian integers and a CRC-16/CCITT (``binascii.crc_hqx``,
+initial value 0xFFFF) over type, seq, length and payload.
+
+Frame types and payloads:
+
+    0x01 SET_PARAMETERS  repeated (param id u8, value) where the id indexes
+                         PARAM_NAMES and the value is f64 for double and
+                         i32 for integer parameters
+    0x02 SET_USER_MODE   mode u8
+    0x03 SUBSCRIBE       state frame type u8, throttle u16 (ms)
+    0x04 UNSUBSCRIBE     state frame type u8
+    0x80 ACK             status u8, answering the request with the same seq
+    0x10 CTRL_STATE      flags u8 (error, warning, estop, standing) + 6 x i32
+    0x11 BODY_STATUS     15 x f32 in BodyStatus field order
+"""
+import binascii
+import struct
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from .config import (DEFAULT_PARAMS, SET_PARAMETERS_SERVICE, SET_USER_MODE_TOPIC,
+                     CTRL_STATE_TOPIC, BODY_STATUS_TOPIC)
+from .states import BodyStatus
+from .transport import Transport
+
+MAGIC = b'\xa5\x5a'
+FRAME_SET_PARAMETERS = 0x01
+FRAME_SET_USER_MODE = 0x02
+FRAME_SUBSCRIBE = 0x03
+FRAME_UNSUBSCRIBE = 0x04
+FRAME_ACK = 0x80
+FRAME_CTRL_STATE = 0x10
+FRAME_BODY_STATUS = 0x11
+
+PARAM_NAMES = tuple(DEFAULT_PARAMS)
+PARAM_IDS = {name: i for i, name in enumerate(PARAM_NAMES)}
+
+_HEADER = struct.Struct('<BHH')
+_CRC = struct.Struct('<H')
+_DOUBLE_ENTRY = struct.Struct('<Bd')
+_INT_ENTRY = struct.Struct('<Bi')
+_CTRL_STATE = struct.Struct('<B6i')
+_BODY_STATUS = struct.Struct('<%df' % len(BodyStatus._fields))
+_SUBSCRIBE = struct.Struct('<BH')
+
+_CTRL_FLAGS = ('error', 'warning', 'estop', 'standing')
+_CTRL_INTS = ('user_mode', 'controller_type', 'action', 'motion_mode', 'velocity_controller', 'gait')
+_TOPIC_FRAMES = {CTRL_STATE_TOPIC: FRAME_CTRL_STATE, BODY_STATUS_TOPIC: FRAME_BODY_STATUS}
+
+def encode_frame(frame_type: int, seq: int, payload: bytes = b'') -> bytes:
+    """Build a complete frame"""
+    body = _HEADER.pack(frame_type, seq & 0xFFFF, len(payload)) + payload
+    return MAGIC + body + _CRC.pack(binascii.crc_hqx(body, 0xFFFF))
+
+class FrameDecoder:
+    """Incremental frame parser that resynchronises on the magic bytes after corruption"""
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple[int, int, bytes]]:
+        """Add received bytes, returning the complete (type, seq, payload) frames"""
+        buf = self._buf
+        buf += data
+        frames = []
+        while True:
+            start = buf.find(MAGIC)
+            if start < 0:
+                # Keep a trailing first magic byte that may start the next frame
+                del buf[:max(0, len(buf) - 1)]
+                return frames
+            del buf[:start]
+            if len(buf) < 2 + _HEADER.size:
+                return frames
+            frame_type, seq, length = _HEADER.unpack_from(buf, 2)
+            end = 2 + _HEADER.size + length
+            if len(buf) < end + _CRC.size:
+                return frames
+            body = bytes(buf[2:end])
+            if _CRC.unpack_from(buf, end)[0] == binascii.crc_hqx(body, 0xFFFF):
+                frames.append((frame_type, seq, body[_HEADER.size:]))
+                del buf[:end + _CRC.size]
+            else:
+                del buf[:2]
+
+def encode_parameters(params: Dict[str, Any]) -> bytes:
+    """Encode parameter values as SET_PARAMETERS payload"""
+    parts = []
+    for name, value in params.items():
+        if name not in PARAM_IDS:
+            raise ValueError(f"Unknown parameter: {name}")
+        if isinstance(DEFAULT_PARAMS[name], int):
+            parts.append(_INT_ENTRY.pack(PARAM_IDS[name], int(value)))
+        else:
+            parts.append(_DOUBLE_ENTRY.pack(PARAM_IDS[name], float(value)))
+    return b''.join(parts)
+
+def decode_parameters(payload: bytes) -> Dict[str, Any]:
+    """Decode a SET_PARAMETERS payload"""
+    params = {}
+    offset = 0
+    while offset < len(payload):
+        name = PARAM_NAMES[payload[offset]]
+        entry = _INT_ENTRY if isinstance(DEFAULT_PARAMS[name], int) else _DOUBLE_ENTRY
+        params[name] = entry.unpack_from(payload, offset)[1]
+        offset += entry.size
+    return params
+
+def encode_ctrl_state(state: Dict[str, Any]) -> bytes:
+    """Encode a ctrl_state dictionary as CTRL_STATE payload"""
+    flags = sum(1 << i for i, name in enumerate(_CTRL_FLAGS) if state.get(name))
+    return _CTRL_STATE.pack(flags, *(int(state.get(name, 0)) for name in _CTRL_INTS))
+
+def decode_ctrl_state(payload: bytes) -> Dict[str, Any]:
+    """Decode a CTRL_STATE payload"""
+    values = _CTRL_STATE.unpack(payload)
+    state = {name: bool(values[0] >> i & 1) for i, name in enumerate(_CTRL_FLAGS)}
+    state.update(zip(_CTRL_INTS, values[1:]))
+    return state
+
+def encode_body_status(status: Dict[str, Any]) -> bytes:
+    """Encode a body_status dictionary as BODY_STATUS payload"""
+    return _BODY_STATUS.pack(*(float(status.get(name, 0.0)) for name in BodyStatus._fields))
+
+def decode_body_status(payload: bytes) -> Dict[str, float]:
+    """Decode a BODY_STATUS payload"""
+    return dict(zip(BodyStatus._fields, _BODY_STATUS.unpack(payload)))
+
+class _SerialSubscription:
+    """Handle returned by SerialTransport.subscribe"""
+
+    def __init__(self, transport: 'SerialTransport', frame_type: int, callback: Callable, throttle_rate: int):
+        self._transport = transport
+        self.frame_type = frame_type
+        self.callback = callback
+        self.throttle_rate = throttle_rate
+
+    def unsubscribe(self) -> None:
+        self._transport._unsubscribe(self)
+
+class SerialTransport(Transport):
+    """
+    Transport over a serial device using the binary framed protocol
+
+    Carries the same parameter, user-mode and state operations as rosbridge,
+    so ``Dog(transport=SerialTransport('/dev/ttyUSB0'))`` works unchanged.
+    Any device path pyserial accepts works, including one end of a pty pair.
+    """
+
+    def __init__(self, device: str, baudrate: int = 921600):
+        self.host = device
+        self.port = baudrate
+        self._serial = None
+        self._reader = None
+        self._seq = 0
+        # seq -> (callback, errback, send time) of requests awaiting an ACK
+        self._pending: Dict[int, Tuple[Callable, Callable, float]] = {}
+        # Seconds after which an unanswered request is dropped (its caller has given up long before)
+        self.pending_timeout = 60.0
+        # Exceptions raised by subscription callbacks, which do not stop the reader
+        self.callback_errors = 0
+        self.last_error: Optional[Exception] = None
+        self._subscriptions: Dict[int, List[_SerialSubscription]] = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def connect(self) -> None:
+        with self._lock:
+            if self._serial is not None:
+                return
+            self._serial = self._open()
+        self._reader = threading.Thread(target=self._read_loop, args=(self._serial,),
+                                        name='robodog-serial-reader', daemon=True)
+        self._reader.start()
+
+    def _open(self):
+        """Open the byte stream carrying the frames"""
+        # pyserial is only needed once a port is opened; the codecs above work without it
+        import serial
+        return serial.Serial(self.host, self.port, timeout=0.05)
+
+    def disconnect(self) -> None:
+        with self._lock:
+            port, self._serial = self._serial, None
+            pending, self._pending = self._pending, {}
+        if port is None:
+            return
+        port.close()
+        if self._reader is not None and self._reader is not threading.current_thread():
+            self._reader.join()
+        for _, errback, _ in pending.values():
+            errback("Serial transport disconnected")
+
+    def _fail_pending(self, reason: str) -> None:
+        """Fail every request still waiting for an ACK"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for _, errback, _ in pending.values():
+            errback(reason)
+
+    def reconnect(self) -> None:
+        """Reopen the device and restore state subscriptions"""
+        self.disconnect()
+        self.connect()
+        with self._lock:
+            subscriptions = [s for group in self._subscriptions.values() for s in group]
+        for subscription in subscriptions:
+            self._send(FRAME_SUBSCRIBE, _SUBSCRIBE.pack(subscription.frame_type, subscription.throttle_rate))
+
+    @property
+    def is_connected(self) -> bool:
+        port = self._serial
+        return port is not None and port.is_open
+
+    @property
+    def client(self):
+        """Get the underlying pyserial port"""
+        if not self.is_connected:
+            raise ConnectionError("Serial transport not connected")
+        return self._serial
+
+    def publish(self, topic: str, msg_type: str, message: Dict[str, Any]) -> None:
+        if topic != SET_USER_MODE_TOPIC:
+            raise ValueError(f"Topic not supported by serial transport: {topic}")
+        self._send(FRAME_SET_USER_MODE, bytes([int(message['user_mode'])]))
+
+    def subscribe(self, topic: str, msg_type: str, callback: Callable[[Dict[str, Any]], None],
+                  throttle_rate: int = 0, queue_length: int = 0,
+                  compression: Optional[str] = None) -> _SerialSubscription:
+        if topic not in _TOPIC_FRAMES:
+            raise ValueError(f"Topic not supported by serial transport: {topic}")
+        subscription = _SerialSubscription(self, _TOPIC_FRAMES[topic], callback, throttle_rate)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.frame_type, []).append(subscription)
+        self._send(FRAME_SUBSCRIBE, _SUBSCRIBE.pack(subscription.frame_type, throttle_rate))
+        return subscription
+
+    def _unsubscribe(self, subscription: _SerialSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.frame_type, [])
+            if subscription not in subscriptions:
+                return
+            subscriptions.remove(subscription)
+            last = not subscriptions
+        if last and self.is_connected:
+            self._send(FRAME_UNSUBSCRIBE, bytes([subscription.frame_type]))
+
+    def call_service(self, service: str, service_type: str, request: Dict[str, Any],
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        done = threading.Event()
+        outcome = {}
+
+        def callback(result):
+            outcome['result'] = result
+            done.set()
+
+        def errback(error):
+            outcome['error'] = error
+            done.set()
+
+        seq = self._request(service, request, callback, errback)
+        if not done.wait(timeout):
+            with self._lock:
+                self._pending.pop(seq, None)
+            raise TimeoutError(f"No response from {service} within {timeout}s")
+        if 'error' in outcome:
+            raise ConnectionError(outcome['error'])
+        return outcome['result']
+
+    def call_service_async(self, service: str, service_type: str, request: Dict[str, Any],
+                           callback: Callable[[Dict[str, Any]], None], errback: Callable[[Any], None]) -> None:
+        self._request(service, request, callback, errback)
+
+    def _request(self, service: str, request: Dict[str, Any], callback: Callable, errback: Callable) -> int:
+        """Send a SET_PARAMETERS request, returning its seq"""
+        if service != SET_PARAMETERS_SERVICE:
+            raise ValueError(f"Service not supported by serial transport: {service}")
+        config = request.get('config', {})
+        params = {entry['name']: entry['value'] for entry in config.get('doubles', []) + config.get('ints', [])}
+        payload = encode_parameters(params)
+        now = time.monotonic()
+        with self._lock:
+            # Requests whose ACK was lost would otherwise stay pending until the seq wraps around
+            expired = [seq for seq, (_, _, sent) in self._pending.items() if now - sent > self.pending_timeout]
+            expired = [self._pending.pop(seq) for seq in expired]
+            self._seq = (self._seq + 1) & 0xFFFF
+            seq = self._seq
+            self._pending[seq] = (callback, errback, now)
+        for _, expired_errback, _ in expired:
+            expired_errback("No acknowledgement received")
+        try:
+            self._send(FRAME_SET_PARAMETERS, payload, seq)
+        except Exception:
+            with self._lock:
+                self._pending.pop(seq, None)
+            raise
+        return seq
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        timer = threading.Timer(delay, callback)
+        timer.daemon = True
+        timer.start()
+
+    def _send(self, frame_type: int, payload: bytes, seq: int = 0) -> None:
+        frame = encode_frame(frame_type, seq, payload)
+        with self._write_lock:
+            self.client.write(frame)
+
+    def _read_loop(self, port) -> None:
+        import serial
+        decoder = FrameDecoder()
+        try:
+            while True:
+                try:
+                    data = port.read(port.in_waiting or 1)
+                except (serial.SerialException, OSError, TypeError, AttributeError):
+                    # Raised once the port is closed by disconnect()
+                    break
+                if not port.is_open:
+                    break
+                for frame_type, seq, payload in decoder.feed(data):
+                    self._dispatch(frame_type, seq, payload)
+        finally:
+            self._connection_lost(port, "Serial transport connection lost")
+
+    def _connection_lost(self, port, reason: str) -> None:
+        """Mark the transport disconnected once its reader stops, failing the requests awaiting an ACK"""
+        with self._lock:
+            if self._serial is port:
+                # Not closed by disconnect(): is_connected turns False so a supervisor reconnects
+                self._serial = None
+        try:
+            port.close()
+        except Exception:
+            pass
+        # No ACK can arrive any more
+        self._fail_pending(reason)
+
+    def _dispatch(self, frame_type: int, seq: int, payload: bytes) -> None:
+        if frame_type == FRAME_ACK:
+            with self._lock:
+                handlers = self._pending.pop(seq, None)
+            if handlers:
+                self._call(handlers[0], {'status': bool(payload and payload[0])})
+            return
+        if frame_type == FRAME_CTRL_STATE:
+            message = {'header': {'seq': seq}, 'state': decode_ctrl_state(payload)}
+        elif frame_type == FRAME_BODY_STATUS:
+            message = {'header': {'seq': seq}, 'status': decode_body_status(payload)}
+        else:
+            return
+        for subscription in list(self._subscriptions.get(frame_type, ())):
+            self._call(subscription.callback, message)
+
+    def _call(self, callback: Callable, message: Dict[str, Any]) -> None:
+        """Run a callback on the reader thread, keeping the reader alive if it raises"""
+        try:
+            callback(message)
+        except Exception as e:
+            self.callback_errors += 1
+            self.last_error = e
+            print(f"Warning: serial transport callback failed: {e!r}")
@@ -0,0 +1,211 @@
+"""
+Shared-memory fan-out of a Dog's state to other local processes
+
+The owning process (the one with the rosbridge connection) writes every
+CtrlState and BodyStatus update into a ``multiprocessing.shared_memory``
+block; other processes attach to it by name and read snapshots without any
+connection, decoding or lock. Layout (little-endian)::
+
+    header        magic b'RDSM' | version u16 | reserved u16
+    per state     sequence u64 | stamp f64 | update seq u64 | fields
+
+with bools stored as u8, ints as i64 and floats as f64, in field order.
+Each state is guarded by a seqlock: the single writer makes the sequence
+odd, writes the fields and makes it even again; readers retry until they
+read the same even sequence before and after copying the fields. ``stamp``
+is the owner's ``time.monotonic()``, which is system-wide on Linux.
+"""
+import os
+import mmap
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Tuple, Type
+from .states import StateManager, CtrlState, BodyStatus
+
+MAGIC = b'RDSM'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHH')
+_SEQ = struct.Struct('<Q')
+_STATES = (('ctrl_state', CtrlState), ('body_status', BodyStatus))
+
+def _payload_struct(state_cls: Type[StateManager]) -> struct.Struct:
+    codes = {bool: 'B', int: 'q', float: 'd'}
+    return struct.Struct('<dQ' + ''.join(codes[type(value)] for value in state_cls._defaults))
+
+def _layout() -> Tuple[int, Tuple[Tuple[str, Type[StateManager], int, struct.Struct], ...]]:
+    """Total size and (name, class, offset, payload struct) of every state"""
+    offset = _HEADER.size
+    entries = []
+    for name, state_cls in _STATES:
+        payload = _payload_struct(state_cls)
+        entries.append((name, state_cls, offset, payload))
+        # Keep every sequence counter 8-byte aligned
+        offset += _SEQ.size + (payload.size + 7) // 8 * 8
+    return offset, tuple(entries)
+
+SIZE, _ENTRIES = _layout()
+
+def default_name(host: str, port: int) -> str:
+    """Shared memory name used for a robot when none is given"""
+    return 'robodog_' + f'{host}_{port}'.replace('.', '_').replace('/', '_').replace(':', '_')
+
+class SharedStateWriter:
+    """Publishes a Dog's state updates into a new shared memory block"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._shm = shared_memory.SharedMemory(name, create=True, size=SIZE)
+        self._buf = self._shm.buf
+        _HEADER.pack_into(self._buf, 0, MAGIC, VERSION, 0)
+        self._removers = []
+
+    def attach(self, dog) -> 'SharedStateWriter':
+        """Write the current state of ``dog`` and every later update"""
+        for name, state_cls, offset, payload in _ENTRIES:
+            state = getattr(dog, name)
+            writer = self._writer(offset, payload)
+            writer(state.snapshot())
+            self._removers.append(state.add_listener(writer))
+        return self
+
+    def _writer(self, offset: int, payload: struct.Struct):
+        buf = self._buf
+        data_offset = offset + _SEQ.size
+        data_end = data_offset + payload.size
+        pack_seq, pack_payload = _SEQ.pack_into, payload.pack
+
+        def write(snapshot) -> None:
+            # Snapshots are (fields..., stamp, seq); the block stores stamp and seq first.
+            # Packed before taking the seqlock, so a value that cannot be encoded
+            # (e.g. None) leaves the last good state readable instead of a stuck odd sequence
+            data = pack_payload(snapshot[-2], snapshot[-1], *snapshot[:-2])
+            seq = _SEQ.unpack_from(buf, offset)[0] + 1
+            pack_seq(buf, offset, seq)
+            buf[data_offset:data_end] = data
+            pack_seq(buf, offset, seq + 1)
+        return write
+
+    def close(self, unlink: bool = True) -> None:
+        """Stop publishing and (by default) remove the block"""
+        for remove in self._removers:
+            remove()
+        self._removers = []
+        if self._shm is not None:
+            self._buf = None
+            self._shm.close()
+            if unlink:
+                self._shm.unlink()
+            self._shm = None
+
+class SharedStateView:
+    """Read-only view of one state in a shared block, used like CtrlState/BodyStatus"""
+
+    def __init__(self, buf, offset: int, state_cls: Type[StateManager], payload: struct.Struct,
+                 timeout: float = 5.0):
+        self._buf = buf
+        self._offset = offset
+        self._payload = payload
+        self._state_cls = state_cls
+        self._timeout = timeout
+
+    def snapshot(self, retries: int = 10000):
+        """Get a consistent snapshot (fields plus ``stamp`` and ``seq``)"""
+        buf, offset = self._buf, self._offset
+        data_offset = offset + _SEQ.size
+        unpack_seq, unpack_payload = _SEQ.unpack_from, self._payload.unpack_from
+        for _ in range(retries):
+            before = unpack_seq(buf, offset)[0]
+            if before & 1:
+                continue
+            values = unpack_payload(buf, data_offset)
+            if unpack_seq(buf, offset)[0] == before:
+                fields = tuple(type(default)(value) for default, value
+                               in zip(self._state_cls._defaults, values[2:]))
+                return tuple.__new__(self._state_cls.Snapshot, fields + values[:2])
+        raise RuntimeError("Shared state is being rewritten continuously")
+
+    def __getattr__(self, name: str):
+        index = self._state_cls._index.get(name)
+        if index is None:
+            raise AttributeError(name)
+        return self.snapshot()[index]
+
+    def as_dict(self):
+        return self.snapshot()._asdict()
+
+    @property
+    def seq(self) -> int:
+        return self.snapshot().seq
+
+    @property
+    def last_update(self) -> float:
+        return self.snapshot().stamp
+
+    @property
+    def is_valid(self) -> bool:
+        """Check if the owner received this state recently"""
+        stamp = self.snapshot().stamp
+        return stamp > 0.0 and (time.monotonic() - stamp) < self._timeout
+
+class SharedStateReader:
+    """Attaches to a block written by SharedStateWriter (e.g. ``Dog.share_state``)"""
+
+    def __init__(self, name: str, timeout: float = 5.0):
+        """
+        Args:
+            name: Block name given to (or chosen by) the owner
+            timeout: Age after which ``is_valid`` reports a state as stale (s)
+        """
+        self.name = name
+        self._map = self._shm = None
+        path = os.path.join('/dev/shm', name.lstrip('/'))
+        if os.path.exists(path):
+            # Map the block read-only where POSIX shared memory is visible as a file
+            with open(path, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = memoryview(self._map)
+        else:
+            self._shm = self._attach(name)
+            buf = self._shm.buf
+        magic, version, _ = _HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            buf.release()
+            self.close()
+            raise ValueError(f"Not a robodog shared state block: {name}")
+        self._buf = buf
+        views = {name: SharedStateView(buf, offset, state_cls, payload, timeout)
+                 for name, state_cls, offset, payload in _ENTRIES}
+        self.ctrl_state = views['ctrl_state']
+        self.body_status = views['body_status']
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        try:
+            return shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block for removal when this process exits
+            shm = shared_memory.SharedMemory(name)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+            return shm
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        """Detach from the block"""
+        self.ctrl_state = self.body_status = None
+        if getattr(self, '_buf', None) is not None and self._map is not None:
+            self._buf.release()
+        self._buf = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm = None
@@ -1,33 +1,193 @@
-from dataclasses import dataclass
-from typing import Dict, Any
+from collections import namedtuple
+from operator import itemgetter
+from typing import Callable, Dict, Any, Optional, Tuple
 import time
 
+class _Observer:
+    """Field observer with the value it was last notified of"""
+    __slots__ = ('callback', 'deadband', 'last')
+
+    def __init__(self, callback: Callable[[str, Any, Any], None], deadband: float, last: Any):
+        self.callback = callback
+        self.deadband = deadband
+        self.last = last
+
 class StateManager:
-    """Base class for state management"""
-    def __init__(self, timeout: float = 5.0):
+    """
+    Base class for state management
+
+    Subclasses declare their fields as annotated class attributes with
+    defaults. Values live in an immutable snapshot (a namedtuple with the
+    fields plus a monotonic ``stamp`` and sequence number ``seq``) which
+    ``update`` replaces in a single reference swap, so readers never see a
+    half-applied message and never take a lock. Updates are expected to come
+    from a single thread (the subscriber callback).
+
+    Callers can ``observe`` individual fields. Each update checks only the
+    observed fields and calls back only the observers whose field changed
+    (by more than their deadband), so unobserved fields cost nothing.
+    An observer or listener that raises is logged and counted in
+    ``callback_errors``; the others still run.
+    """
+    __slots__ = ('_timeout', '_snapshot', '_observers', '_listeners', 'callback_errors', 'last_error')
+
+    _fields: Tuple[str, ...] = ()
+    _defaults: Tuple[Any, ...] = ()
+    _index: Dict[str, int] = {}
+    Snapshot = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Fields are the annotated names that this class itself gives a default
+        fields = tuple(name for name in getattr(cls, '__annotations__', {}) if name in cls.__dict__)
+        if not fields:
+            return
+        cls._fields = fields
+        cls._defaults = tuple(cls.__dict__[name] for name in fields)
+        cls._index = {name: i for i, name in enumerate(fields)}
+        cls.Snapshot = namedtuple(cls.__name__ + 'Snapshot', fields + ('stamp', 'seq'))
+        # Replace the declared defaults with read-only accessors into the snapshot
+        for i, name in enumerate(fields):
+            getter = itemgetter(i)
+            setattr(cls, name, property(lambda self, _get=getter: _get(self._snapshot)))
+
+    def __init__(self, timeout: float = 5.0, **values):
         self._timeout = timeout
+        # Field index -> observers; replaced (never mutated) so updates can iterate without a lock
+        self._observers: Dict[int, Tuple[_Observer, ...]] = {}
+        self._listeners: Tuple[Callable[[Tuple], None], ...] = ()
+        self.callback_errors = 0
+        self.last_error: Optional[Exception] = None
         self.reset()
+        if values:
+            self.update(values)
+            # Explicit initial values do not count as a received message
+            self._snapshot = self._snapshot._replace(stamp=0.0, seq=0)
 
     def update(self, data: Dict[str, Any]) -> None:
-        self._last_update = time.time()
+        """Apply a message, replacing the snapshot atomically"""
+        index = self._index
+        values = list(self._snapshot)
         for key, value in data.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+            i = index.get(key)
+            if i is not None:
+                values[i] = value
+        values[-2] = time.monotonic()
+        values[-1] += 1
+        previous = self._snapshot
+        self._snapshot = tuple.__new__(self.Snapshot, values)
+        if self._observers:
+            self._dispatch(previous, values)
+        snapshot = self._snapshot
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                self._failed(f"{type(self).__name__} listener {listener!r}", e)
+
+    def _dispatch(self, previous: Tuple, values: list) -> None:
+        """Notify the observers of the fields changed by the last update"""
+        for i, observers in self._observers.items():
+            value = values[i]
+            changed = value != previous[i]
+            for observer in observers:
+                try:
+                    if observer.deadband:
+                        if abs(value - observer.last) <= observer.deadband:
+                            continue
+                    elif not changed:
+                        continue
+                    old, observer.last = observer.last, value
+                    observer.callback(self._fields[i], old, value)
+                except Exception as e:
+                    self._failed(f"observer of {self._fields[i]}", e)
+
+    def _failed(self, name: str, error: Exception) -> None:
+        """Count and log a failed callback without interrupting the update"""
+        self.callback_errors += 1
+        self.last_error = error
+        print(f"Warning: {name} failed: {error!r}")
+
+    def observe(self, field: str, callback: Callable[[str, Any, Any], None],
+                deadband: float = 0.0) -> Callable[[], None]:
+        """
+        Call ``callback(field, old, new)`` when a field changes
+
+        Args:
+            field: Field name
+            callback: Called from the updating thread with the field name and its old and new values
+            deadband: For numeric fields, only notify once the value moved more than this
+                from the last notified value
+
+        Returns:
+            Callable: Removes the observer
+        """
+        if field not in self._index:
+            raise ValueError(f"Unknown field: {field}")
+        i = self._index[field]
+        observer = _Observer(callback, deadband, self._snapshot[i])
+        observers = dict(self._observers)
+        observers[i] = observers.get(i, ()) + (observer,)
+        self._observers = observers
+
+        def remove() -> None:
+            observers = dict(self._observers)
+            remaining = tuple(o for o in observers.get(i, ()) if o is not observer)
+            if remaining:
+                observers[i] = remaining
+            else:
+                observers.pop(i, None)
+            self._observers = observers
+        return remove
+
+    def add_listener(self, callback: Callable[[Tuple], None]) -> Callable[[], None]:
+        """
+        Call ``callback(snapshot)`` after every update
+
+        Returns:
+            Callable: Removes the listener
+        """
+        self._listeners = self._listeners + (callback,)
+
+        def remove() -> None:
+            self._listeners = tuple(listener for listener in self._listeners if listener is not callback)
+        return remove
 
     def reset(self) -> None:
         """Reset state data"""
-        for key in self.__annotations__.keys():
-            setattr(self, key, self.__annotations__[key]())
-        self._last_update = 0.0
-        
+        self._snapshot = self.Snapshot._make(self._defaults + (0.0, 0))
+
+    def snapshot(self):
+        """Get a consistent, immutable view of all fields plus ``stamp`` and ``seq``"""
+        return self._snapshot
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get field values as a dictionary"""
+        return dict(zip(self._fields, self._snapshot))
+
+    @property
+    def last_update(self) -> float:
+        """Monotonic time of the last update (0.0 if never updated)"""
+        return self._snapshot.stamp
+
+    @property
+    def seq(self) -> int:
+        """Number of updates applied since the last reset"""
+        return self._snapshot.seq
+
     @property
     def is_valid(self) -> bool:
         """Check if state is valid (not timed out)"""
-        return (time.time() - self._last_update) < self._timeout
+        stamp = self._snapshot.stamp
+        return stamp > 0.0 and (time.monotonic() - stamp) < self._timeout
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={value!r}' for name, value in zip(self._fields, self._snapshot))
+        return f'{type(self).__name__}({fields})'
 
-@dataclass
 class CtrlState(StateManager):
     """Control state data class"""
+    __slots__ = ()
     error: bool = False
     warning: bool = False
     estop: bool = False
@@ -39,9 +199,9 @@ class CtrlState(StateManager):
     gait: int = 0
     standing: bool = False
 
-@dataclass
 class BodyStatus(StateManager):
     """Body status data class"""
+    __slots__ = ()
     x: float = 0.0
     y: float = 0.0
     z: float = 0.0
@@ -1,17 +1,46 @@
-import roslibpy
-from .connection import ROSConnection
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+from .config import CTRL_STATE_TOPIC, BODY_STATUS_TOPIC
+from .connection import default_pool
+from .stats import Stats
+from .transport import Transport
+
+@dataclass
+class SubscriptionOptions:
+    """Rosbridge-side subscription options"""
+    throttle_rate: int = 0              # Minimum time between messages (ms), 0 for full rate
+    queue_length: int = 0               # Messages queued by rosbridge, 0 for its default
+    compression: Optional[str] = None   # One of roslibpy.Topic.SUPPORTED_COMPRESSION_TYPES
+
+# Predefined subscription profiles
+SUBSCRIPTION_PROFILES = {
+    'control': SubscriptionOptions(),
+    'dashboard': SubscriptionOptions(throttle_rate=100, queue_length=1),
+}
+
+def resolve_subscription(options: Union[str, SubscriptionOptions, None]) -> SubscriptionOptions:
+    """Get subscription options from a profile name or options object"""
+    if options is None:
+        return SUBSCRIPTION_PROFILES['control']
+    if isinstance(options, str):
+        if options not in SUBSCRIPTION_PROFILES:
+            raise ValueError(f"Unknown subscription profile: {options}")
+        return SUBSCRIPTION_PROFILES[options]
+    return options
 
 class DogStateSubscriber:
-    def __init__(self, dog):
+    def __init__(self, dog, conn: Optional[Transport] = None, stats: Optional[Stats] = None):
         self.dog = dog
-        self._conn = ROSConnection()
+        self._conn = conn or default_pool.get()
+        self.stats = stats
         self.topics = {
-            'ctrl_state': '/alphadog_node/dog_ctrl_state',
-            'body_status': '/alphadog_node/body_status'
+            'ctrl_state': CTRL_STATE_TOPIC,
+            'body_status': BODY_STATUS_TOPIC
         }
         self._subscribers = {}
 
-    def subscribe_ctrl_state(self, callback=None):
+    def subscribe_ctrl_state(self, callback=None, options: Union[str, SubscriptionOptions, None] = None):
         def default_callback(message):
             if isinstance(message, dict) and 'state' in message:
                 self.dog.update_ctrl_state(message['state'])
@@ -19,29 +48,53 @@ class DogStateSubscriber:
                 print("Warning: Invalid ctrl_state message format")
 
         topic = self.topics['ctrl_state']
-        listener = roslibpy.Topic(
-            self._conn.client,
+        options = resolve_subscription(options)
+        self._subscribers[topic] = self._conn.subscribe(
             topic,
-            'ros_alphadog/DogCtrlStateStamped'
+            'ros_alphadog/DogCtrlStateStamped',
+            self._instrument(topic, callback or default_callback),
+            throttle_rate=options.throttle_rate,
+            queue_length=options.queue_length,
+            compression=options.compression
         )
-        listener.subscribe(callback or default_callback)
-        self._subscribers[topic] = listener
 
-    def subscribe_body_status(self, callback=None):
+    def subscribe_body_status(self, callback=None, options: Union[str, SubscriptionOptions, None] = None):
         def default_callback(message):
             if isinstance(message, dict) and 'status' in message:
-                self.dog.update_body_status(message['status'])
+                self.dog.update_body_status(message['status'], message.get('header'))
             else:
                 print("Warning: Invalid body_status message format")
 
         topic = self.topics['body_status']
-        listener = roslibpy.Topic(
-            self._conn.client,
+        options = resolve_subscription(options)
+        self._subscribers[topic] = self._conn.subscribe(
             topic,
-            'ros_alphadog/BodyStatusStamped'
+            'ros_alphadog/BodyStatusStamped',
+            self._instrument(topic, callback or default_callback),
+            throttle_rate=options.throttle_rate,
+            queue_length=options.queue_length,
+            compression=options.compression
         )
-        listener.subscribe(callback or default_callback)
-        self._subscribers[topic] = listener
+
+    def _instrument(self, topic: str, callback: Callable) -> Callable:
+        """Wrap a callback to record message arrivals and processing time"""
+        stats = self.stats
+        if stats is None:
+            return callback
+        name = 'callback:' + topic
+        perf_counter = time.perf_counter
+
+        def instrumented(message):
+            stats.arrival(name)
+            start = perf_counter()
+            try:
+                callback(message)
+            except Exception as e:
+                stats.error(name, e)
+                raise
+            finally:
+                stats.record(name, perf_counter() - start)
+        return instrumented
 
     def unsubscribe_all(self):
         for topic in self._subscribers.values():
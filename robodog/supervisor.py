@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+class ConnectionSupervisor:
+    """
+    Keeps a Dog's connection alive
+
+    A background thread treats the connection as dropped when the transport
+    reports it closed or when no state message arrived for ``stale_after``
+    seconds (a Wi-Fi dropout can leave the socket open but silent). It then
+    reconnects with jittered exponential backoff; the transport restores its
+    subscriptions and publishers and the next parameter request carries the
+    full configuration.
+
+    Commands issued during the outage are held as the latest value per
+    parameter (and the latest user mode) and sent once the connection is
+    back. Held values older than ``hold_time`` are dropped rather than
+    replayed, so a stale velocity command does not start the robot moving.
+    """
+
+    def __init__(self, dog, check_interval: float = 0.2, stale_after: Optional[float] = 2.0,
+                 initial_delay: float = 0.5, max_delay: float = 10.0, multiplier: float = 2.0,
+                 jitter: float = 0.5, hold_time: float = 5.0):
+        """
+        Args:
+            dog: Dog to supervise
+            check_interval: Seconds between health checks
+            stale_after: Seconds without state messages before the link counts as dropped (None: never)
+            initial_delay: Backoff before the second reconnect attempt (s)
+            max_delay: Upper bound of the backoff (s)
+            multiplier: Backoff growth per failed attempt
+            jitter: Fraction of each delay that is randomized, spreading the reconnects of a fleet
+            hold_time: Maximum age of buffered commands sent after recovery (s)
+        """
+        self.dog = dog
+        self.check_interval = check_interval
+        self.stale_after = stale_after
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.hold_time = hold_time
+        self.outages = 0
+        self.attempts = 0
+        self.last_error: Optional[Exception] = None
+        self._held_params: Dict[str, Any] = {}
+        self._held_stamps: Dict[str, float] = {}
+        self._held_mode = None
+        self._online = threading.Event()
+        self._online.set()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._since = time.monotonic()
+        self._thread = None
+
+    @property
+    def online(self) -> bool:
+        """False while the connection is being restored"""
+        return self._online.is_set()
+
+    def wait_online(self, timeout: Optional[float] = None) -> bool:
+        """Block until the connection is up"""
+        return self._online.wait(timeout)
+
+    def start(self) -> 'ConnectionSupervisor':
+        """Start watching the connection"""
+        self._stop.clear()
+        self._since = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='robodog-supervisor', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop watching (buffered commands are discarded)"""
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        with self._lock:
+            self._held_params.clear()
+            self._held_stamps.clear()
+            self._held_mode = None
+            self._online.set()
+
+    def hold(self, params: Optional[Dict[str, Any]] = None, user_mode: Optional[int] = None) -> bool:
+        """
+        Buffer commands while the connection is down (latest value wins)
+
+        Returns:
+            bool: False if the connection is up and the caller should send them itself
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._online.is_set():
+                return False
+            if params:
+                self._held_params.update(params)
+                self._held_stamps.update(dict.fromkeys(params, now))
+            if user_mode is not None:
+                self._held_mode = (user_mode, now)
+            return True
+
+    @property
+    def held(self) -> Dict[str, Any]:
+        """Get a copy of the buffered parameters"""
+        with self._lock:
+            return dict(self._held_params)
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before the given reconnect attempt (0 for the first)"""
+        if attempt <= 0:
+            return 0.0
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return delay * (1.0 - self.jitter * random.random())
+
+    def _healthy(self) -> bool:
+        if not self.dog._client.connection.is_connected:
+            return False
+        if self.stale_after is None:
+            return True
+        last = max(self.dog.ctrl_state.last_update, self.dog.body_status.last_update, self._since)
+        return time.monotonic() - last < self.stale_after
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.check_interval):
+            if not self._healthy():
+                self._recover()
+
+    def _recover(self) -> None:
+        self._online.clear()
+        self.outages += 1
+        attempt = 0
+        while not self._stop.wait(self.backoff(attempt)):
+            attempt += 1
+            self.attempts += 1
+            try:
+                self.dog.reconnect()
+            except Exception as e:
+                self.last_error = e
+                continue
+            self._since = time.monotonic()
+            self._flush()
+            return
+
+    def _flush(self) -> None:
+        """Send the buffered commands that are still fresh, then go back online"""
+        controller = self.dog._controller
+        # The first request after reconnecting restores the full configuration
+        full = True
+        while True:
+            cutoff = time.monotonic() - self.hold_time
+            with self._lock:
+                params = {name: value for name, value in self._held_params.items()
+                          if self._held_stamps[name] >= cutoff}
+                mode = self._held_mode
+                self._held_params.clear()
+                self._held_stamps.clear()
+                self._held_mode = None
+                if not full and not params and mode is None:
+                    # Commands issued from now on are sent directly
+                    self._online.set()
+                    return
+            controller.set_parameters(params, full=full)
+            # After the configuration, which carries the user mode the controller last acknowledged
+            if mode is not None and mode[1] >= cutoff:
+                controller.set_user_mode(mode[0])
+            full = False
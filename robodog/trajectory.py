@@ -0,0 +1,326 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from .config import PARAM_RANGES
+from .rate import Rate, RateStats
+
+# Body-frame velocity parameters; missing ones are zero when profiles are joined.
+# Frames follow ROS REP 103: x forward, y left, wz and yaw counter-clockwise.
+VELOCITY_FIELDS = ('vx', 'vy', 'wz')
+
+def _samples(duration: float, hz: float) -> int:
+    if duration < 0:
+        raise ValueError("duration must not be negative")
+    return max(1, int(round(duration * hz)))
+
+class Trajectory:
+    """
+    Setpoint profile sampled at a fixed rate
+
+    Each column holds the values of one parameter (usually vx, vy and wz) at
+    ``hz``. Profiles are computed up front with NumPy, so streaming them only
+    reads precomputed values. Join profiles with ``+``.
+    """
+
+    def __init__(self, columns: Mapping[str, Sequence[float]], hz: float = 50.0):
+        if hz <= 0:
+            raise ValueError("hz must be positive")
+        self.hz = hz
+        self.columns = {name: np.asarray(values, dtype=float) for name, values in columns.items()}
+        if len({len(values) for values in self.columns.values()}) > 1:
+            raise ValueError("All columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __repr__(self) -> str:
+        return f'Trajectory({", ".join(self.columns)}, {len(self)} samples at {self.hz:g} Hz)'
+
+    @property
+    def duration(self) -> float:
+        """Length of the profile (s)"""
+        return len(self) / self.hz
+
+    @property
+    def t(self) -> np.ndarray:
+        """Sample times (s)"""
+        return np.arange(len(self)) / self.hz
+
+    def __add__(self, other: 'Trajectory') -> 'Trajectory':
+        if other.hz != self.hz:
+            raise ValueError("Cannot join trajectories with different rates")
+        columns = {}
+        for name in dict.fromkeys(list(self.columns) + list(other.columns)):
+            parts = []
+            for part in (self, other):
+                if name in part.columns:
+                    parts.append(part.columns[name])
+                elif name in VELOCITY_FIELDS:
+                    parts.append(np.zeros(len(part)))
+                else:
+                    raise ValueError(f"{name} is missing from one of the joined trajectories")
+            columns[name] = np.concatenate(parts)
+        return Trajectory(columns, self.hz)
+
+    @classmethod
+    def hold(cls, duration: float, hz: float = 50.0, **values: float) -> 'Trajectory':
+        """Constant setpoints, e.g. ``Trajectory.hold(2.0, vx=0.3)``"""
+        n = _samples(duration, hz)
+        return cls({name: np.full(n, value) for name, value in values.items()}, hz)
+
+    @classmethod
+    def ramp(cls, duration: float, start: Mapping[str, float], end: Mapping[str, float],
+             hz: float = 50.0) -> 'Trajectory':
+        """Linear change from ``start`` to ``end`` values"""
+        return cls._blend(duration, start, end, hz, lambda s: s)
+
+    @classmethod
+    def s_curve(cls, duration: float, start: Mapping[str, float], end: Mapping[str, float],
+                hz: float = 50.0) -> 'Trajectory':
+        """Smooth change from ``start`` to ``end`` with zero slope and curvature at both ends"""
+        return cls._blend(duration, start, end, hz, lambda s: s ** 3 * (10 - 15 * s + 6 * s ** 2))
+
+    @classmethod
+    def _blend(cls, duration, start, end, hz, shape) -> 'Trajectory':
+        if set(start) != set(end):
+            raise ValueError("start and end must set the same parameters")
+        n = _samples(duration, hz)
+        s = shape(np.arange(1, n + 1) / n)
+        return cls({name: start[name] + (end[name] - start[name]) * s for name in start}, hz)
+
+    @classmethod
+    def arc(cls, radius: float, angle: float, speed: float, hz: float = 50.0) -> 'Trajectory':
+        """
+        Drive along a circular arc
+
+        Args:
+            radius: Arc radius (m)
+            angle: Turned angle (rad), positive counter-clockwise (to the left)
+            speed: Forward speed (m/s)
+        """
+        if radius <= 0 or speed <= 0:
+            raise ValueError("radius and speed must be positive")
+        n = _samples(abs(angle) * radius / speed, hz)
+        # Spread the exact angle over the rounded number of samples
+        wz = angle * hz / n
+        return cls({'vx': np.full(n, abs(wz) * radius), 'vy': np.zeros(n), 'wz': np.full(n, wz)}, hz)
+
+    @classmethod
+    def waypoints(cls, points: Sequence[Tuple[float, float]], speed: float, turn_rate: float = 0.5,
+                  hz: float = 50.0) -> 'Trajectory':
+        """
+        Turn in place towards each waypoint, then drive straight to it
+
+        Args:
+            points: (x, y) waypoints (m) in the frame of the starting pose (x forward, y left)
+            speed: Forward speed (m/s)
+            turn_rate: Turning speed (rad/s)
+        """
+        if speed <= 0 or turn_rate <= 0:
+            raise ValueError("speed and turn_rate must be positive")
+        vx: List[np.ndarray] = []
+        wz: List[np.ndarray] = []
+        x = y = heading = 0.0
+        for px, py in points:
+            dx, dy = px - x, py - y
+            distance = math.hypot(dx, dy)
+            if distance == 0:
+                continue
+            turn = (math.atan2(dy, dx) - heading + math.pi) % (2 * math.pi) - math.pi
+            if turn:
+                n = _samples(abs(turn) / turn_rate, hz)
+                vx.append(np.zeros(n))
+                wz.append(np.full(n, turn * hz / n))
+            n = _samples(distance / speed, hz)
+            vx.append(np.full(n, distance * hz / n))
+            wz.append(np.zeros(n))
+            x, y, heading = px, py, heading + turn
+        if not vx:
+            return cls({'vx': [], 'vy': [], 'wz': []}, hz)
+        vx, wz = np.concatenate(vx), np.concatenate(wz)
+        return cls({'vx': vx, 'vy': np.zeros(len(vx)), 'wz': wz}, hz)
+
+    def check_limits(self, ranges: Mapping[str, Tuple[float, float]] = PARAM_RANGES) -> None:
+        """Raise ValueError if any setpoint is outside its range"""
+        for name, values in self.columns.items():
+            if name in ranges and len(values):
+                low, high = ranges[name]
+                if values.min() < low or values.max() > high:
+                    raise ValueError(f"{name} must be between {low} and {high}")
+
+    def clipped(self, ranges: Mapping[str, Tuple[float, float]] = PARAM_RANGES) -> 'Trajectory':
+        """Copy with every setpoint clipped to its range"""
+        return Trajectory({name: np.clip(values, *ranges[name]) if name in ranges else values
+                           for name, values in self.columns.items()}, self.hz)
+
+    def expected_pose(self) -> Dict[str, np.ndarray]:
+        """
+        Pose (x, y, yaw) reached by following the velocity setpoints exactly
+
+        Arrays have ``len(self) + 1`` entries: the start pose (zero) and the
+        pose after each sample, in the frame of the starting pose.
+        """
+        n = len(self)
+        zeros = np.zeros(n)
+        vx, vy, wz = (self.columns.get(name, zeros) for name in VELOCITY_FIELDS)
+        dt = 1.0 / self.hz
+        yaw = np.concatenate(([0.0], np.cumsum(wz) * dt))
+        # Body velocities rotated by the heading at the start of each sample
+        cos_yaw, sin_yaw = np.cos(yaw[:-1]), np.sin(yaw[:-1])
+        x = np.concatenate(([0.0], np.cumsum(vx * cos_yaw - vy * sin_yaw) * dt))
+        y = np.concatenate(([0.0], np.cumsum(vx * sin_yaw + vy * cos_yaw) * dt))
+        return {'x': x, 'y': y, 'yaw': yaw}
+
+    def setpoints(self) -> List[Dict[str, float]]:
+        """Per-sample parameter dictionaries"""
+        names = list(self.columns)
+        rows = np.column_stack([self.columns[name] for name in names]).tolist() if names else []
+        return [dict(zip(names, row)) for row in rows]
+
+# BodyStatus fields sampled while executing; the pose is relative to the starting pose
+MEASURED_FIELDS = ('x', 'y', 'yaw', 'vx', 'vy', 'wz')
+
+@dataclass
+class TrajectoryResult:
+    """Commanded and measured motion of an executed trajectory"""
+    t: np.ndarray                       # Time of each measurement since the start (s)
+    commanded: Dict[str, np.ndarray]    # Setpoints sent, one per tick
+    measured: Dict[str, np.ndarray]     # BodyStatus before each tick plus one after the last
+    expected: Dict[str, np.ndarray]     # Ideal pose at the same instants
+    completed: bool                     # False if cancelled
+    failures: int                       # Setpoints not acknowledged
+    timing: RateStats
+
+    def velocity_error(self) -> Dict[str, np.ndarray]:
+        """Measured minus commanded velocity, measured one tick after each setpoint"""
+        return {name: self.measured[name][1:] - values
+                for name, values in self.commanded.items() if name in VELOCITY_FIELDS}
+
+    def position_error(self) -> np.ndarray:
+        """Distance between measured and expected position (m)"""
+        return np.hypot(self.measured['x'] - self.expected['x'], self.measured['y'] - self.expected['y'])
+
+    def summary(self) -> Dict[str, float]:
+        """Tracking error statistics"""
+        summary = {'ticks': len(self.t) - 1, 'completed': self.completed, 'failures': self.failures,
+                   'overruns': self.timing.overruns, 'max_jitter': self.timing.max_jitter}
+        for name, error in self.velocity_error().items():
+            summary[f'{name}_rms_error'] = float(np.sqrt(np.mean(error ** 2))) if len(error) else 0.0
+        position = self.position_error()
+        summary['max_position_error'] = float(position.max())
+        summary['final_position_error'] = float(position[-1])
+        summary['final_yaw_error'] = float(self.measured['yaw'][-1] - self.expected['yaw'][-1])
+        return summary
+
+class TrajectoryExecutor:
+    """
+    Streams a trajectory to a Dog at its sample rate
+
+    Each tick records the BodyStatus feedback and sends the next precomputed
+    setpoint through ``Dog.set_parameters``. Setpoints are checked against
+    PARAM_RANGES before anything is sent.
+    """
+
+    def __init__(self, dog, trajectory: Trajectory, stop_at_end: bool = True, spin: float = 0.0005):
+        """
+        Args:
+            dog: Connected Dog
+            trajectory: Profile to execute
+            stop_at_end: Send zero velocities after the last setpoint (or on cancel)
+            spin: Busy-wait before each deadline, see Rate
+        """
+        trajectory.check_limits()
+        self.dog = dog
+        self.trajectory = trajectory
+        self.stop_at_end = stop_at_end
+        self.rate = Rate(trajectory.hz, spin)
+        self.result: Optional[TrajectoryResult] = None
+        self.error: Optional[Exception] = None
+        self._setpoints = trajectory.setpoints()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> 'TrajectoryExecutor':
+        """Execute on a background thread"""
+        self._thread = threading.Thread(target=self._execute, name='robodog-trajectory', daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[TrajectoryResult]:
+        """Wait for a background execution, returning its result (None if still running)"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def cancel(self, timeout: Optional[float] = None) -> Optional[TrajectoryResult]:
+        """Stop early (zero velocities are sent if stop_at_end) and return the partial result"""
+        self._cancel.set()
+        return self.wait(timeout)
+
+    def run(self) -> TrajectoryResult:
+        """Execute in the calling thread"""
+        self._execute()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def _execute(self) -> None:
+        try:
+            self.result = self._stream()
+        except Exception as e:
+            self.error = e
+
+    def _stream(self) -> TrajectoryResult:
+        dog, setpoints = self.dog, self._setpoints
+        n = len(setpoints)
+        measured = np.zeros((n + 1, len(MEASURED_FIELDS)))
+        t = np.zeros(n + 1)
+        origin = dog.body_status.snapshot()
+        cos_yaw, sin_yaw = math.cos(origin.yaw), math.sin(origin.yaw)
+
+        def sample(k: int) -> None:
+            state = dog.body_status.snapshot()
+            dx, dy = state.x - origin.x, state.y - origin.y
+            measured[k] = (cos_yaw * dx + sin_yaw * dy, -sin_yaw * dx + cos_yaw * dy,
+                           state.yaw - origin.yaw, state.vx, state.vy, state.wz)
+            t[k] = time.monotonic() - start
+
+        failures = ticks = 0
+        start = time.monotonic()
+        self.rate.reset()
+        try:
+            for setpoint in setpoints:
+                if self._cancel.is_set():
+                    break
+                sample(ticks)
+                failures += not dog.set_parameters(setpoint)
+                ticks += 1
+                self.rate.sleep()
+            sample(ticks)
+        finally:
+            if self.stop_at_end:
+                stop = {name: 0.0 for name in VELOCITY_FIELDS if name in self.trajectory.columns}
+                if stop:
+                    dog.set_parameters(stop)
+
+        measured = measured[:ticks + 1]
+        measured[:, 2] = np.unwrap(measured[:, 2])
+        expected = self.trajectory.expected_pose()
+        return TrajectoryResult(
+            t=t[:ticks + 1],
+            commanded={name: values[:ticks] for name, values in self.trajectory.columns.items()},
+            measured=dict(zip(MEASURED_FIELDS, measured.T)),
+            expected={name: values[:ticks + 1] for name, values in expected.items()},
+            completed=ticks == n,
+            failures=failures,
+            timing=self.rate.stats
+        )
@@ -0,0 +1,60 @@
+from typing import Any, Callable, Dict, Optional
+
+class Transport:
+    """
+    Interface of the message transport under ROSClient
+
+    A transport carries the parameter service, user-mode topic and state
+    topics to one robot. ``host``/``port`` identify the endpoint (for a
+    serial transport: device path and baud rate).
+    """
+    host: str
+    port: int
+    # The endpoint keeps the robot's configuration itself (e.g. a gateway shared by several
+    # clients), so clients send every requested value instead of deltas or full configurations
+    tracks_config: bool = False
+
+    def connect(self) -> None:
+        """Open the transport"""
+        raise NotImplementedError
+
+    def disconnect(self) -> None:
+        """Close the transport"""
+        raise NotImplementedError
+
+    def reconnect(self) -> None:
+        """Close and reopen the transport"""
+        self.disconnect()
+        self.connect()
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if connected"""
+        raise NotImplementedError
+
+    def publish(self, topic: str, msg_type: str, message: Dict[str, Any]) -> None:
+        """Publish message to topic"""
+        raise NotImplementedError
+
+    def subscribe(self, topic: str, msg_type: str, callback: Callable[[Dict[str, Any]], None],
+                  throttle_rate: int = 0, queue_length: int = 0, compression: Optional[str] = None):
+        """Subscribe to topic, returning a handle with an ``unsubscribe()`` method"""
+        raise NotImplementedError
+
+    def call_service(self, service: str, service_type: str, request: Dict[str, Any],
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Call service, blocking until the response arrives or the timeout expires"""
+        raise NotImplementedError
+
+    def call_service_async(self, service: str, service_type: str, request: Dict[str, Any],
+                           callback: Callable[[Dict[str, Any]], None], errback: Callable[[Any], None]) -> None:
+        """Call service, reporting the response to ``callback`` or the failure to ``errback``"""
+        raise NotImplementedError
+
+    def service_error(self, error: Any) -> Exception:
+        """Exception raised for a failure passed to a ``call_service_async`` errback"""
+        return ConnectionError(error)
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        """Run callback after delay seconds on the transport's event thread"""
+        raise NotImplementedError
@@ -11,6 +11,8 @@ setup(
         'roslibpy>=1.3.0',
         'dataclasses>=0.6;python_version<"3.7"',
         'typing-extensions>=4.0.0',
+        'numpy',
+        'pyserial>=3.5',
     ],
 
     # Project metadata
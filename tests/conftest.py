@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+import tty
+
+import pytest
+
+from robodog import Dog
+from robodog import serial_transport as st
+from robodog.connection import ConnectionPool
+from robodog.mock_server import MockRosbridgeServer
+
+def wait_until(predicate, timeout: float = 2.0, interval: float = 0.01) -> bool:
+    """Poll predicate until it holds or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+@pytest.fixture
+def server():
+    """Mock rosbridge server on a free port"""
+    srv = MockRosbridgeServer(body_status_rate=50.0).start()
+    yield srv
+    srv.stop()
+
+@pytest.fixture
+def make_dog(server):
+    """Create dogs connected to the mock server, each on its own connection pool"""
+    dogs = []
+
+    def make(**kwargs):
+        kwargs.setdefault('history_size', 0)
+        dog = Dog('127.0.0.1', server.port, pool=ConnectionPool(), **kwargs).connect()
+        dogs.append(dog)
+        return dog
+
+    yield make
+    for dog in dogs:
+        dog.disconnect()
+
+class SerialDevice:
+    """
+    Robot end of a pty pair speaking the serial framed protocol
+
+    Applies SET_PARAMETERS frames and answers them with an ACK (unless
+    ``ack`` is cleared), and streams state frames to subscribed types.
+    """
+
+    def __init__(self):
+        self.master, slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(slave)
+        self.path = os.ttyname(slave)
+        # The transport opens the device by path; this descriptor only keeps the pty alive
+        self._slave = slave
+        self.ack = True
+        self.params = {}
+        self.user_mode = 3
+        self.subscribed = set()
+        self.requests = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Hang up the robot end"""
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join()
+        os.close(self.master)
+        os.close(self._slave)
+
+    def _run(self) -> None:
+        decoder = st.FrameDecoder()
+        os.set_blocking(self.master, False)
+        n = 0
+        while self._running:
+            try:
+                data = os.read(self.master, 4096)
+            except (BlockingIOError, OSError):
+                data = b''
+            for frame_type, seq, payload in decoder.feed(data):
+                if frame_type == st.FRAME_SET_PARAMETERS:
+                    self.requests += 1
+                    self.params.update(st.decode_parameters(payload))
+                    if self.ack:
+                        os.write(self.master, st.encode_frame(st.FRAME_ACK, seq, b'\x01'))
+                elif frame_type == st.FRAME_SET_USER_MODE:
+                    self.user_mode = payload[0]
+                elif frame_type == st.FRAME_SUBSCRIBE:
+                    self.subscribed.add(payload[0])
+                elif frame_type == st.FRAME_UNSUBSCRIBE:
+                    self.subscribed.discard(payload[0])
+            n += 1
+            if st.FRAME_BODY_STATUS in self.subscribed:
+                status = {'x': n * 0.01, 'vx': self.params.get('vx', 0.0)}
+                os.write(self.master, st.encode_frame(st.FRAME_BODY_STATUS, n, st.encode_body_status(status)))
+            if st.FRAME_CTRL_STATE in self.subscribed and n % 10 == 0:
+                state = {'user_mode': self.user_mode, 'standing': True}
+                os.write(self.master, st.encode_frame(st.FRAME_CTRL_STATE, n, st.encode_ctrl_state(state)))
+            time.sleep(0.005)
+
+@pytest.fixture
+def serial_device():
+    device = SerialDevice()
+    yield device
+    device.close()
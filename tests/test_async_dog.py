@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from robodog import AsyncDog
+from robodog.connection import ConnectionPool
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10.0))
+
+@pytest.fixture
+def adog(server):
+    return AsyncDog('127.0.0.1', server.port, pool=ConnectionPool(), history_size=0)
+
+def test_parameters_and_user_mode(server, adog):
+    async def main():
+        async with adog:
+            assert await adog.set_parameters({'vx': 0.2}, timeout=2.0)
+            assert await adog.set_user_mode(4)
+            assert await adog.wait_until_mode(4, timeout=2.0)
+            return adog.vx
+
+    assert run(main()) == 0.2
+    assert server.params['vx'] == 0.2
+
+def test_parameter_timeout_returns_false(server, adog):
+    async def main():
+        async with adog:
+            await adog.set_parameters({}, full=True)
+            server.latency = 1000.0
+            return await adog.set_parameters({'vx': 0.3}, timeout=0.2)
+
+    assert run(main()) is False
+
+def test_parameter_properties_cannot_be_assigned(adog):
+    with pytest.raises(AttributeError, match='set_parameters'):
+        adog.vx = 0.3
+    with pytest.raises(AttributeError):
+        adog.ctrl_state = None
+    adog.note = 'plain attributes still work'
+    assert adog.note == 'plain attributes still work'
+
+def test_body_status_stream(adog):
+    async def main():
+        async with adog:
+            seqs = []
+            async for snapshot in adog.body_status_stream():
+                seqs.append(snapshot.seq)
+                if len(seqs) == 5:
+                    break
+            return seqs
+
+    seqs = run(main())
+    assert seqs == sorted(seqs) and len(set(seqs)) == 5
+
+def test_latest_only_stream_drops_old_snapshots(adog):
+    async def main():
+        async with adog:
+            stream = adog.body_status_stream(maxsize=1)
+            first = await stream.__anext__()
+            await asyncio.sleep(0.2)
+            second = await stream.__anext__()
+            await stream.aclose()
+            return first.seq, second.seq
+
+    first, second = run(main())
+    assert second - first > 3
+
+def test_wait_for_times_out(adog):
+    async def main():
+        async with adog:
+            return await adog.wait_for(lambda dog: dog.ctrl_state.user_mode == 99, timeout=0.2)
+
+    assert run(main()) is False
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from robodog.client import ROSClient
+from robodog.config import SET_PARAMETERS_SERVICE
+from robodog.connection import ConnectionPool
+from robodog.controller import ParameterRequestBuilder
+from conftest import wait_until
+
+@pytest.fixture
+def client(server):
+    client = ROSClient('127.0.0.1', server.port, max_in_flight=2, pool=ConnectionPool())
+    client.connect()
+    yield client
+    client.disconnect()
+
+def call(client, timeout=None):
+    request = ParameterRequestBuilder().build({'vx': 0.1})
+    return client.call_service_async(SET_PARAMETERS_SERVICE, 'dynamic_reconfigure/Reconfigure',
+                                     request, timeout=timeout)
+
+def test_timed_out_calls_hold_their_slot_until_answered(server, client):
+    server.latency = 0.5
+    first, second = call(client, 0.05), call(client, 0.05)
+    assert isinstance(first.exception(1.0), TimeoutError)
+    assert isinstance(second.exception(1.0), TimeoutError)
+    # Both requests are still outstanding at the server
+    with pytest.raises(RuntimeError):
+        call(client).result(0)
+    server.latency = 0.0
+    assert wait_until(lambda: server.counters['service_calls'] >= 2, 2.0)
+    assert wait_until(lambda: not client._outstanding, 2.0)
+    assert call(client).result(2.0)
+    assert client.stats.snapshot()['counters']['service:' + SET_PARAMETERS_SERVICE + '.rejected'] == 1
+
+def test_unanswered_calls_are_reclaimed_after_pending_timeout(server, client):
+    client.pending_timeout = 0.2
+    server.latency = 1000.0
+    first, second = call(client), call(client)
+    with pytest.raises(RuntimeError):
+        call(client).result(0)
+    time.sleep(0.3)
+    third = call(client, 0.05)
+    assert isinstance(first.exception(0), TimeoutError)
+    assert isinstance(second.exception(0), TimeoutError)
+    assert isinstance(third.exception(1.0), TimeoutError)
+    assert client.stats.snapshot()['counters']['service:' + SET_PARAMETERS_SERVICE + '.abandoned'] == 2
@@ -0,0 +1,100 @@
+import time
+
+import roslibpy
+import pytest
+
+from robodog import Dog
+from robodog.config import BODY_STATUS_TOPIC, SET_USER_MODE_TOPIC
+from robodog.connection import ConnectionPool, ROSConnection
+from robodog.mock_server import MockRosbridgeServer
+from conftest import wait_until
+
+@pytest.fixture
+def short_connect_timeout(monkeypatch):
+    """Fail connection attempts to a stopped server quickly"""
+    run = roslibpy.Ros.run
+    monkeypatch.setattr(roslibpy.Ros, 'run', lambda self, timeout=1.0: run(self, timeout))
+
+def test_reconnect_restores_subscriptions_after_failed_attempt(short_connect_timeout):
+    server = MockRosbridgeServer(body_status_rate=50.0).start()
+    port = server.port
+    conn = ROSConnection('127.0.0.1', port)
+    received = []
+    conn.connect()
+    try:
+        conn.subscribe(BODY_STATUS_TOPIC, 'ros_alphadog/BodyStatusStamped', received.append)
+        conn.publish(SET_USER_MODE_TOPIC, 'ros_alphadog/SetUserMode', {'user_mode': 4})
+        assert wait_until(lambda: received)
+        server.stop()
+
+        with pytest.raises(Exception):
+            conn.reconnect()
+        assert not conn.is_connected
+        # A failed attempt keeps the registrations for the next one
+        assert len(conn._subscriptions) == 1
+        assert conn._publisher_keys
+
+        server = MockRosbridgeServer(port=port, body_status_rate=50.0).start()
+        conn.reconnect()
+        count = len(received)
+        assert wait_until(lambda: len(received) > count + 5)
+        assert len(server._subscriptions[BODY_STATUS_TOPIC]) == 1
+        assert set(conn._publishers) == conn._publisher_keys
+        conn.publish(SET_USER_MODE_TOPIC, 'ros_alphadog/SetUserMode', {'user_mode': 5})
+        assert wait_until(lambda: server.params['user_mode'] == 5)
+    finally:
+        conn.disconnect()
+        server.stop()
+    assert not conn._subscriptions and not conn._publisher_keys
+
+def test_unsubscribed_handle_is_not_restored(server):
+    conn = ROSConnection('127.0.0.1', server.port)
+    conn.connect()
+    try:
+        handle = conn.subscribe(BODY_STATUS_TOPIC, 'ros_alphadog/BodyStatusStamped', lambda message: None)
+        handle.unsubscribe()
+        conn.reconnect()
+        assert not conn._subscriptions
+    finally:
+        conn.disconnect()
+
+def test_unanswered_request_times_out(server, make_dog):
+    dog = make_dog(command_timeout=0.3)
+    dog.set_parameters({}, full=True)
+    server.latency = 1000.0
+    assert not dog.set_parameters({'vx': 0.3})
+    future = dog.set_parameters_async({'vx': 0.4}, timeout=0.2)
+    assert future.result(2.0) is False
+
+def test_dogs_sharing_a_connection_keep_their_subscriptions(server):
+    pool = ConnectionPool()
+    a = Dog('127.0.0.1', server.port, pool=pool, history_size=0).connect()
+    b = Dog('127.0.0.1', server.port, pool=pool, history_size=0).connect()
+    try:
+        assert wait_until(lambda: a.body_status.seq > 5 and b.body_status.seq > 5)
+        # One upstream subscription serves both dogs
+        assert len(server._subscriptions[BODY_STATUS_TOPIC]) == 1
+        a.disconnect()
+        seq = b.body_status.seq
+        assert b._client.connection.is_connected
+        assert wait_until(lambda: b.body_status.seq > seq + 5)
+    finally:
+        a.disconnect()
+        b.disconnect()
+
+def test_handles_are_throttled_individually(server):
+    pool = ConnectionPool()
+    fast = Dog('127.0.0.1', server.port, pool=pool, history_size=0).connect()
+    slow = Dog('127.0.0.1', server.port, pool=pool, history_size=0, subscription='dashboard').connect()
+    try:
+        assert wait_until(lambda: fast.body_status.seq > 0 and slow.body_status.seq > 0)
+        fast_seq, slow_seq = fast.body_status.seq, slow.body_status.seq
+        time.sleep(1.0)
+        # 50 Hz upstream, dashboard handles at most every 100 ms
+        assert fast.body_status.seq - fast_seq > 30
+        assert 5 <= slow.body_status.seq - slow_seq <= 11
+        slow.disconnect()
+        assert server._subscriptions[BODY_STATUS_TOPIC][0].throttle == 0
+    finally:
+        fast.disconnect()
+        slow.disconnect()
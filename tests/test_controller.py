@@ -0,0 +1,113 @@
+import pytest
+
+from robodog.controller import ParameterRequestBuilder
+
+def test_first_request_carries_full_configuration(server, make_dog):
+    dog = make_dog()
+    assert dog.set_parameters({'vx': 0.1})
+    assert server.params['vx'] == 0.1
+    assert dog._controller._synced
+
+def test_unchanged_parameters_are_not_sent(server, make_dog):
+    dog = make_dog()
+    assert dog.set_parameters({'vx': 0.1})
+    calls = server.counters['service_calls']
+    assert dog.set_parameters({'vx': 0.1})
+    assert server.counters['service_calls'] == calls
+    assert dog.set_parameters({'vx': 0.2, 'vy': 0.0})
+    assert server.counters['service_calls'] == calls + 1
+    assert dog._controller.config['vx'] == 0.2
+
+def test_value_reverted_while_in_flight_is_sent(server, make_dog):
+    dog = make_dog()
+    dog.set_parameters({}, full=True)
+    server.latency = 0.2
+    first = dog.set_parameters_async({'vx': 1.0}, timeout=2.0)
+    # Equal to the acknowledged value but not to the one in flight, so it must go out
+    second = dog.set_parameters_async({'vx': 0.0}, timeout=2.0)
+    assert first.result(3.0) and second.result(3.0)
+    assert server.params['vx'] == 0.0
+    assert dog._controller.config['vx'] == 0.0
+    assert not dog._controller._in_flight
+
+def test_failed_request_falls_back_to_acknowledged_value(server, make_dog):
+    dog = make_dog(command_timeout=0.3)
+    dog.set_parameters({}, full=True)
+    server.latency = 1000.0
+    assert not dog.set_parameters({'vx': 0.3})
+    assert dog._controller._sent['vx'] == 0.0
+    server.latency = 0.0
+    # Not mistaken for a value the robot already has
+    assert dog.set_parameters({'vx': 0.3})
+    assert server.params['vx'] == 0.3
+
+def test_non_integral_int_value_is_rejected_before_sending(server, make_dog):
+    dog = make_dog()
+    dog.set_parameters({}, full=True)
+    calls = server.counters['service_calls']
+    with pytest.raises(ValueError):
+        dog._controller.set_parameters({'gait': 1.5})
+    with pytest.raises(ValueError):
+        dog._controller.set_parameters({'foo': 1.0})
+    assert server.counters['service_calls'] == calls
+    assert not dog._controller._in_flight
+    assert dog._controller.set_parameters({'gait': 2.0})
+    assert server.params['gait'] == 2
+
+def test_builder_splits_ints_and_doubles():
+    config = ParameterRequestBuilder().build({'vx': 1, 'gait': 2.0})['config']
+    assert config['doubles'] == [{'name': 'vx', 'value': 1.0}]
+    assert config['ints'] == [{'name': 'gait', 'value': 2}]
+    assert type(config['doubles'][0]['value']) is float
+    assert type(config['ints'][0]['value']) is int
+    with pytest.raises(ValueError):
+        ParameterRequestBuilder().build({'gait': 2.5})
+
+def test_batch_sends_one_request(server, make_dog):
+    dog = make_dog()
+    dog.set_parameters({}, full=True)
+    calls = server.counters['service_calls']
+    with dog.batch() as tx:
+        dog.vx = 0.2
+        with dog.batch():
+            dog.wz = 0.1
+        assert server.counters['service_calls'] == calls
+    assert tx.result
+    assert server.counters['service_calls'] == calls + 1
+    assert server.params['vx'] == 0.2 and server.params['wz'] == 0.1
+
+def test_batch_discards_parameters_on_error(server, make_dog):
+    dog = make_dog()
+    dog.set_parameters({}, full=True)
+    calls = server.counters['service_calls']
+    with pytest.raises(RuntimeError):
+        with dog.batch() as tx:
+            dog.vx = 0.2
+            raise RuntimeError("abort")
+    assert tx.result is None
+    assert server.counters['service_calls'] == calls
+    assert server.params['vx'] == 0.0
+
+def test_invalid_value_leaves_nothing_in_flight(server, make_dog):
+    dog = make_dog()
+    dog.set_parameters({}, full=True)
+    controller = dog._controller
+    with pytest.raises((TypeError, ValueError)):
+        controller.set_parameters({'vx': 'fast', 'wz': 0.2})
+    with pytest.raises((TypeError, ValueError)):
+        controller.set_parameters({'vx': None})
+    assert not controller._in_flight
+    assert controller._sent['vx'] == 0.0 and controller._sent['wz'] == 0.0
+    assert controller.set_parameters({'wz': 0.2})
+    assert server.params['wz'] == 0.2
+
+def test_echoed_configuration_updates_later_deltas(server, make_dog):
+    a, b = make_dog(), make_dog()
+    a.set_parameters({}, full=True)
+    assert b.set_parameters({'vy': 0.2})
+    # The echo of A's next request shows B's change
+    assert a.set_parameters({'vx': 0.1})
+    assert a._controller.config['vy'] == 0.2
+    # So setting vy back is a change that must be sent
+    assert a.set_parameters({'vy': 0.0})
+    assert server.params['vy'] == 0.0
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+
+from robodog import Dog, Fleet
+
+def test_dogs_are_named_by_host_and_port():
+    fleet = Fleet([Dog('10.0.0.1'), Dog('10.0.0.1', 9091), Dog('10.0.0.2')])
+    assert fleet.names == ['10.0.0.1', '10.0.0.1:9091', '10.0.0.2']
+    with pytest.raises(ValueError):
+        Fleet([Dog('10.0.0.1'), Dog('10.0.0.1')])
+
+def test_timeout_covers_the_whole_fleet():
+    release = threading.Event()
+    fleet = Fleet({name: Dog(name) for name in ('a', 'b', 'c')})
+
+    def command(dog):
+        if dog.host == 'a':
+            return True
+        release.wait(5.0)
+        return True
+
+    start = time.perf_counter()
+    results = fleet.run(command, timeout=0.3)
+    elapsed = time.perf_counter() - start
+    release.set()
+    assert elapsed < 1.0
+    assert results['a'].ok
+    assert not results['b'].ok and isinstance(results['b'].error, TimeoutError)
+    assert not results['c'].ok and isinstance(results['c'].error, TimeoutError)
+
+def test_failures_are_reported_per_robot():
+    fleet = Fleet({name: Dog(name) for name in ('a', 'b')})
+
+    def command(dog):
+        if dog.host == 'b':
+            raise ConnectionError("unreachable")
+        return dog.host
+
+    results = fleet.run(command)
+    assert results['a'].ok and results['a'].value == 'a'
+    assert not results['b'].ok and isinstance(results['b'].error, ConnectionError)
+
+def test_fleet_parameters(server, make_dog):
+    fleet = Fleet({'a': make_dog(), 'b': make_dog()})
+    results = fleet.set_parameters({'vx': 0.2})
+    assert all(result.ok for result in results.values())
+    assert server.params['vx'] == 0.2
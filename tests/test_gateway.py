@@ -0,0 +1,115 @@
+import os
+
+import pytest
+
+from robodog import Dog
+from robodog.gateway import Gateway, GatewayTransport
+from robodog.connection import ConnectionPool
+from conftest import wait_until
+
+@pytest.fixture
+def gateway(server, tmp_path):
+    gw = Gateway('127.0.0.1', server.port, path=str(tmp_path / 'gw.sock'), pool=ConnectionPool()).start()
+    yield gw
+    gw.stop()
+
+@pytest.fixture
+def make_client(gateway):
+    dogs = []
+
+    def make(**kwargs):
+        kwargs.setdefault('history_size', 0)
+        dog = Dog(transport=GatewayTransport(gateway.path), **kwargs).connect()
+        dogs.append(dog)
+        return dog
+
+    yield make
+    for dog in dogs:
+        dog.disconnect()
+
+def test_clients_do_not_reset_each_others_parameters(server, gateway, make_client):
+    a, b = make_client(), make_client()
+    assert a.set_parameters({'body_height': 0.3})
+    assert b.set_parameters({'vx': 0.2})
+    assert server.params['body_height'] == 0.3
+    assert server.params['vx'] == 0.2
+
+def test_value_changed_by_another_client_is_sent_again(server, gateway, make_client):
+    a, b = make_client(), make_client()
+    assert a.set_parameters({'vx': 0.5})
+    assert b.set_parameters({'vx': 0.0})
+    assert a.set_parameters({'vx': 0.5})
+    assert server.params['vx'] == 0.5
+
+def test_state_is_fanned_out(server, gateway, make_client):
+    a, b = make_client(), make_client()
+    assert wait_until(lambda: a.body_status.seq > 5 and b.body_status.seq > 5)
+    a.set_user_mode(4)
+    assert wait_until(lambda: b.ctrl_state.user_mode == 4)
+    assert gateway.clients == 2
+
+def test_invalid_values_fail_only_their_request(server, gateway, make_client):
+    a = make_client()
+    with pytest.raises(ValueError):
+        a.set_parameters({'vx': 100.0})
+    # Bypass the client's own range check
+    assert not a._controller.set_parameters({'vx': 100.0})
+    assert a.set_parameters({'vx': 0.1})
+    assert server.params['vx'] == 0.1
+
+def test_requests_beyond_the_rate_limit_are_rejected(server, tmp_path):
+    gw = Gateway('127.0.0.1', server.port, path=str(tmp_path / 'gw.sock'), max_rate=2.0,
+                 pool=ConnectionPool()).start()
+    dog = Dog(transport=GatewayTransport(gw.path), history_size=0).connect()
+    try:
+        results = [dog.set_parameters({'vx': i / 10.0}) for i in range(1, 6)]
+    finally:
+        dog.disconnect()
+        gw.stop()
+    assert results[:2] == [True, True]
+    assert not all(results)
+    assert gw.stats.snapshot()['counters']['gateway:rate_limited'] >= 1
+
+def test_reader_survives_failing_listener(gateway, make_client):
+    a = make_client()
+    calls = []
+
+    def listener(snapshot):
+        calls.append(snapshot)
+        if len(calls) == 1:
+            raise ValueError("listener failure")
+
+    a.body_status.add_listener(listener)
+    assert wait_until(lambda: len(calls) > 5)
+    transport = a._client.connection
+    assert transport._reader.is_alive()
+    # Caught by the state itself, before it can reach the transport
+    assert a.body_status.callback_errors == 1
+    assert transport.callback_errors == 0
+    assert a.set_parameters({'vx': 0.1})
+
+def test_stale_socket_is_replaced(server, tmp_path):
+    path = tmp_path / 'gw.sock'
+    path.write_bytes(b'')
+    gw = Gateway('127.0.0.1', server.port, path=str(path), pool=ConnectionPool()).start()
+    gw.stop()
+    assert not os.path.exists(path)
+
+def test_client_reconnects_after_gateway_restart(server, gateway):
+    dog = Dog(transport=GatewayTransport(gateway.path), history_size=0, auto_reconnect=True).connect()
+    try:
+        assert wait_until(lambda: dog.body_status.seq > 0)
+        gateway.stop(disconnect=False)
+        transport = dog._client.connection
+        assert wait_until(lambda: not transport.is_connected)
+        restarted = Gateway(path=gateway.path, dog=gateway.dog).start()
+        try:
+            assert wait_until(lambda: dog.supervisor.outages == 1 and dog.supervisor.online, 5.0)
+            assert transport.is_connected
+            seq = dog.body_status.seq
+            assert wait_until(lambda: dog.body_status.seq > seq + 5)
+            assert dog.set_parameters({'vx': 0.1})
+        finally:
+            restarted.stop(disconnect=False)
+    finally:
+        dog.disconnect()
@@ -0,0 +1,56 @@
+import math
+
+import numpy as np
+import pytest
+
+from robodog.history import StateHistory
+from conftest import wait_until
+
+def filled(capacity, count):
+    history = StateHistory(('x', 'vx'), capacity)
+    for i in range(count):
+        history.append((float(i), 2.0 * i, float(i)))
+    return history
+
+def test_partial_buffer_keeps_order():
+    history = filled(5, 3)
+    assert len(history) == 3 and history.total == 3
+    assert history.view()['x'].tolist() == [0.0, 1.0, 2.0]
+
+def test_wrapped_buffer_keeps_latest_records_contiguous():
+    history = filled(5, 12)
+    view = history.view()
+    assert len(history) == 5 and history.total == 12
+    assert view['x'].tolist() == [7.0, 8.0, 9.0, 10.0, 11.0]
+    # A view of the buffer, not a copy
+    assert np.shares_memory(view, history._buf)
+
+def test_windows_by_count_and_time():
+    history = filled(10, 25)
+    assert history.last(n=3)['x'].tolist() == [22.0, 23.0, 24.0]
+    assert history.last(n=100)['x'].tolist() == list(map(float, range(15, 25)))
+    assert history.last(seconds=2.5, now=24.0)['x'].tolist() == [22.0, 23.0, 24.0]
+    assert history.mean('vx', n=2) == 47.0
+    assert history.max('x', n=3) == 24.0
+    assert history.min('x') == 15.0
+    assert history.derivative('vx', n=4).tolist() == [2.0] * 4
+
+def test_empty_windows():
+    history = StateHistory(('x',), 4)
+    assert len(history.last()) == 0
+    assert math.isnan(history.mean('x'))
+    assert history.derivative('x').tolist() == []
+    history = filled(4, 6)
+    history.clear()
+    assert len(history) == 0 and len(history.view()) == 0
+    with pytest.raises(ValueError):
+        StateHistory(('x',), 0)
+
+def test_dog_records_body_status(server, make_dog):
+    dog = make_dog(history_size=20)
+    assert wait_until(lambda: dog.history is not None and dog.history.total > 25)
+    window = dog.history.view()
+    assert len(window) == 20
+    assert np.all(np.diff(window['t']) > 0)
+    # The mock reports the commanded body height
+    assert np.all(window['z'] == dog.body_status.z)
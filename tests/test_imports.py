@@ -0,0 +1,35 @@
+import subprocess
+import sys
+
+import pytest
+
+import robodog
+
+HEAVY_MODULES = ('roslibpy', 'twisted', 'autobahn', 'numpy', 'serial')
+
+def loaded_after(statement):
+    """Heavy modules loaded by running ``statement`` in a fresh interpreter"""
+    probe = f"import sys; {statement}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True).stdout
+    return set(filter(None, output.strip().split(',')))
+
+@pytest.mark.parametrize('statement', [
+    'import robodog',
+    'from robodog import UserMode, PARAM_RANGES',
+    'from robodog import Dog',
+    'from robodog import Dog; Dog()',
+    'from robodog import ROSConnection, Stats; ROSConnection("127.0.0.1", 9090)',
+])
+def test_import_loads_no_heavy_dependencies(statement):
+    assert loaded_after(statement) == set()
+
+def test_history_loads_numpy_only():
+    assert loaded_after('import robodog.history') == {'numpy'}
+
+def test_every_public_name_resolves():
+    for name in robodog.__all__:
+        value = getattr(robodog, name)
+        assert getattr(value, '__name__', name) == name
+    assert set(robodog.__all__) <= set(dir(robodog))
+    with pytest.raises(AttributeError):
+        robodog.NoSuchThing
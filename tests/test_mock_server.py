@@ -0,0 +1,23 @@
+import socket
+
+import pytest
+
+from robodog.mock_server import MockRosbridgeServer
+
+def test_start_reports_a_port_in_use():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        sock.listen()
+        server = MockRosbridgeServer(port=sock.getsockname()[1])
+        with pytest.raises(OSError):
+            server.start(timeout=5.0)
+        assert server._thread is None
+
+def test_server_restarts_on_its_port():
+    server = MockRosbridgeServer().start()
+    port = server.port
+    assert port
+    server.stop()
+    server = MockRosbridgeServer(port=port).start()
+    assert server.port == port
+    server.stop()
@@ -0,0 +1,45 @@
+import math
+
+import pytest
+
+from robodog import Dog
+from robodog.predictor import PosePredictor, header_time
+
+def test_prediction_requires_body_status():
+    with pytest.raises(RuntimeError):
+        PosePredictor().predict()
+    dog = Dog(history_size=0)
+    dog.enable_prediction()
+    with pytest.raises(RuntimeError):
+        dog.predicted_pose()
+
+def test_straight_line_extrapolation():
+    dog = Dog(history_size=0)
+    predictor = dog.enable_prediction(use_acceleration=False)
+    dog.update_body_status({'x': 1.0, 'vx': 0.5})
+    stamp = dog.body_status.snapshot().stamp
+    pose = predictor.predict(stamp + 0.2)
+    assert pose.x == pytest.approx(1.1)
+    assert pose.y == pytest.approx(0.0)
+
+def test_turning_left_is_counter_clockwise():
+    dog = Dog(history_size=0)
+    predictor = dog.enable_prediction(max_horizon=1.0)
+    dog.update_body_status({'vx': 0.5, 'wz': 0.5})
+    pose = predictor.predict(dog.body_status.snapshot().stamp + 1.0)
+    assert pose.yaw == pytest.approx(0.5)
+    assert pose.y > 0
+    assert math.hypot(pose.x, pose.y) == pytest.approx(2 * math.sin(0.25), rel=1e-3)
+
+def test_horizon_is_capped():
+    predictor = PosePredictor(max_horizon=0.1)
+    dog = Dog(history_size=0)
+    dog.update_body_status({'vx': 1.0})
+    predictor.update(dog.body_status.snapshot())
+    assert predictor.predict(dog.body_status.snapshot().stamp + 10.0).x == pytest.approx(0.1)
+
+def test_header_time():
+    assert header_time(None) is None
+    assert header_time({'stamp': {'secs': 0, 'nsecs': 0}}) is None
+    assert header_time({'stamp': {'secs': 10, 'nsecs': 500000000}}) == 10.5
+    assert header_time({'stamp': {'sec': 10, 'nanosec': 250000000}}) == 10.25
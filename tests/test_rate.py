@@ -0,0 +1,73 @@
+import time
+
+import pytest
+
+from robodog.rate import Rate, RateLoop
+from conftest import wait_until
+
+def test_rate_does_not_drift():
+    rate = Rate(200.0)
+    start = time.monotonic()
+    for _ in range(100):
+        time.sleep(0.001)
+        rate.sleep()
+    assert time.monotonic() - start == pytest.approx(0.5, abs=0.05)
+    assert rate.stats.ticks == 100
+
+def test_rate_skips_missed_deadlines():
+    rate = Rate(100.0, spin=0.0)
+    rate.sleep()
+    time.sleep(0.055)
+    rate.sleep()
+    assert rate.stats.overruns == 1
+    assert rate.stats.skipped >= 4
+    with pytest.raises(ValueError):
+        Rate(0)
+
+def test_loop_stops_and_reports_on_error():
+    errors = []
+
+    def tick():
+        raise RuntimeError("tick failed")
+
+    loop = RateLoop(tick, 100.0, on_error=errors.append).start()
+    assert wait_until(lambda: not loop.running)
+    assert isinstance(loop.error, RuntimeError)
+    assert errors == [loop.error]
+
+def test_loop_can_continue_after_errors():
+    ticks = []
+
+    def tick():
+        ticks.append(1)
+        if len(ticks) % 2:
+            raise RuntimeError("every other tick fails")
+
+    loop = RateLoop(tick, 200.0, stop_on_error=False).start()
+    try:
+        assert wait_until(lambda: len(ticks) >= 10)
+        assert loop.running
+    finally:
+        loop.stop(1.0)
+    assert loop.errors >= 5
+
+def test_control_loop_failure_stops_the_robot(server, make_dog):
+    dog = make_dog()
+    assert dog.set_parameters({'vx': 0.3, 'wz': 0.2})
+    errors = []
+
+    def tick(dog):
+        raise RuntimeError("planner crashed")
+
+    loop = dog.add_control_loop(tick, hz=50, on_error=errors.append)
+    assert wait_until(lambda: not loop.running)
+    assert len(errors) == 1
+    assert wait_until(lambda: server.params['vx'] == 0.0 and server.params['wz'] == 0.0)
+
+def test_control_loops_stop_on_disconnect(server, make_dog):
+    dog = make_dog()
+    ticks = []
+    loop = dog.add_control_loop(lambda dog: ticks.append(dog.body_status.seq), hz=100)
+    assert wait_until(lambda: len(ticks) > 5)
+    dog.disconnect()
+    assert not loop.running
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from robodog import Dog
+from robodog.recorder import (LogReader, Recorder, Replayer, RECORD_BODY_STATUS,
+                              RECORD_SET_PARAMETERS)
+from robodog.serial_transport import encode_body_status, encode_parameters
+from conftest import wait_until
+
+def make_log(path, count=100, chunk_size=256):
+    """Log of ``count`` body_status records 10 ms apart, a command every 10 records"""
+    with Recorder(str(path), chunk_size=chunk_size) as recorder:
+        for i in range(count):
+            recorder.record(RECORD_BODY_STATUS, encode_body_status({'x': float(i)}), t=i * 0.01)
+            if i % 10 == 0:
+                recorder.record(RECORD_SET_PARAMETERS, encode_parameters({'vx': i / 100.0}), t=i * 0.01)
+    return str(path)
+
+def test_log_round_trip(tmp_path):
+    path = make_log(tmp_path / 'a.rdlog')
+    with LogReader(path) as log:
+        assert len(log) == 110
+        assert log.duration == pytest.approx(0.99)
+        messages = list(log.messages())
+    states = [value for _, name, value in messages if name == 'body_status']
+    commands = [value for _, name, value in messages if name == 'set_parameters']
+    assert [s['x'] for s in states] == [float(i) for i in range(100)]
+    assert commands[1] == {'vx': 0.1}
+    times = [t for t, _, _ in messages]
+    assert times == sorted(times)
+
+def test_seek_by_time_and_type(tmp_path):
+    path = make_log(tmp_path / 'a.rdlog')
+    with LogReader(path) as log:
+        window = list(log.messages(start=0.5, end=0.6, types=(RECORD_BODY_STATUS,)))
+    assert [value['x'] for _, _, value in window] == [float(i) for i in range(50, 61)]
+
+def test_truncated_chunk_is_ignored(tmp_path):
+    path = make_log(tmp_path / 'a.rdlog', chunk_size=1024)
+    with open(path, 'r+b') as f:
+        f.truncate(len(f.read()) - 10)
+    with LogReader(path) as log:
+        assert 0 < len(log) < 110
+        list(log.messages())
+
+def test_not_a_log(tmp_path):
+    path = tmp_path / 'junk'
+    path.write_bytes(b'x' * 64)
+    with pytest.raises(ValueError):
+        LogReader(str(path))
+
+def test_replay_feeds_states_and_commands(tmp_path):
+    path = make_log(tmp_path / 'a.rdlog')
+    dog = Dog(history_size=10)
+    seen, commands = [], []
+    dog.observe('x', lambda field, old, new: seen.append(new))
+    replayer = Replayer(path, dog, speed=None, on_command=lambda *c: commands.append(c))
+    assert replayer.run() == 110
+    assert len(seen) == 99 and dog.body_status.x == 99.0
+    assert len(dog.history) == 10
+    assert commands[0] == ('set_parameters', {'vx': 0.0})
+    assert replayer.log._map.closed
+
+def test_replay_keeps_recorded_timing(tmp_path):
+    path = make_log(tmp_path / 'a.rdlog', count=20)
+    dog = Dog(history_size=0)
+    start = time.monotonic()
+    assert dog.replay(path, speed=2.0) == 22
+    assert 0.09 < time.monotonic() - start < 0.5
+
+def test_background_replay_stops(tmp_path):
+    path = make_log(tmp_path / 'a.rdlog')
+    dog = Dog(history_size=0)
+    replayer = Replayer(path, dog, speed=0.1).start()
+    assert wait_until(lambda: replayer.replayed > 0)
+    replayer.stop()
+    assert replayer.replayed < 110
+
+def test_dog_records_received_states_and_commands(server, make_dog, tmp_path):
+    path = str(tmp_path / 'session.rdlog')
+    dog = make_dog()
+    dog.start_recording(path)
+    assert dog.set_parameters({'vx': 0.2})
+    assert wait_until(lambda: dog.body_status.seq > 5)
+    dog.stop_recording()
+    with LogReader(path) as log:
+        names = {name for _, name, _ in log.messages()}
+        commands = [value for _, name, value in log.messages() if name == 'set_parameters']
+    assert {'ctrl_state', 'body_status', 'set_parameters'} <= names
+    assert commands[-1]['vx'] == 0.2
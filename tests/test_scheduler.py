@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+
+from robodog.scheduler import CommandScheduler
+
+class FlakyController:
+    """Controller stand-in failing its first ``failures`` requests"""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def set_parameters(self, params):
+        with self.lock:
+            self.requests.append(dict(params))
+            if self.failures:
+                self.failures -= 1
+                return False
+            return True
+
+def test_latest_value_wins(server, make_dog):
+    dog = make_dog(max_command_rate=20.0)
+    dog.set_parameters({}, full=True)
+    calls = server.counters['service_calls']
+    for i in range(50):
+        dog.vx = i / 100.0
+    assert dog.scheduler.flush(2.0)
+    assert server.params['vx'] == 0.49
+    assert server.counters['service_calls'] - calls < 10
+
+def test_pending_slots_merge_into_one_request():
+    controller = FlakyController()
+    scheduler = CommandScheduler(controller, max_rate=10.0)
+    scheduler.submit({'vx': 0.1})
+    scheduler.submit({'wz': 0.2})
+    scheduler.submit({'vx': 0.3})
+    scheduler.start()
+    try:
+        assert scheduler.flush(2.0)
+    finally:
+        scheduler.stop()
+    assert controller.requests == [{'vx': 0.3, 'wz': 0.2}]
+    assert scheduler.last_result
+
+def test_failed_values_are_retried_unless_superseded():
+    controller = FlakyController(failures=1)
+    scheduler = CommandScheduler(controller, max_rate=100.0).start()
+    try:
+        scheduler.submit({'vx': 0.1, 'wz': 0.2})
+        assert scheduler.flush(2.0)
+    finally:
+        scheduler.stop()
+    assert controller.requests[0] == {'vx': 0.1, 'wz': 0.2}
+    assert controller.requests[-1] == {'vx': 0.1, 'wz': 0.2}
+    assert scheduler.last_result
+
+def test_invalid_values_are_rejected_on_submit():
+    scheduler = CommandScheduler(FlakyController())
+    with pytest.raises(ValueError):
+        scheduler.submit({'foo': 1.0})
+    with pytest.raises(ValueError):
+        scheduler.submit({'gait': 1.5})
+    assert scheduler.pending == {}
+    with pytest.raises(ValueError):
+        CommandScheduler(FlakyController(), max_rate=0)
+
+def test_persistent_failures_are_dropped_after_max_retries():
+    controller = FlakyController(failures=100)
+    scheduler = CommandScheduler(controller, max_rate=100.0, max_retries=2).start()
+    try:
+        scheduler.submit({'vx': 0.1})
+        assert scheduler.flush(2.0)
+    finally:
+        scheduler.stop()
+    assert controller.requests == [{'vx': 0.1}] * 3
+    assert scheduler.pending == {}
+    assert isinstance(scheduler.last_error, RuntimeError)
+    counters = scheduler.stats.snapshot()['counters']
+    assert counters['scheduler:dropped'] == 1
+    assert counters['scheduler:set_parameters.errors'] == 1
+
+def test_controller_exceptions_are_not_retried():
+    class BrokenController(FlakyController):
+        def set_parameters(self, params):
+            super().set_parameters(params)
+            raise RuntimeError("broken")
+
+    controller = BrokenController()
+    scheduler = CommandScheduler(controller, max_rate=100.0).start()
+    try:
+        scheduler.submit({'vx': 0.1})
+        assert scheduler.flush(2.0)
+    finally:
+        scheduler.stop()
+    assert len(controller.requests) == 1
+    assert str(scheduler.last_error) == "broken"
+
+def test_rejected_values_do_not_flood_the_robot(server, make_dog):
+    dog = make_dog(max_command_rate=50.0, command_timeout=0.1)
+    dog.set_parameters({}, full=True)
+    server.latency = 1000.0
+    calls = server.counters['service_calls']
+    dog.vx = 0.3
+    assert dog.scheduler.flush(3.0)
+    assert server.counters['service_calls'] - calls == dog.scheduler.max_retries + 1
+    assert 'scheduler:set_parameters' in dog.stats()['last_errors']
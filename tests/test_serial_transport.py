@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from robodog import Dog
+from robodog import serial_transport as st
+from robodog.config import SET_PARAMETERS_SERVICE, BODY_STATUS_TOPIC
+from robodog.client import ROSClient
+from robodog.controller import ParameterRequestBuilder
+from conftest import wait_until
+
+def test_frame_round_trip():
+    frame = st.encode_frame(st.FRAME_SET_USER_MODE, 7, b'\x04')
+    assert st.FrameDecoder().feed(frame) == [(st.FRAME_SET_USER_MODE, 7, b'\x04')]
+
+def test_decoder_resynchronises_after_corruption():
+    first = st.encode_frame(st.FRAME_ACK, 1, b'\x01')
+    corrupt = bytearray(st.encode_frame(st.FRAME_ACK, 2, b'\x01'))
+    corrupt[-1] ^= 0xFF
+    last = st.encode_frame(st.FRAME_ACK, 3, b'\x00')
+    data = b'\x00\xa5garbage' + first + bytes(corrupt) + last
+    decoder = st.FrameDecoder()
+    # Fed byte by byte, so frames also arrive split at every position
+    frames = [frame for i in range(len(data)) for frame in decoder.feed(data[i:i + 1])]
+    assert [seq for _, seq, _ in frames] == [1, 3]
+
+def test_parameters_round_trip_exactly():
+    params = {'vx': 0.1, 'body_height': 0.23, 'gait': 3, 'jump_distance': 1 / 3}
+    assert st.decode_parameters(st.encode_parameters(params)) == params
+    with pytest.raises(ValueError):
+        st.encode_parameters({'foo': 1.0})
+
+def test_state_payloads_round_trip():
+    state = {'error': False, 'warning': True, 'estop': False, 'standing': True, 'user_mode': 4,
+             'controller_type': 1, 'action': 0, 'motion_mode': 2, 'velocity_controller': 0, 'gait': 3}
+    assert st.decode_ctrl_state(st.encode_ctrl_state(state)) == state
+    status = st.decode_body_status(st.encode_body_status({'x': 1.5, 'yaw': -0.25}))
+    assert status['x'] == 1.5 and status['yaw'] == -0.25 and status['vx'] == 0.0
+
+def test_dog_over_serial(serial_device):
+    with Dog(transport=st.SerialTransport(serial_device.path, 115200), history_size=0) as dog:
+        assert dog.set_parameters({'vx': 0.1, 'gait': 3})
+        assert serial_device.params['vx'] == 0.1 and serial_device.params['gait'] == 3
+        dog.set_user_mode(4)
+        assert wait_until(lambda: dog.ctrl_state.user_mode == 4)
+        assert wait_until(lambda: dog.body_status.vx == pytest.approx(0.1))
+
+def request(params):
+    return ParameterRequestBuilder().build(params)
+
+def test_callback_error_keeps_reader_alive(serial_device):
+    transport = st.SerialTransport(serial_device.path, 115200)
+    transport.connect()
+    try:
+        received = []
+
+        def callback(message):
+            received.append(message)
+            if len(received) == 1:
+                raise ValueError("callback failure")
+
+        transport.subscribe(BODY_STATUS_TOPIC, 'ros_alphadog/BodyStatusStamped', callback)
+        assert wait_until(lambda: len(received) > 5)
+        assert transport._reader.is_alive()
+        assert transport.callback_errors == 1
+        assert isinstance(transport.last_error, ValueError)
+        assert transport.call_service(SET_PARAMETERS_SERVICE, '', request({'vx': 0.2}), timeout=1.0) == {'status': True}
+    finally:
+        transport.disconnect()
+
+def test_call_service_timeout_drops_pending_request(serial_device):
+    serial_device.ack = False
+    transport = st.SerialTransport(serial_device.path, 115200)
+    transport.connect()
+    try:
+        with pytest.raises(TimeoutError):
+            transport.call_service(SET_PARAMETERS_SERVICE, '', request({'vx': 0.2}), timeout=0.2)
+        assert transport._pending == {}
+    finally:
+        transport.disconnect()
+
+def test_expired_requests_are_failed(serial_device):
+    serial_device.ack = False
+    transport = st.SerialTransport(serial_device.path, 115200)
+    transport.pending_timeout = 0.0
+    transport.connect()
+    try:
+        errors = []
+        transport.call_service_async(SET_PARAMETERS_SERVICE, '', request({'vx': 0.1}), None, errors.append)
+        transport.call_service_async(SET_PARAMETERS_SERVICE, '', request({'vx': 0.2}), None, errors.append)
+        assert errors == ["No acknowledgement received"]
+        assert len(transport._pending) == 1
+    finally:
+        transport.disconnect()
+    assert len(errors) == 2
+
+def test_pending_requests_fail_when_device_goes_away(serial_device):
+    serial_device.ack = False
+    transport = st.SerialTransport(serial_device.path, 115200)
+    transport.connect()
+    try:
+        failed = threading.Event()
+        errors = []
+
+        def errback(error):
+            errors.append(error)
+            failed.set()
+
+        transport.call_service_async(SET_PARAMETERS_SERVICE, '', request({'vx': 0.1}), None, errback)
+        assert wait_until(lambda: serial_device.requests == 1)
+        serial_device.close()
+        assert failed.wait(2.0)
+        assert errors == ["Serial transport connection lost"]
+        assert not transport._reader.is_alive()
+        # Lets a supervisor see the dead link and reconnect
+        assert not transport.is_connected
+    finally:
+        transport.disconnect()
+
+def test_disconnect_fails_pending_requests(serial_device):
+    serial_device.ack = False
+    transport = st.SerialTransport(serial_device.path, 115200)
+    transport.connect()
+    errors = []
+    transport.call_service_async(SET_PARAMETERS_SERVICE, '', request({'vx': 0.1}), None, errors.append)
+    transport.disconnect()
+    assert len(errors) == 1
+
+def test_async_call_failure_is_a_connection_error(serial_device):
+    serial_device.ack = False
+    client = ROSClient(transport=st.SerialTransport(serial_device.path, 115200))
+    client.connect()
+    future = client.call_service_async(SET_PARAMETERS_SERVICE, '', request({'vx': 0.1}))
+    client.disconnect()
+    assert isinstance(future.exception(1.0), ConnectionError)
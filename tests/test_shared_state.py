@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from robodog.shared_state import SharedStateReader, SharedStateWriter
+from robodog.states import BodyStatus, CtrlState
+from conftest import wait_until
+
+class FakeDog:
+    """Just the states SharedStateWriter.attach reads"""
+
+    def __init__(self):
+        self.ctrl_state = CtrlState()
+        self.body_status = BodyStatus()
+
+@pytest.fixture
+def name():
+    return f'robodog_test_{os.getpid()}'
+
+def test_reader_sees_writer_updates(name):
+    dog = FakeDog()
+    writer = SharedStateWriter(name).attach(dog)
+    try:
+        with SharedStateReader(name) as reader:
+            assert reader.body_status.seq == 0 and not reader.body_status.is_valid
+            dog.body_status.update({'x': 1.5, 'vx': 0.2})
+            dog.ctrl_state.update({'user_mode': 4, 'standing': True})
+            status = reader.body_status.snapshot()
+            assert status == dog.body_status.snapshot()
+            assert type(status) is BodyStatus.Snapshot
+            assert reader.ctrl_state.user_mode == 4 and reader.ctrl_state.standing is True
+            assert reader.body_status.is_valid
+    finally:
+        writer.close()
+
+def test_unencodable_update_keeps_last_good_state(name):
+    dog = FakeDog()
+    writer = SharedStateWriter(name).attach(dog)
+    try:
+        with SharedStateReader(name) as reader:
+            dog.body_status.update({'x': 1.0})
+            dog.body_status.update({'x': None})
+            assert dog.body_status.callback_errors == 1
+            # The seqlock was not left odd, so readers still get a snapshot
+            assert reader.body_status.snapshot(retries=10).x == 1.0
+            dog.body_status.update({'x': 2.0})
+            assert reader.body_status.x == 2.0
+    finally:
+        writer.close()
+
+def test_closed_writer_removes_the_block(name):
+    writer = SharedStateWriter(name).attach(FakeDog())
+    writer.close()
+    with pytest.raises(FileNotFoundError):
+        SharedStateReader(name)
+
+def test_dog_shares_received_state(server, make_dog, name):
+    dog = make_dog()
+    dog.share_state(name)
+    with SharedStateReader(name) as reader:
+        assert wait_until(lambda: reader.body_status.seq > 5)
+        assert reader.ctrl_state.user_mode == dog.ctrl_state.user_mode
+    dog.stop_sharing()
+    assert not os.path.exists(f'/dev/shm/{name}')
@@ -0,0 +1,121 @@
+import threading
+
+import pytest
+
+from robodog.states import CtrlState, BodyStatus
+from conftest import wait_until
+
+def test_update_replaces_the_snapshot():
+    status = BodyStatus()
+    before = status.snapshot()
+    status.update({'x': 1.0, 'vx': 0.5, 'unknown': 3})
+    after = status.snapshot()
+    assert before.x == 0.0 and before.seq == 0
+    assert after.x == 1.0 and after.vx == 0.5 and after.seq == 1
+    assert after.stamp > 0.0 and status.is_valid
+    assert status.as_dict()['x'] == 1.0
+
+def test_observers_are_called_only_for_changed_fields():
+    state = CtrlState()
+    calls = []
+    remove = state.observe('user_mode', lambda *args: calls.append(args))
+    state.update({'user_mode': 0, 'gait': 2})
+    state.update({'user_mode': 4})
+    state.update({'user_mode': 4})
+    assert calls == [('user_mode', 0, 4)]
+    remove()
+    state.update({'user_mode': 3})
+    assert len(calls) == 1
+
+def test_deadband_compares_with_last_notified_value():
+    status = BodyStatus()
+    calls = []
+    status.observe('x', lambda field, old, new: calls.append(new), deadband=0.1)
+    for x in (0.05, 0.09, 0.15, 0.2, 0.26):
+        status.update({'x': x})
+    assert calls == [0.15, 0.26]
+
+def test_listeners_receive_every_snapshot():
+    status = BodyStatus()
+    seen = []
+    remove = status.add_listener(seen.append)
+    status.update({'x': 1.0})
+    status.update({'x': 2.0})
+    remove()
+    status.update({'x': 3.0})
+    assert [s.x for s in seen] == [1.0, 2.0]
+    assert seen[-1] is not status.snapshot()
+
+def test_failing_callbacks_do_not_stop_delivery():
+    status = BodyStatus()
+    observed, seen = [], []
+
+    def broken(*args):
+        raise ValueError("consumer bug")
+
+    status.observe('x', broken)
+    status.observe('x', lambda field, old, new: observed.append(new))
+    status.add_listener(broken)
+    status.add_listener(seen.append)
+    # An observer that cannot compare against a None value must not break the update either
+    status.observe('vx', lambda *args: None, deadband=0.1)
+    status.update({'x': 1.0, 'vx': None})
+    assert status.snapshot().x == 1.0
+    assert observed == [1.0]
+    assert len(seen) == 1
+    assert status.callback_errors == 3
+    assert isinstance(status.last_error, (TypeError, ValueError))
+
+def test_failing_listener_does_not_skip_dog_bookkeeping(server, make_dog):
+    dog = make_dog(history_size=10)
+    dog.body_status.add_listener(lambda snapshot: 1 / 0)
+    # wait_for relies on the state-changed notification that follows the listeners
+    assert dog.wait_for(lambda d: d.body_status.seq > 5, 2.0)
+    assert len(dog.history) > 0
+    assert dog.body_status.callback_errors > 0
+
+def test_state_fields_are_read_only_slots():
+    state = CtrlState(user_mode=3)
+    assert state.user_mode == 3 and state.seq == 0
+    assert not hasattr(state, '__dict__')
+    with pytest.raises(AttributeError):
+        state.user_mode = 4
+    with pytest.raises(AttributeError):
+        state.extra = 1
+    assert CtrlState._fields[:4] == ('error', 'warning', 'estop', 'user_mode')
+
+def test_readers_never_see_half_applied_updates():
+    status = BodyStatus()
+    torn = []
+    running = True
+
+    def read():
+        while running:
+            snapshot = status.snapshot()
+            if snapshot.x != snapshot.y:
+                torn.append(snapshot)
+
+    reader = threading.Thread(target=read)
+    reader.start()
+    try:
+        for i in range(20000):
+            status.update({'x': float(i), 'y': float(i)})
+    finally:
+        running = False
+        reader.join()
+    assert not torn
+    assert status.seq == 20000
+
+def test_dog_observe_routes_fields_to_their_state(server, make_dog):
+    dog = make_dog()
+    modes, speeds = [], []
+    dog.observe('user_mode', lambda field, old, new: modes.append((field, new)))
+    dog.observe('vx', lambda field, old, new: speeds.append(new), deadband=0.1)
+    assert dog.set_parameters({'vx': 0.05})
+    assert dog.set_parameters({'vx': 0.3})
+    assert wait_until(lambda: speeds)
+    assert speeds == [0.3]
+    dog.set_user_mode(4)
+    assert wait_until(lambda: modes == [('user_mode', 4)])
+    with pytest.raises(ValueError):
+        dog.ctrl_state.observe('vx', print)
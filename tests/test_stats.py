@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from robodog.config import BODY_STATUS_TOPIC, SET_PARAMETERS_SERVICE
+from robodog.stats import LatencyHistogram, Stats
+from conftest import wait_until
+
+def test_histogram_percentiles_are_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms / 1e3)
+    assert histogram.count == 1000
+    for q in (0.5, 0.9, 0.99):
+        assert histogram.percentile(q) == pytest.approx(q, rel=2 ** -5)
+    summary = histogram.snapshot()
+    assert summary['min_ms'] == 1.0 and summary['max_ms'] == 1000.0
+    assert summary['mean_ms'] == pytest.approx(500.5)
+
+def test_histogram_handles_outliers_and_reset():
+    histogram = LatencyHistogram()
+    histogram.record(-1.0)
+    histogram.record(3600.0)
+    assert histogram.percentile(0.0) == 0.0
+    assert histogram.percentile(1.0) == 3600.0
+    histogram.reset()
+    assert histogram.snapshot() == {'count': 0}
+    assert histogram.percentile(0.5) == 0.0
+
+def test_timer_counts_errors():
+    stats = Stats()
+    with stats.timer('op'):
+        pass
+    with pytest.raises(KeyError):
+        with stats.timer('op'):
+            raise KeyError('x')
+    stats.incr('op.retries', 2)
+    snapshot = stats.snapshot()
+    assert snapshot['latency']['op']['count'] == 2
+    assert snapshot['counters'] == {'op.errors': 1, 'op.retries': 2}
+    assert snapshot['last_errors']['op'] == repr(KeyError('x'))
+    json.dumps(snapshot)
+
+def test_disabled_stats_record_nothing():
+    stats = Stats(enabled=False)
+    stats.record('op', 0.1)
+    stats.incr('op')
+    stats.error('op')
+    stats.arrival('topic')
+    assert stats.snapshot() == {'latency': {}, 'counters': {}, 'last_errors': {}}
+
+def test_dog_stats_cover_services_and_messages(server, make_dog):
+    dog = make_dog()
+    assert dog.set_parameters({'vx': 0.1})
+    assert wait_until(lambda: dog.body_status.seq > 5)
+    stats = dog.stats()
+    assert stats['latency']['service:' + SET_PARAMETERS_SERVICE]['count'] >= 1
+    assert stats['counters']['callback:' + BODY_STATUS_TOPIC + '.messages'] > 5
+    assert stats['latency']['callback:' + BODY_STATUS_TOPIC + '.interarrival']['count'] > 0
+    assert stats['loops'] == []
+    dog.reset_stats()
+    assert dog.stats()['latency'].get('service:' + SET_PARAMETERS_SERVICE) is None
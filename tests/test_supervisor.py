@@ -0,0 +1,83 @@
+import time
+
+from robodog import Dog
+from robodog.connection import ConnectionPool
+from robodog.mock_server import MockRosbridgeServer
+from robodog.supervisor import ConnectionSupervisor
+from conftest import wait_until
+
+def supervised(make_dog, **settings):
+    dog = make_dog(auto_reconnect=True)
+    supervisor = dog.supervisor
+    supervisor.check_interval = 0.05
+    supervisor.initial_delay = 0.05
+    supervisor.max_delay = 0.2
+    for name, value in settings.items():
+        setattr(supervisor, name, value)
+    return dog, supervisor
+
+def restart(server):
+    server.stop()
+    return MockRosbridgeServer(port=server.port, body_status_rate=50.0)
+
+def test_backoff_grows_to_the_limit():
+    supervisor = ConnectionSupervisor(None, initial_delay=0.5, max_delay=3.0, multiplier=2.0, jitter=0.0)
+    assert [supervisor.backoff(n) for n in range(6)] == [0.0, 0.5, 1.0, 2.0, 3.0, 3.0]
+    supervisor.jitter = 0.5
+    assert all(1.0 <= supervisor.backoff(3) <= 2.0 for _ in range(100))
+
+def test_hold_only_while_offline():
+    supervisor = ConnectionSupervisor(None)
+    assert not supervisor.hold({'vx': 0.1})
+    supervisor._online.clear()
+    assert supervisor.hold({'vx': 0.1}) and supervisor.hold({'vx': 0.2, 'wz': 0.1})
+    assert supervisor.held == {'vx': 0.2, 'wz': 0.1}
+    supervisor.stop()
+    assert supervisor.held == {} and supervisor.online
+
+def test_reconnects_and_sends_held_commands(server, make_dog):
+    dog, supervisor = supervised(make_dog)
+    assert dog.set_parameters({'body_height': 0.25})
+    replacement = restart(server)
+    assert wait_until(lambda: not supervisor.online)
+    # Held rather than sent while the robot is unreachable
+    assert not dog.set_parameters({'vx': 0.3})
+    assert supervisor.held == {'vx': 0.3}
+    replacement.start()
+    try:
+        assert wait_until(lambda: supervisor.online, 5.0)
+        assert supervisor.outages == 1 and supervisor.attempts >= 1
+        # The first request restores the full configuration, then the held command
+        assert replacement.params['body_height'] == 0.25
+        assert replacement.params['vx'] == 0.3
+        seq = dog.body_status.seq
+        assert wait_until(lambda: dog.body_status.seq > seq)
+    finally:
+        dog.disconnect()
+        replacement.stop()
+
+def test_stale_held_commands_are_dropped(server, make_dog):
+    dog, supervisor = supervised(make_dog, hold_time=0.1)
+    replacement = restart(server)
+    assert wait_until(lambda: not supervisor.online)
+    dog.set_parameters({'vx': 0.3})
+    time.sleep(0.2)
+    replacement.start()
+    try:
+        assert wait_until(lambda: supervisor.online, 5.0)
+        assert replacement.params['vx'] == 0.0
+    finally:
+        dog.disconnect()
+        replacement.stop()
+
+def test_silent_link_counts_as_dropped():
+    # The socket stays open but no state arrives
+    with MockRosbridgeServer(ctrl_state_rate=0.0, body_status_rate=0.0) as silent:
+        dog = Dog('127.0.0.1', silent.port, pool=ConnectionPool(), history_size=0, auto_reconnect=True).connect()
+        try:
+            dog.supervisor.check_interval = 0.05
+            dog.supervisor.stale_after = 0.3
+            assert wait_until(lambda: dog.supervisor.outages >= 1, 3.0)
+            assert wait_until(lambda: dog.supervisor.attempts >= 1, 3.0)
+        finally:
+            dog.disconnect()
@@ -0,0 +1,75 @@
+import math
+
+import numpy as np
+import pytest
+
+from robodog.trajectory import Trajectory, TrajectoryExecutor
+from conftest import wait_until
+
+def test_profiles_reach_their_end_values():
+    ramp = Trajectory.ramp(1.0, {'vx': 0.0}, {'vx': 0.5}, hz=10)
+    assert len(ramp) == 10 and ramp.duration == 1.0
+    assert ramp.columns['vx'][-1] == 0.5
+    assert np.all(np.diff(ramp.columns['vx']) > 0)
+    curve = Trajectory.s_curve(1.0, {'vx': 0.0}, {'vx': 0.5}, hz=50)
+    assert curve.columns['vx'][-1] == pytest.approx(0.5)
+    # Zero slope at the ends, steepest in the middle
+    slope = np.diff(curve.columns['vx'])
+    assert slope[0] < slope[len(slope) // 2] and slope[-1] < slope[len(slope) // 2]
+    with pytest.raises(ValueError):
+        Trajectory.ramp(1.0, {'vx': 0.0}, {'wz': 0.5})
+
+def test_joined_profiles_fill_missing_velocities_with_zero():
+    joined = Trajectory.hold(0.2, hz=10, vx=0.3) + Trajectory.hold(0.3, hz=10, wz=0.5)
+    assert len(joined) == 5
+    assert joined.columns['vx'].tolist() == [0.3, 0.3, 0.0, 0.0, 0.0]
+    assert joined.columns['wz'].tolist() == [0.0, 0.0, 0.5, 0.5, 0.5]
+    with pytest.raises(ValueError):
+        Trajectory.hold(0.2, hz=10, vx=0.1) + Trajectory.hold(0.2, hz=20, vx=0.1)
+
+def test_arc_turns_the_exact_angle():
+    arc = Trajectory.arc(radius=1.0, angle=math.pi / 2, speed=0.5)
+    pose = arc.expected_pose()
+    assert pose['yaw'][-1] == pytest.approx(math.pi / 2)
+    # A left quarter circle of radius 1 ends one metre ahead and one to the left
+    assert pose['x'][-1] == pytest.approx(1.0, abs=0.02)
+    assert pose['y'][-1] == pytest.approx(1.0, abs=0.02)
+
+def test_waypoints_visit_every_point():
+    square = Trajectory.waypoints([(1, 0), (1, 1), (0, 1), (0, 0)], speed=0.5, turn_rate=1.0)
+    pose = square.expected_pose()
+    assert pose['x'][-1] == pytest.approx(0.0, abs=1e-9)
+    assert pose['y'][-1] == pytest.approx(0.0, abs=1e-9)
+    assert pose['yaw'][-1] == pytest.approx(3 * math.pi / 2)
+    assert len(Trajectory.waypoints([(0, 0)], speed=0.5)) == 0
+
+def test_limits_are_checked_before_sending():
+    fast = Trajectory.hold(0.1, vx=100.0)
+    with pytest.raises(ValueError):
+        fast.check_limits()
+    clipped = fast.clipped()
+    clipped.check_limits()
+    with pytest.raises(ValueError):
+        TrajectoryExecutor(None, fast)
+
+def test_run_trajectory_streams_setpoints(server, make_dog):
+    dog = make_dog()
+    assert wait_until(lambda: dog.body_status.seq > 0)
+    trajectory = Trajectory.hold(0.3, hz=20, vx=0.4) + Trajectory.hold(0.2, hz=20, wz=0.3)
+    result = dog.run_trajectory(trajectory)
+    summary = result.summary()
+    assert summary['completed'] and summary['failures'] == 0 and summary['ticks'] == 10
+    assert result.commanded['vx'].tolist() == trajectory.columns['vx'].tolist()
+    assert result.measured['x'][-1] > 0.05
+    assert summary['final_position_error'] < 0.1
+    # Zero velocity is sent at the end
+    assert server.params['vx'] == 0.0 and server.params['wz'] == 0.0
+
+def test_cancel_stops_early(server, make_dog):
+    dog = make_dog()
+    executor = dog.start_trajectory(Trajectory.hold(5.0, hz=20, vx=0.2))
+    assert wait_until(lambda: server.params['vx'] == 0.2)
+    result = executor.cancel(2.0)
+    assert not result.completed and 0 < len(result.commanded['vx']) < 100
+    assert not executor.running
+    assert server.params['vx'] == 0.0
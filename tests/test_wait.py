@@ -0,0 +1,31 @@
+import threading
+import time
+
+from robodog import UserMode
+
+def test_wait_until_mode_wakes_on_the_state_message(server, make_dog):
+    dog = make_dog()
+    assert dog.wait_until_standing(2.0)
+    threading.Timer(0.1, dog.set_user_mode, (UserMode.DANCE,)).start()
+    start = time.monotonic()
+    assert dog.wait_until_mode(UserMode.DANCE, 2.0)
+    assert time.monotonic() - start < 1.0
+    assert dog.ctrl_state.user_mode == int(UserMode.DANCE)
+
+def test_wait_for_times_out(server, make_dog):
+    dog = make_dog()
+    start = time.monotonic()
+    assert not dog.wait_for(lambda d: d.body_status.x > 100.0, 0.2)
+    assert 0.15 < time.monotonic() - start < 1.0
+    assert dog._waiters == 0
+
+def test_wait_for_returns_at_once_when_already_true(server, make_dog):
+    dog = make_dog()
+    assert dog.wait_for(lambda d: True, 0)
+
+def test_wait_for_sees_commanded_motion(server, make_dog):
+    dog = make_dog()
+    assert dog.wait_for(lambda d: d.body_status.seq > 0, 2.0)
+    x = dog.body_status.x
+    assert dog.set_parameters({'vx': 1.0})
+    assert dog.wait_for(lambda d: d.body_status.x > x + 0.05, 2.0)